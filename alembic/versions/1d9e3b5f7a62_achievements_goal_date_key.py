@@ -0,0 +1,34 @@
+"""Single achievement per goal and date
+
+Revision ID: 1d9e3b5f7a62
+Revises: e5a1b7c9d3f4
+Create Date: 2026-10-18 15:12:09.448213
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1d9e3b5f7a62'
+down_revision = 'e5a1b7c9d3f4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # keep only the latest state if there are several ones for the same day
+    op.execute(sa.text("""
+        DELETE FROM achievements a
+        USING achievements b
+        WHERE a.goal_id = b.goal_id
+          AND a.event_date = b.event_date
+          AND a.id < b.id
+    """))
+    op.create_unique_constraint('achievements_goal_date_key', 'achievements',
+                                ['goal_id', 'event_date'])
+
+
+def downgrade():
+    op.drop_constraint('achievements_goal_date_key', 'achievements',
+                       type_='unique')
@@ -0,0 +1,46 @@
+"""Goal recurrence columns and indexes
+
+Revision ID: 3f1c9a7d2b10
+Revises: 
+Create Date: 2026-10-18 10:12:41.281512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c9a7d2b10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('goals', sa.Column(
+        'target_weekday', sa.Integer(),
+        sa.Computed('extract(isodow from target_date)::int')
+    ))
+    op.add_column('goals', sa.Column(
+        'target_day', sa.Integer(),
+        sa.Computed('extract(day from target_date)::int')
+    ))
+    op.add_column('goals', sa.Column(
+        'target_month', sa.Integer(),
+        sa.Computed('extract(month from target_date)::int')
+    ))
+    op.create_index('goals_user_span_idx', 'goals',
+                    ['user_id', 'span_id', 'group_id'])
+    op.create_index('goals_user_actual_idx', 'goals',
+                    ['user_id', 'actual_from', 'actual_to'])
+    op.create_index('goals_user_target_date_idx', 'goals',
+                    ['user_id', 'target_date'])
+
+
+def downgrade():
+    op.drop_index('goals_user_target_date_idx', table_name='goals')
+    op.drop_index('goals_user_actual_idx', table_name='goals')
+    op.drop_index('goals_user_span_idx', table_name='goals')
+    op.drop_column('goals', 'target_month')
+    op.drop_column('goals', 'target_weekday')
+    op.drop_column('goals', 'target_day')
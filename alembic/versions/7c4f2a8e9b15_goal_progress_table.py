@@ -0,0 +1,48 @@
+"""Goal progress aggregates
+
+Revision ID: 7c4f2a8e9b15
+Revises: 1d9e3b5f7a62
+Create Date: 2026-10-18 16:05:43.120577
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c4f2a8e9b15'
+down_revision = '1d9e3b5f7a62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'goal_progress',
+        sa.Column('goal_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('total_value', sa.BigInteger(), nullable=False),
+        sa.Column('events', sa.Integer(), nullable=False),
+        sa.Column('last_event_date', sa.Date(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['goal_id'], ['goals.id'],
+                                ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('goal_id'),
+    )
+    op.create_index('goal_progress_user_idx', 'goal_progress',
+                    ['user_id', 'updated_at'])
+    op.execute(sa.text("""
+        INSERT INTO goal_progress (goal_id, user_id, total_value, events,
+                                   last_event_date, updated_at)
+        SELECT a.goal_id, g.user_id, sum(a.value), count(*),
+               max(a.event_date), now()
+        FROM achievements a
+        JOIN goals g ON g.id = a.goal_id
+        GROUP BY a.goal_id, g.user_id
+    """))
+
+
+def downgrade():
+    op.drop_index('goal_progress_user_idx', table_name='goal_progress')
+    op.drop_table('goal_progress')
@@ -0,0 +1,39 @@
+"""Occurrences table
+
+Revision ID: 8b2e4f6a1c03
+Revises: 3f1c9a7d2b10
+Create Date: 2026-10-18 10:47:05.904217
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2e4f6a1c03'
+down_revision = '3f1c9a7d2b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'occurrences',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('goal_id', sa.Integer(), nullable=False),
+        sa.Column('event_date', sa.Date(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['goal_id'], ['goals.id'],
+                                ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('goal_id', 'event_date',
+                            name='occurrences_goal_date_key'),
+    )
+    op.create_index('occurrences_user_date_idx', 'occurrences',
+                    ['user_id', 'event_date'])
+
+
+def downgrade():
+    op.drop_index('occurrences_user_date_idx', table_name='occurrences')
+    op.drop_table('occurrences')
@@ -0,0 +1,25 @@
+"""Partial index for until complete rollover
+
+Revision ID: a6d2c8e4f019
+Revises: 7c4f2a8e9b15
+Create Date: 2026-10-18 17:21:37.904216
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d2c8e4f019'
+down_revision = '7c4f2a8e9b15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('goals_until_complete_idx', 'goals', ['target_date'],
+                    postgresql_where=sa.text('span_id = 2'))
+
+
+def downgrade():
+    op.drop_index('goals_until_complete_idx', table_name='goals')
@@ -0,0 +1,38 @@
+"""Persistent occurrences window
+
+Revision ID: b3e9f1d7c542
+Revises: a6d2c8e4f019
+Create Date: 2026-10-18 19:02:11.518340
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3e9f1d7c542'
+down_revision = 'a6d2c8e4f019'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'occurrences_window',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('first_day', sa.Date(), nullable=False),
+        sa.Column('last_day', sa.Date(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    # rows that are already there are surely inside of the former window,
+    # so they are not expanded once again after the deploy
+    op.execute(sa.text("""
+        INSERT INTO occurrences_window (id, first_day, last_day)
+        SELECT 1, min(event_date), max(event_date)
+        FROM occurrences
+        HAVING count(*) > 0
+    """))
+
+
+def downgrade():
+    op.drop_table('occurrences_window')
@@ -0,0 +1,28 @@
+"""Case insensitive user lookup indexes
+
+Revision ID: c47d0e9f5a21
+Revises: 8b2e4f6a1c03
+Create Date: 2026-10-18 11:20:37.511846
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c47d0e9f5a21'
+down_revision = '8b2e4f6a1c03'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('users_login_lower_idx', 'users',
+                    [sa.text('lower(login)')])
+    op.create_index('users_email_lower_idx', 'users',
+                    [sa.text('lower(email)')])
+
+
+def downgrade():
+    op.drop_index('users_email_lower_idx', table_name='users')
+    op.drop_index('users_login_lower_idx', table_name='users')
@@ -0,0 +1,57 @@
+"""Holidays table
+
+Revision ID: e5a1b7c9d3f4
+Revises: c47d0e9f5a21
+Create Date: 2026-10-18 14:02:51.372604
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a1b7c9d3f4'
+down_revision = 'c47d0e9f5a21'
+branch_labels = None
+depends_on = None
+
+
+UNIQUE_KEY = 'holidays_country_date_name_key'
+UNIQUE_COLUMNS = ['country_id', 'event_date', 'name']
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    if 'holidays' not in inspector.get_table_names():
+        op.create_table(
+            'holidays',
+            sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column('country_id', sa.Integer(), nullable=False),
+            sa.Column('event_date', sa.Date(), nullable=False),
+            sa.Column('name', sa.String(length=255), nullable=False),
+            sa.ForeignKeyConstraint(['country_id'], ['countries.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint(*UNIQUE_COLUMNS, name=UNIQUE_KEY),
+        )
+        return
+
+    # table was created by hand before migrations, adopt it as it is
+    existing = {constraint['name'] for constraint
+                in inspector.get_unique_constraints('holidays')}
+    if UNIQUE_KEY not in existing:
+        op.execute(sa.text("""
+            DELETE FROM holidays a
+            USING holidays b
+            WHERE a.country_id = b.country_id
+              AND a.event_date = b.event_date
+              AND a.name = b.name
+              AND a.id > b.id
+        """))
+        op.create_unique_constraint(UNIQUE_KEY, 'holidays', UNIQUE_COLUMNS)
+
+
+def downgrade():
+    # table could have existed before this revision, so only
+    # the key is removed, holidays themselves are kept
+    op.drop_constraint(UNIQUE_KEY, 'holidays', type_='unique')
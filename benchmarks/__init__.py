@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+
+"""Microbenchmarks, not a part of the test suite.
+"""
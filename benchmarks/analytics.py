@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+"""Achievement statistics, numpy columns versus plain Python.
+
+Synthetic history: every goal has an achievement on every day,
+three of four are complete. Rows are shaped like the ones
+get_achievement_rows gives. Plain Python variant is the straightforward
+implementation with dict counters, kept here only for comparison;
+its result is checked to be the same.
+
+Usage:
+    ORDNUNG_DB_URI=sqlite:// python -m benchmarks.analytics
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from ordnung import settings
+from ordnung.core.analytics import get_statistics, make_columns
+from ordnung.storage.sql import STATUS_COMPLETE, STATUS_FAILED
+
+Row = Tuple[int, int, int, int, int]
+
+
+def make_history(goals: int, years: int, today: date) -> List[Row]:
+    """Rows (day ordinal, goal_id, span_id, status_id, value).
+    """
+    random.seed(1)
+    start = (today - timedelta(days=365 * years - 1)).toordinal()
+    statuses = (STATUS_COMPLETE,) * 3 + (STATUS_FAILED,)
+    return [(start + day, goal_id, 3 + goal_id % 8,
+             random.choice(statuses), 1)
+            for goal_id in range(1, goals + 1)
+            for day in range(365 * years)]
+
+
+def get_statistics_python(rows: Sequence[Row], today: date, history: int,
+                          window: int) -> Dict[str, Any]:
+    """Same statistics, calculated row by row.
+    """
+    by_goal: Dict[int, List[Row]] = {}
+    spans: Dict[int, List[int]] = {}
+    weeks: Dict[date, List[int]] = {}
+    months: Dict[Tuple[int, int], List[int]] = {}
+    days: Dict[int, List[int]] = {}
+
+    for row in rows:
+        day, goal_id, span_id, status_id, _ = row
+        complete = int(status_id == STATUS_COMPLETE)
+        by_goal.setdefault(goal_id, []).append(row)
+        cur_date = date.fromordinal(day)
+        monday = cur_date - timedelta(days=cur_date.weekday())
+        for counters, key in ((spans, span_id), (weeks, monday),
+                              (months, (cur_date.year, cur_date.month)),
+                              (days, day)):
+            counter = counters.setdefault(key, [0, 0])
+            counter[0] += 1
+            counter[1] += complete
+
+    streaks = []
+    for goal_id in sorted(by_goal):
+        current = longest = 0
+        for row in sorted(by_goal[goal_id]):
+            current = current + 1 if row[3] == STATUS_COMPLETE else 0
+            longest = max(longest, current)
+        streaks.append(dict(goal_id=goal_id, current=current,
+                            longest=longest))
+
+    first_day = today - timedelta(days=history - 1)
+    rates = []
+    for day in range(first_day.toordinal(), today.toordinal() + 1):
+        total = done = 0
+        for other in range(day - window + 1, day + 1):
+            total_of_day, done_of_day = days.get(other, (0, 0))
+            total += total_of_day
+            done += done_of_day
+        rates.append(done / total if total else None)
+
+    return {
+        'total': len(rows),
+        'streaks': streaks,
+        'completion': [
+            dict(span_id=span_id, total=total, complete=done,
+                 rate=done / total)
+            for span_id, (total, done) in sorted(spans.items())
+        ],
+        'rolling': {
+            'first_day': first_day.isoformat(),
+            'last_day': today.isoformat(),
+            'window': window,
+            'rates': rates,
+        },
+        'weeks': [dict(period=monday.isoformat(), total=total, complete=done)
+                  for monday, (total, done) in sorted(weeks.items())],
+        'months': [dict(period=f'{year:04d}-{month:02d}', total=total,
+                        complete=done)
+                   for (year, month), (total, done) in sorted(months.items())],
+    }
+
+
+def measure(function: Callable[[], Any], repeat: int) -> Tuple[float, Any]:
+    """Best time of several calls in seconds and result of the last one.
+    """
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    """Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--goals', type=int, default=80)
+    parser.add_argument('--years', type=int, default=6)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    today = date(2020, 12, 31)
+    rows = make_history(args.goals, args.years, today)
+    arguments = (today, settings.STATS_HISTORY, settings.STATS_WINDOW)
+    print(f'{len(rows)} achievements')
+
+    columns_time, columns = measure(lambda: make_columns(rows), args.repeat)
+    numpy_time, expected = measure(
+        lambda: get_statistics(columns, *arguments), args.repeat)
+    python_time, result = measure(
+        lambda: get_statistics_python(rows, *arguments), args.repeat)
+    assert result == expected, 'implementations disagree'
+
+    print(f'{"make_columns":<24}{columns_time:8.3f} s')
+    print(f'{"get_statistics":<24}{numpy_time:8.3f} s')
+    print(f'{"plain Python":<24}{python_time:8.3f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+"""Throughput of concurrent requests with blocking database call.
+
+Many requests are sent through ASGI interface at once. Endpoint makes
+one blocking call of fixed latency, either right in the event loop
+(serialized, like views did before) or through run_in_db_thread
+(offloaded, like they do now).
+
+Blocking call is time.sleep by default. If ORDNUNG_TEST_DB_URI is set,
+it is pg_sleep in the session of the request, so connection pool
+takes part in the measurement too.
+
+Usage:
+    ORDNUNG_DB_URI=sqlite:// python -m benchmarks.concurrency
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from sqlalchemy import create_engine, text
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route, Router
+from starlette.types import ASGIApp
+
+from ordnung import settings
+from ordnung.presentation.middleware import DBSessionMiddleware
+from ordnung.storage.database import run_in_db_thread, session
+
+TEST_DB_URI = os.getenv('ORDNUNG_TEST_DB_URI')
+
+
+def blocking_call(latency: float) -> None:
+    """Stand-in for a database request of fixed duration.
+    """
+    if TEST_DB_URI is None:
+        time.sleep(latency)
+    else:
+        session.execute(text('SELECT pg_sleep(:seconds)'),
+                        params=dict(seconds=latency))
+
+
+def make_app(latency: float) -> ASGIApp:
+    """Make application with serialized and offloaded endpoints.
+    """
+
+    async def serialized(request):
+        blocking_call(latency)
+        return PlainTextResponse('ok')
+
+    async def offloaded(request):
+        await run_in_db_thread(blocking_call, latency)
+        return PlainTextResponse('ok')
+
+    return DBSessionMiddleware(Router(routes=[
+        Route('/serialized', serialized),
+        Route('/offloaded', offloaded),
+    ]))
+
+
+async def measure(app: ASGIApp, path: str, total: int,
+                  concurrency: int) -> float:
+    """Send requests, no more than concurrency at once.
+
+    Returns requests per second.
+    """
+    loop = asyncio.get_event_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(message):
+        pass
+
+    async def call():
+        messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+        async def receive():
+            # like real server, waits for disconnect after the body
+            if messages:
+                return messages.pop()
+            return await loop.create_future()
+
+        scope = {'type': 'http', 'method': 'GET', 'path': path,
+                 'root_path': '', 'scheme': 'http', 'query_string': b'',
+                 'headers': [], 'server': ('testserver', 80)}
+        async with semaphore:
+            await app(scope, receive, send)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(call() for _ in range(total)))
+    return total / (time.perf_counter() - start)
+
+
+def main():
+    """Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.01,
+                        help='seconds per blocking call')
+    args = parser.parse_args()
+
+    if TEST_DB_URI is not None:
+        session.configure(bind=create_engine(
+            TEST_DB_URI,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+        ))
+
+    app = make_app(args.latency)
+    source = 'pg_sleep' if TEST_DB_URI else 'time.sleep'
+    print(f'{args.requests} requests, {args.concurrency} at once, '
+          f'{args.latency * 1000:.0f} ms {source} each')
+    for name in ('serialized', 'offloaded'):
+        result = asyncio.run(measure(app, f'/{name}', args.requests,
+                                     args.concurrency))
+        print(f'{name:<24}{result:8.1f} requests/s')
+
+
+if __name__ == '__main__':
+    main()
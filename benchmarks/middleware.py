@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+"""Overhead of template context middleware per request.
+
+Trivial endpoint is called directly through ASGI interface, without
+network and server, once bare, once behind the former
+BaseHTTPMiddleware implementation and once behind the current
+plain ASGI one.
+
+BaseHTTPMiddleware of Starlette 0.13 does not work on Python 3.11+
+(asyncio.wait refuses bare coroutines), so run it on 3.8 - 3.10.
+
+Usage:
+    ORDNUNG_DB_URI=sqlite:// python -m benchmarks.middleware
+"""
+import argparse
+import asyncio
+import time
+from typing import Callable
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route, Router
+from starlette.types import ASGIApp
+
+from ordnung.presentation.access import get_translate, get_gettext
+from ordnung.presentation.middleware import (
+    ContextExtensionMiddleware, UnauthenticatedUser
+)
+
+
+class BaseHTTPContextExtensionMiddleware(BaseHTTPMiddleware):
+    """Former implementation, kept here only for comparison.
+    """
+
+    async def dispatch(self, request, call_next):
+        """Inserts additional names into the template.
+        """
+        try:
+            context_extensions = getattr(request.state, 'context_extensions')
+        except AttributeError:
+            context_extensions = {}
+
+        context_extensions['gettext'] = get_gettext(request.user.lang)
+        context_extensions['_'] = get_gettext(request.user.lang)
+        context_extensions['translate'] = get_translate(request.user.lang)
+        context_extensions['user'] = request.user
+        context_extensions['errors'] = []
+
+        request.state.context_extensions = context_extensions
+        response = await call_next(request)
+        return response
+
+
+async def endpoint(request):
+    """Trivial endpoint, touches context like template render does.
+    """
+    getattr(request.state, 'context_extensions', {}).get('_')
+    return PlainTextResponse('ok')
+
+
+def make_app(middleware: Callable[[ASGIApp], ASGIApp] = None) -> ASGIApp:
+    """Make application with single route.
+    """
+    app = Router(routes=[Route('/', endpoint)])
+    return middleware(app) if middleware else app
+
+
+async def measure(app: ASGIApp, total: int) -> float:
+    """Call application many times, return microseconds per request.
+    """
+    user = UnauthenticatedUser()
+    loop = asyncio.get_event_loop()
+
+    def make_receive():
+        messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+        async def receive():
+            # like real server, waits for disconnect after the body
+            if messages:
+                return messages.pop()
+            return await loop.create_future()
+
+        return receive
+
+    async def send(message):
+        pass
+
+    def make_scope():
+        return {'type': 'http', 'method': 'GET', 'path': '/',
+                'root_path': '', 'scheme': 'http', 'query_string': b'',
+                'headers': [], 'server': ('testserver', 80), 'user': user}
+
+    for _ in range(total // 10):  # warm up
+        await app(make_scope(), make_receive(), send)
+
+    start = time.perf_counter()
+    for _ in range(total):
+        await app(make_scope(), make_receive(), send)
+    return (time.perf_counter() - start) / total * 1e6
+
+
+def main():
+    """Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=20000)
+    args = parser.parse_args()
+
+    variants = [
+        ('bare endpoint', None),
+        ('BaseHTTPMiddleware', BaseHTTPContextExtensionMiddleware),
+        ('plain ASGI middleware', ContextExtensionMiddleware),
+    ]
+    for name, middleware in variants:
+        result = asyncio.run(measure(make_app(middleware), args.requests))
+        print(f'{name:<24}{result:8.1f} us/request')
+
+
+if __name__ == '__main__':
+    main()
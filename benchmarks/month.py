@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+"""Month table building, with and without shared grid.
+
+Cold variant clears grid cache before every call, so the whole table
+of days is built, like it was before the cache. Warm variant is what
+every request after the first one of the day gets.
+
+Usage:
+    ORDNUNG_DB_URI=sqlite:// python -m benchmarks.month
+"""
+import argparse
+import time
+from datetime import date
+
+from ordnung.core.date_and_time import get_grid, get_month
+
+
+def measure_cold(current_date: date, today: date, total: int) -> float:
+    """Build month on empty cache, return microseconds per call.
+    """
+    elapsed = 0.0
+    for _ in range(total):
+        get_grid.cache_clear()
+        start = time.perf_counter()
+        get_month(current_date, today)
+        elapsed += time.perf_counter() - start
+    return elapsed / total * 1e6
+
+
+def measure_warm(current_date: date, today: date, total: int) -> float:
+    """Build month with grid already cached, return microseconds per call.
+    """
+    get_grid.cache_clear()
+    get_month(current_date, today)
+
+    start = time.perf_counter()
+    for _ in range(total):
+        get_month(current_date, today)
+    return (time.perf_counter() - start) / total * 1e6
+
+
+def main():
+    """Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calls', type=int, default=20000)
+    args = parser.parse_args()
+
+    today = date(2020, 5, 12)
+    for name, function in (('cold grid cache', measure_cold),
+                           ('warm grid cache', measure_warm)):
+        result = function(today, today, args.calls)
+        print(f'{name:<24}{result:8.1f} us/call')
+
+
+if __name__ == '__main__':
+    main()
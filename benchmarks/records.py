@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+"""Bucketing of recurrence request rows by day.
+
+Rows are named tuples with items() method, like RowProxy of
+sqlalchemy. Former implementation copied every row into dict and
+deduplicated it, it is kept here only for comparison.
+
+Usage:
+    ORDNUNG_DB_URI=sqlite:// python -m benchmarks.records
+"""
+import argparse
+import random
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Tuple
+
+from ordnung.core.records import organize_records, sort_nested_records
+
+Records = Dict[str, List[dict]]
+
+COLUMNS = ('id', 'cur_date', 'title', 'span_id', 'actual_from',
+           'actual_to', 'target_date', 'status_id')
+
+
+class Row(namedtuple('Row', COLUMNS)):
+    """Row with mapping interface of RowProxy.
+    """
+    __slots__ = ()
+
+    def items(self):
+        """Pairs column - value.
+        """
+        return zip(self._fields, self)
+
+
+def make_rows(total: int, target_date: date, days: int) -> List[Row]:
+    """Rows spread over days around target date, ordered by date.
+    """
+    random.seed(1)
+    start = target_date - timedelta(days=days // 2)
+    rows = []
+    for number in range(total):
+        cur_date = start + timedelta(days=number * days // total)
+        rows.append(Row(id=number, cur_date=cur_date, title=f'Goal {number}',
+                        span_id=random.randint(1, 10),
+                        actual_from=datetime(2020, 1, 1), actual_to=None,
+                        target_date=cur_date, status_id=None))
+    return rows
+
+
+def sort_by_persistence_old(raw_record: dict) -> int:
+    """Key function, created to sort by span_id.
+    """
+    return raw_record.get('span_id', 999)
+
+
+def organize_records_old(all_records, target_date: date, offset_left: int,
+                         offset_right: int) -> Records:
+    """Former implementation, dict copies and deduplication.
+    """
+    start = target_date - timedelta(days=offset_left)
+    stop = target_date + timedelta(days=offset_right)
+
+    records = {}
+    cur_date = start
+    while cur_date <= stop:
+        records[str(cur_date)] = []
+        cur_date += timedelta(days=1)
+
+    duplicates = set()
+    for record in all_records:
+        record_as_dict = {column: value for column, value in record.items()}
+
+        id_ = record_as_dict['id']
+        key = (id_, record.cur_date)
+
+        if str(record.cur_date) not in records:
+            raise ValueError(f'Date {record.cur_date} is not '
+                             f'found in record {record_as_dict}')
+
+        if key not in duplicates:
+            records[str(record.cur_date)].append(record_as_dict)
+            duplicates.add(key)
+
+    return records
+
+
+def sort_nested_records_old(records: Records,
+                            sorter: Callable = sort_by_persistence_old
+                            ) -> Records:
+    """Former implementation, sorted copy of every day.
+    """
+    sorted_records = {}
+
+    for day_date, day_records in records.items():
+        sorted_records[day_date] = sorted(day_records, key=sorter)
+
+    return sorted_records
+
+
+def measure(function: Callable[[], Any], repeat: int) -> Tuple[float, Any]:
+    """Best time of several calls in seconds and result of the last one.
+    """
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    """Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    target_date = date(2020, 7, 1)
+    offset_left = args.days // 2
+    offset_right = args.days - offset_left - 1
+    rows = make_rows(args.rows, target_date, args.days)
+    arguments = (target_date, offset_left, offset_right)
+
+    old_time, expected = measure(lambda: sort_nested_records_old(
+        organize_records_old(rows, *arguments)), args.repeat)
+    new_time, result = measure(lambda: sort_nested_records(
+        organize_records(rows, *arguments)), args.repeat)
+    dedupe_time, _ = measure(lambda: sort_nested_records(
+        organize_records(rows, *arguments, dedupe=True)), args.repeat)
+
+    assert {day: [dict(row.items()) for row in day_rows]
+            for day, day_rows in result.items()} == expected, \
+        'implementations disagree'
+
+    print(f'{len(rows)} rows over {args.days} days')
+    print(f'{"dict copies":<24}{old_time:8.3f} s')
+    print(f'{"buckets":<24}{new_time:8.3f} s')
+    print(f'{"buckets, dedupe":<24}{dedupe_time:8.3f} s')
+
+
+if __name__ == '__main__':
+    main()
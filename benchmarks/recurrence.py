@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+"""Goals of the month table, MEGA_REQUEST versus expansion in Python.
+
+First variant expands recurring spans in SQL (load_records and
+organize_records), second one gets only candidate goals and expands
+them with get_candidate_goals and expand_goals.
+
+Needs real PostgreSQL with migrated ordnung schema, set
+ORDNUNG_TEST_DB_URI to run it. Goals are generated in a temporary
+schema that is dropped after, real data is not touched.
+
+Usage:
+    export ORDNUNG_TEST_DB_URI=postgresql://...
+    ORDNUNG_DB_URI=sqlite:// python -m benchmarks.recurrence
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+from typing import Any, Callable, Set, Tuple
+
+from sqlalchemy import create_engine, text
+
+from ordnung import settings
+from ordnung.core.recurrence import expand_goals
+from ordnung.core.records import organize_records
+from ordnung.storage.access import get_candidate_goals
+from ordnung.storage.database import load_records, session
+
+TEST_DB_URI = os.getenv('ORDNUNG_TEST_DB_URI')
+USER_ID = 1
+GROUP_ID = 1
+
+# goals of all users are spread over two years around target date,
+# every span type is equally presented
+FILL_REQUEST = """
+INSERT INTO goals (id, user_id, group_id, span_id, created_at, last_edit_at,
+                   title, description, target_date, target_time,
+                   actual_from, actual_to)
+SELECT x, 1 + x % :users, :group_id, 1 + x / :users % 10, now(), now(),
+       'Goal ' || x, '', date(:target_date) - 365 + x * 7919 % 730, null,
+       date(:target_date) - 400 + x % 300,
+       case when x % 4 = 0 then date(:target_date) + x % 60 end
+FROM generate_series(1, :total) AS x;
+"""
+
+Pairs = Set[Tuple[date, int]]
+
+
+def measure(function: Callable[[], Any], repeat: int) -> Tuple[float, Any]:
+    """Best time of several calls in seconds and result of the last one.
+    """
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def mega_request(target_date: date, offset_left: int,
+                 offset_right: int) -> Pairs:
+    """Expand goals in SQL.
+    """
+    rows = load_records(USER_ID, [GROUP_ID], target_date,
+                        offset_left, offset_right).fetchall()
+    records = organize_records(rows, target_date, offset_left, offset_right)
+    return {(date.fromisoformat(day), record.id)
+            for day, day_records in records.items()
+            for record in day_records}
+
+
+def python_expansion(target_date: date, offset_left: int,
+                     offset_right: int) -> Pairs:
+    """Get candidates from SQL, expand them in Python.
+    """
+    session.expunge_all()  # no help from identity map
+    first_day = target_date - timedelta(days=offset_left)
+    last_day = target_date + timedelta(days=offset_right)
+    goals = get_candidate_goals(USER_ID, first_day, last_day)
+    buckets = expand_goals(goals, first_day, last_day)
+    return {(cur_date, goal.id)
+            for cur_date, day_goals in buckets.items()
+            for goal in day_goals}
+
+
+def main():
+    """Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--goals', type=int, default=100000,
+                        help='goals of all users')
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    if TEST_DB_URI is None:
+        sys.exit('Set ORDNUNG_TEST_DB_URI to run this benchmark')
+
+    target_date = date(2020, 5, 10)
+    offset_left = settings.WEEK_LENGTH * 2 + target_date.weekday()
+    offset_right = settings.MONTH_LENGTH - offset_left - 1
+    arguments = (target_date, offset_left, offset_right)
+
+    engine = create_engine(TEST_DB_URI)
+    with engine.connect() as conn:
+        conn.execute('CREATE SCHEMA ordnung_bench')
+        try:
+            conn.execute('CREATE TABLE ordnung_bench.goals '
+                         '(LIKE public.goals INCLUDING ALL)')
+            conn.execute('SET search_path TO ordnung_bench')
+            conn.execute(text(FILL_REQUEST), total=args.goals,
+                         users=args.users, group_id=GROUP_ID,
+                         target_date=target_date)
+            conn.execute('ANALYZE goals')
+
+            session.remove()
+            session.configure(bind=conn)
+
+            mega_time, expected = measure(lambda: mega_request(*arguments),
+                                          args.repeat)
+            python_time, result = measure(
+                lambda: python_expansion(*arguments), args.repeat)
+            session.remove()
+        finally:
+            conn.execute('DROP SCHEMA ordnung_bench CASCADE')
+
+    print(f'{args.goals} goals, {len(expected)} occurrences '
+          f'in {settings.MONTH_LENGTH} days for the user')
+    print(f'{"MEGA_REQUEST":<24}{mega_time * 1000:8.2f} ms')
+    print(f'{"candidates + expand":<24}{python_time * 1000:8.2f} ms')
+    if result != expected:
+        print(f'Results differ in {len(result ^ expected)} occurrences')
+
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,7 @@
 
 """Main app instance is here.
 """
+import asyncio
 
 from loguru import logger
 from starlette.applications import Starlette
@@ -10,10 +11,14 @@ from starlette.middleware.sessions import SessionMiddleware
 
 from ordnung import settings
 from ordnung.presentation.backends import OrdnungAuthBackend
+from ordnung.presentation.email_sending import mail_queue
 from ordnung.presentation.middleware import (
-    ContextExtensionMiddleware, AuthMiddleware
+    ContextExtensionMiddleware, AuthMiddleware, DBSessionMiddleware
 )
 from ordnung.presentation.routes import routes
+from ordnung.storage.holidays import maintain_holidays
+from ordnung.storage.occurrences import maintain_occurrences
+from ordnung.storage.rollover import maintain_rollover
 
 
 def startup():
@@ -21,10 +26,15 @@ def startup():
     """
     logger.add(settings.LOGGER_FILENAME, rotation=settings.LOGGER_ROTATION)
     logger.info('Server start')
+    asyncio.ensure_future(maintain_occurrences())
+    asyncio.ensure_future(maintain_holidays())
+    asyncio.ensure_future(maintain_rollover())
+    asyncio.ensure_future(mail_queue.run())
 
 
 middleware = [
     Middleware(SessionMiddleware, secret_key=settings.SECRET_KEY),
+    Middleware(DBSessionMiddleware),
     Middleware(AuthMiddleware, backend=OrdnungAuthBackend()),
     Middleware(ContextExtensionMiddleware),
 ]
@@ -3,18 +3,41 @@
 """Access tools, related to the core logic.
 """
 import time
-from datetime import date, datetime
-from typing import Optional, Any, Tuple
+from datetime import date, datetime, timedelta
+from typing import Optional, Any, Tuple, Dict
 
+import pytz
 from itsdangerous import URLSafeSerializer
 
 from ordnung import settings
 
+# timezone name -> (timestamp of the next midnight there, current date)
+_today: Dict[str, Tuple[float, date]] = {}
 
-def get_today() -> date:
-    """Get today's date.
+
+def get_today(timezone: Optional[str] = None) -> date:
+    """Get today's date in given timezone (default one if not given).
+
+    Date is calculated once per day for every timezone,
+    until the next midnight there it is taken from cache.
     """
-    return date.today()
+    name = timezone or settings.DEFAULT_TIMEZONE
+    now = time.time()
+    cached = _today.get(name)
+
+    if cached is not None and now < cached[0]:
+        return cached[1]
+
+    try:
+        tz = pytz.timezone(name)
+    except pytz.UnknownTimeZoneError:
+        tz = settings.timezone
+
+    today = datetime.fromtimestamp(now, tz).date()
+    midnight = tz.localize(datetime.combine(today + timedelta(days=1),
+                                            datetime.min.time()))
+    _today[name] = (midnight.timestamp(), today)
+    return today
 
 
 def get_now() -> datetime:
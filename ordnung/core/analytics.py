@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+
+"""Statistics of user achievements.
+
+Achievements are loaded as columns (one numpy array per field),
+everything is calculated with vectorized operations, no Python
+objects are created per row.
+"""
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from ordnung.storage.sql import STATUS_COMPLETE
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+EPOCH_WEEKDAY = 3  # 1970-01-01 is thursday
+
+
+class Columns(NamedTuple):
+    """Achievements of the user, one array per field.
+    """
+    day: np.ndarray  # date ordinals
+    goal_id: np.ndarray
+    span_id: np.ndarray
+    status_id: np.ndarray
+    value: np.ndarray
+
+
+def make_columns(rows: Iterable[Sequence[int]]) -> Columns:
+    """Turn rows (day ordinal, goal_id, span_id, status_id, value)
+    into columns.
+    """
+    table = np.array(list(rows), dtype=np.int64)
+    table = table.reshape(-1, len(Columns._fields))
+    return Columns(*table.T)
+
+
+def get_streaks(columns: Columns) -> List[Dict[str, int]]:
+    """Current and longest run of completed achievements for every goal.
+
+    Run is broken by achievement with any other status. Streak ending
+    at each row is distance to the last break before it.
+    """
+    total = len(columns.day)
+    if not total:
+        return []
+
+    order = np.lexsort((columns.day, columns.goal_id))
+    goal_ids = columns.goal_id[order]
+    complete = columns.status_id[order] == STATUS_COMPLETE
+    index = np.arange(total)
+
+    starts = np.flatnonzero(np.r_[True, goal_ids[1:] != goal_ids[:-1]])
+    ends = np.r_[starts[1:] - 1, total - 1]
+
+    breaks = np.where(complete, -1, index)
+    breaks[starts] = np.maximum(breaks[starts], starts - 1)
+    lengths = index - np.maximum.accumulate(breaks)
+
+    return [
+        dict(goal_id=goal_id, current=current, longest=longest)
+        for goal_id, current, longest in zip(
+            goal_ids[starts].tolist(),
+            lengths[ends].tolist(),
+            np.maximum.reduceat(lengths, starts).tolist(),
+        )
+    ]
+
+
+def get_completion(columns: Columns) -> List[Dict[str, Any]]:
+    """Share of completed achievements for every span type.
+    """
+    complete = columns.status_id == STATUS_COMPLETE
+    totals = np.bincount(columns.span_id)
+    completes = np.bincount(columns.span_id, weights=complete,
+                            minlength=len(totals)).astype(np.int64)
+    span_ids = np.flatnonzero(totals)
+
+    return [
+        dict(span_id=span_id, total=total, complete=done, rate=done / total)
+        for span_id, total, done in zip(span_ids.tolist(),
+                                        totals[span_ids].tolist(),
+                                        completes[span_ids].tolist())
+    ]
+
+
+def get_rolling_rate(columns: Columns, first_day: date, last_day: date,
+                     window: int) -> List[Optional[float]]:
+    """Share of completed achievements in trailing window of days,
+    for every day in range (inclusive).
+
+    Days without achievements in window give None.
+    """
+    origin = first_day.toordinal() - window + 1
+    size = last_day.toordinal() - origin + 1
+
+    offsets = columns.day - origin
+    inside = (offsets >= 0) & (offsets < size)
+    offsets = offsets[inside]
+    complete = columns.status_id[inside] == STATUS_COMPLETE
+
+    totals = np.r_[0, np.cumsum(np.bincount(offsets, minlength=size))]
+    completes = np.r_[0, np.cumsum(np.bincount(offsets, weights=complete,
+                                               minlength=size))]
+
+    window_totals = totals[window:] - totals[:-window]
+    window_completes = completes[window:] - completes[:-window]
+    rates = window_completes / np.maximum(window_totals, 1)
+
+    return [rate if has_data else None
+            for rate, has_data in zip(rates.tolist(),
+                                      (window_totals > 0).tolist())]
+
+
+def get_histogram(columns: Columns, period: str) -> List[Dict[str, Any]]:
+    """Amount of all and completed achievements by weeks or months.
+
+    Weeks start on monday and are named by their first day.
+    """
+    days = columns.day - EPOCH_ORDINAL
+
+    if period == 'week':
+        keys = (days - (days + EPOCH_WEEKDAY) % 7).astype('datetime64[D]')
+    elif period == 'month':
+        keys = days.astype('datetime64[D]').astype('datetime64[M]')
+    else:
+        raise ValueError(f'Unknown period: {period!r}')
+
+    periods, inverse = np.unique(keys, return_inverse=True)
+    complete = columns.status_id == STATUS_COMPLETE
+    totals = np.bincount(inverse, minlength=len(periods))
+    completes = np.bincount(inverse, weights=complete,
+                            minlength=len(periods)).astype(np.int64)
+
+    return [
+        dict(period=name, total=total, complete=done)
+        for name, total, done in zip(np.datetime_as_string(periods).tolist(),
+                                     totals.tolist(), completes.tolist())
+    ]
+
+
+def get_statistics(columns: Columns, today: date, history: int,
+                   window: int) -> Dict[str, Any]:
+    """All statistics of the user, ready for serialization.
+    """
+    first_day = today - timedelta(days=history - 1)
+    return {
+        'total': len(columns.day),
+        'streaks': get_streaks(columns),
+        'completion': get_completion(columns),
+        'rolling': {
+            'first_day': first_day.isoformat(),
+            'last_day': today.isoformat(),
+            'window': window,
+            'rates': get_rolling_rate(columns, first_day, today, window),
+        },
+        'weeks': get_histogram(columns, 'week'),
+        'months': get_histogram(columns, 'month'),
+    }
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+
+"""In-process caches.
+"""
+import hashlib
+import hmac
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Set, Tuple
+
+from ordnung import settings
+from ordnung.core.access import get_monotonic
+
+
+class CredentialsCache:
+    """Remembers successfully verified credentials for a while.
+
+    Password hash check is slow by design, so we do it only once per
+    TTL for each Authorization header. Headers are never stored as is,
+    only their keyed digests.
+    """
+
+    def __init__(self, secret: str, ttl: float, max_size: int) -> None:
+        """Initialize instance.
+        """
+        self.secret = secret.encode('utf-8')
+        self.ttl = ttl
+        self.max_size = max_size
+        self._storage: 'OrderedDict[str, Tuple[int, float]]' = OrderedDict()
+        self._by_user: Dict[int, Set[str]] = {}
+
+    def __repr__(self) -> str:
+        """Textual representation.
+        """
+        return f'{type(self).__name__}(ttl={self.ttl}, size={len(self)})'
+
+    def __len__(self) -> int:
+        """Return amount of remembered credentials.
+        """
+        return len(self._storage)
+
+    def make_key(self, credentials: str) -> str:
+        """Make digest of the credentials.
+        """
+        return hmac.new(self.secret, credentials.encode('utf-8'),
+                        hashlib.sha256).hexdigest()
+
+    def get(self, credentials: str) -> Optional[int]:
+        """Return user id if these credentials were verified recently.
+        """
+        key = self.make_key(credentials)
+        record = self._storage.get(key)
+
+        if record is None:
+            return None
+
+        user_id, expires_at = record
+        if expires_at < get_monotonic():
+            self._forget(key)
+            return None
+
+        self._storage.move_to_end(key)
+        return user_id
+
+    def add(self, credentials: str, user_id: int) -> None:
+        """Remember verified credentials.
+        """
+        key = self.make_key(credentials)
+        self._forget(key)
+        self._storage[key] = (user_id, get_monotonic() + self.ttl)
+        self._by_user.setdefault(user_id, set()).add(key)
+
+        while len(self._storage) > self.max_size:
+            oldest_key = next(iter(self._storage))
+            self._forget(oldest_key)
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Forget all credentials of the user.
+        """
+        for key in self._by_user.pop(user_id, set()):
+            self._storage.pop(key, None)
+
+    def clear(self) -> None:
+        """Forget everything.
+        """
+        self._storage.clear()
+        self._by_user.clear()
+
+    def _forget(self, key: str) -> None:
+        """Remove single record.
+        """
+        record = self._storage.pop(key, None)
+
+        if record is not None:
+            user_keys = self._by_user.get(record[0])
+            if user_keys is not None:
+                user_keys.discard(key)
+                if not user_keys:
+                    del self._by_user[record[0]]
+
+
+class PageCache:
+    """Keeps rendered pages, bounded by total size in bytes.
+
+    Every user has data version, that is a part of each key. When
+    goals of the user change, version is bumped and all pages of this
+    user are dropped at once.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        """Initialize instance.
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._storage: 'OrderedDict[tuple, bytes]' = OrderedDict()
+        self._by_user: Dict[int, Set[tuple]] = {}
+        self._versions: Dict[int, int] = {}
+
+    def __repr__(self) -> str:
+        """Textual representation.
+        """
+        return (f'{type(self).__name__}(pages={len(self)}, '
+                f'size={self.size}, max_bytes={self.max_bytes})')
+
+    def __len__(self) -> int:
+        """Return amount of stored pages.
+        """
+        return len(self._storage)
+
+    def get_version(self, user_id: int) -> int:
+        """Return current data version of the user.
+        """
+        return self._versions.get(user_id, 0)
+
+    def make_key(self, user_id: int, *args: Hashable) -> tuple:
+        """Make key for the page of the user.
+        """
+        return (user_id, self.get_version(user_id), *args)
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        """Return stored page or None.
+        """
+        body = self._storage.get(key)
+
+        if body is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._storage.move_to_end(key)
+        return body
+
+    def add(self, key: tuple, body: bytes) -> None:
+        """Store rendered page.
+        """
+        if key[1] != self.get_version(key[0]) or len(body) > self.max_bytes:
+            # data has changed while page was rendered or page is too big
+            return
+
+        self._forget(key)
+        self._storage[key] = body
+        self._by_user.setdefault(key[0], set()).add(key)
+        self.size += len(body)
+
+        while self.size > self.max_bytes:
+            oldest_key = next(iter(self._storage))
+            self._forget(oldest_key)
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Bump data version of the user and drop all the user's pages.
+        """
+        self._versions[user_id] = self.get_version(user_id) + 1
+        for key in self._by_user.pop(user_id, set()):
+            self.size -= len(self._storage.pop(key, b''))
+
+    def clear(self) -> None:
+        """Forget everything.
+        """
+        self._storage.clear()
+        self._by_user.clear()
+        self.size = 0
+
+    def statistics(self) -> Dict[str, int]:
+        """Return current state of the cache.
+        """
+        return {
+            'pages': len(self),
+            'size': self.size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+    def _forget(self, key: tuple) -> None:
+        """Remove single page.
+        """
+        body = self._storage.pop(key, None)
+
+        if body is not None:
+            self.size -= len(body)
+            user_keys = self._by_user.get(key[0])
+            if user_keys is not None:
+                user_keys.discard(key)
+                if not user_keys:
+                    del self._by_user[key[0]]
+
+
+credentials_cache = CredentialsCache(
+    secret=settings.SECRET_KEY or '',
+    ttl=settings.AUTH_CACHE_TTL,
+    max_size=settings.AUTH_CACHE_SIZE,
+)
+
+page_cache = PageCache(max_bytes=settings.PAGE_CACHE_SIZE)
@@ -3,17 +3,30 @@
 """Tools, related to time operations.
 """
 from datetime import date, timedelta
-from typing import Tuple, List, Dict, Generator
+from functools import lru_cache
+from typing import Tuple, List, Dict, NamedTuple, Optional, Iterator
 
 from ordnung import settings
 from ordnung.core.access import get_today
-from ordnung.storage.database import session
+from ordnung.core.recurrence import expand_goals, iter_range
+from ordnung.storage.access import get_candidate_goals
+from ordnung.storage.achievements import Progress, get_progress
 from ordnung.storage.models import Goal
+from ordnung.storage.occurrences import (
+    covers, get_materialized_goals, iter_materialized_goals
+)
+
+Goals = Dict[date, List[Goal]]
 
 
 class Day:
     """Representation of a single day in month table.
+
+    Days are shared between requests, so they hold only
+    things that follow from the date itself.
     """
+    __slots__ = ('origin_date', 'date', 'weekday', 'number', 'month',
+                 'year', 'is_today', 'is_weekend', 'css_class')
 
     def __init__(self, current_date: date, is_today: bool = False) -> None:
         """Initialize instance.
@@ -26,14 +39,14 @@ class Day:
         self.year = current_date.year
         self.is_today = is_today
         self.is_weekend = self.weekday in settings.WEEKENDS
+        self.css_class = self.make_css_class()
 
     def __repr__(self) -> str:
         """Textual representation.
         """
         return f'{type(self).__name__}({self.date})'
 
-    @property
-    def css_class(self) -> str:
+    def make_css_class(self) -> str:
         """Form visualisation class.
         """
         css_class = 'day'
@@ -46,51 +59,139 @@ class Day:
 
         return css_class
 
-    def goals(self):
-        """Enlist goals for this day.
-        """
-        return session.query(Goal).filter_by(target_date=self.origin_date).all()
+
+class Grid(NamedTuple):
+    """Immutable skeleton of the month table.
+    """
+    days: Tuple[Day, ...]
+    weeks: Tuple[Tuple[Day, ...], ...]
+    days_dict: Dict[str, Day]
+    today_index: int
 
 
 class Month:
     """Container for Days.
+
+    Grid of days is shared, goals and holidays are overlaid for each request.
     """
+    __slots__ = ('origin_date', 'current_date', 'grid',
+                 '_goals', '_holidays', '_progress')
 
-    def __init__(self, current_date: date) -> None:
+    def __init__(self, current_date: date, grid: Grid) -> None:
         """Initialize instance.
         """
         self.origin_date = current_date
         self.current_date = str(current_date)
-        self.days_list: List[Day] = []
-        self.days_dict: Dict[str, Day] = {}
-        self.today_index = 0
+        self.grid = grid
+        self._goals: Goals = {}
+        self._holidays: Dict[date, str] = {}
+        self._progress: Dict[int, Progress] = {}
 
     def __repr__(self) -> str:
         """Textual representation.
         """
         return (f'{type(self).__name__}'
-                f'<{self.days_list[0:1]}..{self.days_list[-2:-1]}>')
+                f'<{self.grid.days[0:1]}..{self.grid.days[-2:-1]}>')
+
+    def __getitem__(self, item: str) -> Day:
+        return self.grid.days_dict[item]
+
+    @property
+    def days_list(self) -> Tuple[Day, ...]:
+        """All days of the month in order.
+        """
+        return self.grid.days
+
+    @property
+    def today_index(self) -> int:
+        """Position of today in the month (-1 if it is not here).
+        """
+        return self.grid.today_index
+
+    @property
+    def first_day(self) -> date:
+        """Date of the first day in table.
+        """
+        return self.grid.days[0].origin_date
+
+    @property
+    def last_day(self) -> date:
+        """Date of the last day in table.
+        """
+        return self.grid.days[-1].origin_date
+
+    def load_goals(self, user_id: int) -> None:
+        """Fetch goals for all days of the month in single request.
+
+        Previously each Day went to DB on its own, so we had to make
+        35 requests just to render one month.
+        """
+        self._goals = load_goals(self.first_day, self.last_day, user_id)
+        self._progress = get_progress({goal.id
+                                       for goals in self._goals.values()
+                                       for goal in goals})
 
-    def __getitem__(self, item):
-        return self.days_dict[item]
+    def goals(self, day: Day) -> List[Goal]:
+        """Enlist goals for given day.
+        """
+        return self._goals.get(day.origin_date, [])
+
+    def progress(self, goal: Goal) -> Optional[Progress]:
+        """Get running totals of the goal.
+        """
+        return self._progress.get(goal.id)
 
-    def add_day(self, new_day: Day):
-        """Put day in month. Created to fill days_dict.
+    def set_holidays(self, holidays: Dict[date, str]) -> None:
+        """Overlay holidays on the month.
         """
-        position = len(self.days_list)
-        self.days_list.append(new_day)
-        self.days_dict[new_day.date] = new_day
+        self._holidays = holidays
 
-        if new_day.is_today:
-            self.today_index = position
+    def holiday(self, day: Day) -> Optional[str]:
+        """Get name of the holiday on given day.
+        """
+        return self._holidays.get(day.origin_date)
 
-    def weeks(self) -> Generator[List[Day], None, None]:
-        """Iterate over weeks.
+    def weeks(self) -> Tuple[Tuple[Day, ...], ...]:
+        """Get days, split by weeks.
         """
-        top_level = settings.MONTH_LENGTH + 1 - settings.WEEK_LENGTH
-        for i in range(0, top_level, settings.WEEK_LENGTH):
-            sector = slice(i, i + settings.WEEK_LENGTH)
-            yield self.days_list[sector]
+        return self.grid.weeks
+
+
+def load_goals(first_day: date, last_day: date, user_id: int) -> Goals:
+    """Get goals of the user for all days in range.
+
+    Dates inside of materialized window are just read from occurrences
+    table. Otherwise database gives us only candidate goals and recurring
+    spans are expanded into concrete dates on our side.
+    """
+    if covers(first_day, last_day):
+        buckets: Goals = {}
+        for event_date, goal in get_materialized_goals(user_id, first_day,
+                                                       last_day):
+            buckets.setdefault(event_date, []).append(goal)
+        return buckets
+
+    goals = get_candidate_goals(user_id, first_day, last_day)
+    return expand_goals(goals, first_day, last_day)
+
+
+def iter_goals(first_day: date, last_day: date,
+               user_id: int) -> Iterator[Tuple[date, Goal]]:
+    """Iterate over pairs date-goal of the user in any range.
+
+    Range is never loaded as a whole, so memory consumption
+    does not depend on its length.
+    """
+    if covers(first_day, last_day):
+        yield from iter_materialized_goals(user_id, first_day, last_day)
+        return
+
+    for window in iter_windows(first_day, last_day,
+                               settings.API_CHUNK_DAYS):
+        goals = load_goals(*window, user_id)
+        for cur_date in iter_range(*window):
+            for goal in goals.get(cur_date, []):
+                yield cur_date, goal
 
 
 def get_offset_dates(target_date: date) -> Tuple[date, date, date, date]:
@@ -115,7 +216,31 @@ def get_offset_dates(target_date: date) -> Tuple[date, date, date, date]:
     return leap_back, step_back, step_forward, leap_forward
 
 
-def get_month(current_date: date) -> Month:
+@lru_cache(maxsize=settings.MONTH_GRID_CACHE_SIZE)
+def get_grid(current_date: date, today: date) -> Grid:
+    """Make skeleton of the month table.
+
+    Result depends only on arguments, so it is made once and shared.
+    """
+    weekday = current_date.weekday()
+    index = settings.WEEK_LENGTH * 2 + weekday
+    first_day = current_date - timedelta(days=index)
+
+    days = tuple(
+        Day(actual_date, is_today=actual_date == today)
+        for actual_date in (first_day + timedelta(days=day_number)
+                            for day_number in range(settings.MONTH_LENGTH))
+    )
+    weeks = tuple(
+        days[i:i + settings.WEEK_LENGTH]
+        for i in range(0, settings.MONTH_LENGTH, settings.WEEK_LENGTH)
+    )
+    days_dict = {day.date: day for day in days}
+    today_index = next((i for i, day in enumerate(days) if day.is_today), -1)
+    return Grid(days, weeks, days_dict, today_index)
+
+
+def get_month(current_date: date, today: Optional[date] = None) -> Month:
     """Form contents for the main table.
 
     Example output:
@@ -127,21 +252,23 @@ def get_month(current_date: date) -> Month:
             ...
         )
     """
-    weekday = current_date.weekday()
-    index = settings.WEEK_LENGTH * 2 + weekday
-    days_total = settings.WEEK_LENGTH * settings.WEEKS_IN_MONTH
-
-    month = Month(current_date)
-    for day_number in range(days_total):
-        actual_date = current_date + timedelta(days=day_number - index)
-        new_day = Day(actual_date, is_today=day_number == index)
-        month.add_day(new_day)
+    if today is None:
+        today = get_today()
+    return Month(current_date, get_grid(current_date, today))
 
-    return month
 
+def iter_windows(first_day: date, last_day: date,
+                 size: int) -> Iterator[Tuple[date, date]]:
+    """Split range into consecutive windows of given size (inclusive).
 
-def get_day(current_date: date, is_today: bool) -> Day:
-    return Day(current_date, is_today)
+    Example output:
+        (date(2020, 1, 1), date(2020, 1, 31)), (date(2020, 2, 1), ...
+    """
+    start = first_day
+    while start <= last_day:
+        stop = min(start + timedelta(days=size - 1), last_day)
+        yield start, stop
+        start = stop + timedelta(days=1)
 
 
 def get_time_variants() -> List[Tuple[str, str]]:
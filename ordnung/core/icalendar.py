@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+"""Minimal iCalendar (RFC 5545) writer and reader.
+
+Only things we actually need are supported: all-day and timed
+events without time zones.
+"""
+import re
+from datetime import date, datetime, time, timezone
+from typing import Dict, Iterator, List, Optional
+
+CRLF = '\r\n'
+MAX_LINE_LENGTH = 75  # octets, without line break
+PRODUCT_ID = '-//Ordnung//Ordnung calendar//EN'
+
+CALENDAR_HEADER = CRLF.join([
+    'BEGIN:VCALENDAR',
+    'VERSION:2.0',
+    f'PRODID:{PRODUCT_ID}',
+    'CALSCALE:GREGORIAN',
+]) + CRLF
+CALENDAR_FOOTER = 'END:VCALENDAR' + CRLF
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def escape_text(text: str) -> str:
+    """Escape special characters of TEXT value.
+    """
+    return (text.replace('\\', '\\\\')
+            .replace(';', '\\;')
+            .replace(',', '\\,')
+            .replace('\r\n', '\\n')
+            .replace('\n', '\\n'))
+
+
+def unescape_text(text: str) -> str:
+    """Reverse escape_text.
+    """
+    replacements = {'n': '\n', 'N': '\n', '\\': '\\', ';': ';', ',': ','}
+    return re.sub(r'\\(.)',
+                  lambda match: replacements.get(match.group(1),
+                                                 match.group(0)),
+                  text)
+
+
+def unfold_lines(text: str) -> List[str]:
+    """Join continuation lines back.
+    """
+    return re.sub(r'\r?\n[ \t]', '', text).splitlines()
+
+
+def iter_events(text: str) -> Iterator[Dict[str, str]]:
+    """Iterate over VEVENT components as dicts property -> raw value.
+
+    Property parameters are dropped, so DTSTART;VALUE=DATE is DTSTART.
+    """
+    event = None
+
+    for line in unfold_lines(text):
+        name, _, value = line.partition(':')
+        name = name.split(';', 1)[0].upper()
+
+        if name == 'BEGIN' and value.upper() == 'VEVENT':
+            event = {}
+        elif name == 'END' and value.upper() == 'VEVENT':
+            if event is not None:
+                yield event
+            event = None
+        elif event is not None and name not in event:
+            event[name] = value
+
+
+def parse_date(value: str) -> date:
+    """Take date part of DATE or DATE-TIME value.
+    """
+    return datetime.strptime(value[:8], '%Y%m%d').date()
+
+
+def fold_line(line: str) -> str:
+    """Split long content line into several ones.
+
+    Lines are limited in octets, so multibyte
+    characters are never cut in the middle.
+    """
+    if len(line.encode('utf-8')) <= MAX_LINE_LENGTH:
+        return line + CRLF
+
+    parts = []
+    current = ''
+    limit = MAX_LINE_LENGTH
+
+    for char in line:
+        if len((current + char).encode('utf-8')) > limit:
+            parts.append(current)
+            current = ''
+            limit = MAX_LINE_LENGTH - 1  # leading space of continuation
+        current += char
+
+    parts.append(current)
+    return (CRLF + ' ').join(parts) + CRLF
+
+
+def format_date(value: date) -> str:
+    """Format DATE value.
+    """
+    return value.strftime('%Y%m%d')
+
+
+def format_datetime(value: datetime) -> str:
+    """Format floating DATE-TIME value.
+    """
+    return value.strftime('%Y%m%dT%H%M%S')
+
+
+def format_utc_datetime(value: datetime) -> str:
+    """Format DATE-TIME value in UTC, as DTSTAMP requires.
+
+    Naive values are taken as local time of the server.
+    """
+    return value.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def make_event(uid: str, event_date: date, summary: str,
+               description: str = '', event_time: Optional[time] = None,
+               stamp: Optional[datetime] = None,
+               extra: Optional[List[str]] = None) -> str:
+    """Make VEVENT component.
+
+    Events without time are all-day ones.
+    """
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:{uid}',
+        f'DTSTAMP:{format_utc_datetime(stamp or EPOCH)}',
+    ]
+
+    if event_time is None:
+        lines.append(f'DTSTART;VALUE=DATE:{format_date(event_date)}')
+    else:
+        start = datetime.combine(event_date, event_time)
+        lines.append(f'DTSTART:{format_datetime(start)}')
+
+    lines.append(f'SUMMARY:{escape_text(summary)}')
+
+    if description:
+        lines.append(f'DESCRIPTION:{escape_text(description)}')
+
+    lines.extend(extra or [])
+    lines.append('END:VEVENT')
+    return ''.join(fold_line(line) for line in lines)
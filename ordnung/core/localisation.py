@@ -2,8 +2,10 @@
 
 """Core language processing.
 """
+from collections import Counter
 from functools import lru_cache
-from typing import List, Tuple
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
 
 from ordnung import settings
 from ordnung.core.vocabulary import (
@@ -11,6 +13,54 @@ from ordnung.core.vocabulary import (
 )
 from ordnung.storage.access import get_span_types, get_status_types
 
+Catalog = Mapping[str, str]
+# word without trailing underscores -> its forms by amount of underscores
+Fallbacks = Mapping[str, Tuple[Optional[str], ...]]
+
+# (lang, sentence or key) -> how many times translation was not found
+MISSES: Counter = Counter()
+
+
+def compile_catalogs(vocabulary: dict) -> Mapping[str, Catalog]:
+    """Make flat read-only per-language dictionaries from vocabulary.
+    """
+    return MappingProxyType({
+        lang: MappingProxyType(dict(sentences))
+        for lang, sentences in vocabulary.items()
+    })
+
+
+def compile_fallbacks(catalog: Catalog) -> Fallbacks:
+    """Resolve special forms of every word beforehand.
+
+    Form that is not defined falls back to the one with less
+    trailing underscores, e.g. 'month_1' and 'month_1_' give
+    ('Январь', 'января'). Forms with more underscores than
+    defined take the last one.
+    """
+    forms: Dict[str, Dict[int, str]] = {}
+    for key, value in catalog.items():
+        base = key.rstrip('_')
+        forms.setdefault(base, {})[len(key) - len(base)] = value
+
+    fallbacks = {}
+    for base, known in forms.items():
+        resolved: List[Optional[str]] = []
+        for number in range(max(known) + 1):
+            resolved.append(known.get(number,
+                                      resolved[-1] if resolved else None))
+        fallbacks[base] = tuple(resolved)
+
+    return MappingProxyType(fallbacks)
+
+
+STATIC_CATALOGS = compile_catalogs(get_static_vocabulary())
+DYNAMIC_CATALOGS = compile_catalogs(get_dynamic_vocabulary())
+DYNAMIC_FALLBACKS = MappingProxyType({
+    lang: compile_fallbacks(catalog)
+    for lang, catalog in DYNAMIC_CATALOGS.items()
+})
+
 
 def gettext(lang: str, sentence: str) -> str:
     """Translate message and return it as a string.
@@ -21,22 +71,28 @@ def gettext(lang: str, sentence: str) -> str:
     >>> gettext('RU', 'January')
     'Январь'
     """
-    if lang == 'EN':
-        translation = sentence
+    if lang == settings.SOURCE_LANG:
+        return sentence
 
-    elif (vocabulary := get_static_vocabulary().get(lang)) is None:
-        translation = sentence
+    catalog = STATIC_CATALOGS.get(lang)
+    if catalog is None:
+        return sentence
+
+    translation = catalog.get(sentence)
+    if translation is None:
+        MISSES[(lang, sentence)] += 1
+        return sentence
 
-    elif (translation := vocabulary.get(sentence)) is None:
-        translation = sentence
-    if sentence == translation:
-        print(sentence, '--->', translation)
     return translation
 
 
 def translate(lang: str, key: str) -> str:
     """Search for translation in the vocabulary and substitute its value.
 
+    Trailing underscores mark special forms of the word, if there is
+    no such form, we fall back to the simpler one (resolved beforehand,
+    see compile_fallbacks).
+
     >>> translate('RU', 'month_1')
     'Январь'
     >>> translate('EN', 'month_1')
@@ -44,17 +100,27 @@ def translate(lang: str, key: str) -> str:
     >>> translate('EN', 'lol')
     '???'
     """
-    if (vocabulary := get_dynamic_vocabulary().get(lang)) is None:
-        vocabulary = get_dynamic_vocabulary().get(settings.DEFAULT_LANG)
+    known_lang = lang if lang in DYNAMIC_CATALOGS else settings.SOURCE_LANG
 
-    while (translation := vocabulary.get(key)) is None:
-        if key.endswith('_'):
-            key = key[:-1]
-        else:
-            translation = settings.DEFAULT_PLACEHOLDER
-            break
+    translation = DYNAMIC_CATALOGS[known_lang].get(key)
+    if translation is not None:
+        return translation
 
-    return translation
+    base = key.rstrip('_')
+    forms = DYNAMIC_FALLBACKS[known_lang].get(base)
+    if forms:
+        translation = forms[min(len(key) - len(base), len(forms) - 1)]
+        if translation is not None:
+            return translation
+
+    MISSES[(lang, key)] += 1
+    return settings.DEFAULT_PLACEHOLDER
+
+
+def get_misses(limit: int = 100) -> List[Tuple[Tuple[str, str], int]]:
+    """Get most frequent translation misses.
+    """
+    return MISSES.most_common(limit)
 
 
 @lru_cache(maxsize=1000)
@@ -1,80 +1,84 @@
 # -*- coding: utf-8 -*-
 
 """Records handling tools.
+
+Records are rows of the recurrence request, they are never copied,
+only placed into buckets. Rows give access both by attribute and by
+column name, so they could be used in templates as dicts.
 """
-from datetime import date, timedelta
-from typing import List, Dict, Callable
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, List
 
-Records = Dict[str, List[dict]]
+Row = Any  # sqlalchemy RowProxy or any other named tuple
+Records = Dict[str, List[Row]]
 
 
-def sort_by_persistence(raw_record: dict) -> int:
-    """Key function, created to sort by persistence_id.
+def sort_by_persistence(record: Row) -> int:
+    """Key function, created to sort by span_id.
     """
-    return raw_record.get('persistence_id', 999)
+    return record.span_id or 999
 
 
-def organize_records(all_records, target_date: date, offset_left: int,
-                     offset_right: int) -> Records:
+def organize_records(all_records: Iterable[Row], target_date: date,
+                     offset_left: int, offset_right: int,
+                     dedupe: bool = False) -> Records:
     """Split all records into dictionary.
 
-    Date as a key and list of records as value.
+    Date as a key and list of records as value. All dates in range
+    are presented in the dictionary, even without records.
+
+    Rows are put into preallocated lists by integer day offset.
+    Recurrence request can not give duplicates (span predicates are
+    disjoint), so deduplication by id is made only if dedupe is True.
 
     Example output:
     {
         '2020-05-08':
         [
-            {
-                'id': 9,
-                'cur_date': datetime.date(2020, 5, 8),
-                'first_day': datetime.date(2020, 5, 8),
-                'last_day': datetime.date(2020, 6, 17),
-                'text': 'text',
-                'persistence_id': 3,
-                'start_date': datetime.date(2020, 5, 1),
-                'end_date': None,
-                'target_date': datetime.date(2020, 5, 19),
+            Row(
+                id=9,
+                cur_date=datetime.date(2020, 5, 8),
+                title='text',
+                span_id=3,
+                actual_from=datetime.datetime(2020, 5, 1, 0, 0),
+                actual_to=None,
+                target_date=datetime.date(2020, 5, 19),
                 ...
-            }
+            )
         ]
     }
     """
-    start = target_date - timedelta(days=offset_left)
-    stop = target_date + timedelta(days=offset_right)
-
-    records = {}
-    cur_date = start
-    while cur_date <= stop:
-        # We can use defaultdict here, but actual goal is to
-        # ensure that all dates are presented in the dictionary
-        records[str(cur_date)] = []
-        cur_date += timedelta(days=1)
-
-    duplicates = set()
-    for record in all_records:
-        record_as_dict = {column: value for column, value in record.items()}
+    first_ordinal = target_date.toordinal() - offset_left
+    total_days = offset_left + offset_right + 1
+    buckets: List[List[Row]] = [[] for _ in range(total_days)]
 
-        id_ = record_as_dict['id']
-        key = (id_, record.cur_date)
+    for record in all_records:
+        offset = record.cur_date.toordinal() - first_ordinal
 
-        if str(record.cur_date) not in records:
+        if not 0 <= offset < total_days:
             raise ValueError(f'Date {record.cur_date} is not '
-                             f'found in record {record_as_dict}')
+                             f'found in record {record}')
 
-        if key not in duplicates:
-            records[str(record.cur_date)].append(record_as_dict)
-            duplicates.add(key)
+        buckets[offset].append(record)
 
-    return records
+    if dedupe:
+        for number, bucket in enumerate(buckets):
+            seen = set()
+            buckets[number] = [record for record in bucket
+                               if record.id not in seen
+                               and not seen.add(record.id)]
+
+    return {
+        date.fromordinal(first_ordinal + offset).isoformat(): bucket
+        for offset, bucket in enumerate(buckets)
+    }
 
 
 def sort_nested_records(records: Records,
                         sorter: Callable = sort_by_persistence) -> Records:
-    """Sort dictionary with records by given sorter.
+    """Sort dictionary with records by given sorter (in place).
     """
-    sorted_records = {}
+    for day_records in records.values():
+        day_records.sort(key=sorter)
 
-    for day_date, day_records in records.items():
-        sorted_records[day_date] = sorted(day_records, key=sorter)
-
-    return sorted_records
+    return records
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+
+"""Recurrence expansion tools.
+
+Turns goals with repeating spans into concrete dates. Everything here
+is plain date arithmetic, so database only has to give us candidate
+goals for the user, without scanning every date against every row.
+"""
+from calendar import monthrange
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from ordnung.storage.sql import (
+    ONCE, UNTIL_COMPLETE, EVERY_DAY, EVERY_WEEK, EVERY_ODD_WEEK,
+    EVERY_EVEN_WEEK, FIRST_DAY_OF_MONTH, LAST_DAY_OF_MONTH, EVERY_MONTH,
+    EVERY_YEAR
+)
+
+ONE_DAY = timedelta(days=1)
+ONE_WEEK = timedelta(days=7)
+FIRST_OCCURRENCE_SEARCH = timedelta(days=366 * 8)  # enough for February 29
+TWO_WEEKS = timedelta(days=14)
+WEEKDAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+
+
+class Segment(NamedTuple):
+    """Part of the goal schedule, expressible by single recurrence rule.
+    """
+    first_date: date
+    rrule: Optional[str]
+    last_date: Optional[date]
+
+
+def as_date(moment: Optional[Any]) -> Optional[date]:
+    """Cut datetime down to date, leave dates and None as is.
+    """
+    if isinstance(moment, datetime):
+        return moment.date()
+    return moment
+
+
+def get_bounds(goal, first_day: date,
+               last_day: date) -> Optional[tuple]:
+    """Intersect search window with goal actuality window.
+
+    Returns None if they do not intersect at all.
+    """
+    actual_from = as_date(goal.actual_from)
+    actual_to = as_date(goal.actual_to)
+
+    start = max(first_day, actual_from) if actual_from else first_day
+    stop = min(last_day, actual_to) if actual_to else last_day
+
+    if start > stop:
+        return None
+    return start, stop
+
+
+def iter_weekly(start: date, stop: date, weekday: int) -> Iterator[date]:
+    """Iterate over all dates with given weekday.
+    """
+    cur_date = start + timedelta(days=(weekday - start.weekday()) % 7)
+    while cur_date <= stop:
+        yield cur_date
+        cur_date += ONE_WEEK
+
+
+def iter_monthly(start: date, stop: date,
+                 day: Optional[int]) -> Iterator[date]:
+    """Iterate over all dates with given day of month.
+
+    Months that are too short for this day are skipped.
+    None as day means last day of month.
+    """
+    year, month = start.year, start.month
+
+    while (year, month) <= (stop.year, stop.month):
+        days_in_month = monthrange(year, month)[1]
+        actual_day = days_in_month if day is None else day
+
+        if actual_day <= days_in_month:
+            cur_date = date(year, month, actual_day)
+            if start <= cur_date <= stop:
+                yield cur_date
+
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+
+
+def iter_yearly(start: date, stop: date, month: int,
+                day: int) -> Iterator[date]:
+    """Iterate over all dates with given month and day.
+
+    February 29 only happens in leap years.
+    """
+    for year in range(start.year, stop.year + 1):
+        if day > monthrange(year, month)[1]:
+            continue
+
+        cur_date = date(year, month, day)
+        if start <= cur_date <= stop:
+            yield cur_date
+
+
+def iter_range(start: date, stop: date) -> Iterator[date]:
+    """Iterate over all dates between start and stop (inclusive).
+    """
+    cur_date = start
+    while cur_date <= stop:
+        yield cur_date
+        cur_date += ONE_DAY
+
+
+def get_occurrences(goal, first_day: date, last_day: date) -> Iterator[date]:
+    """Iterate over all dates when goal should be shown.
+
+    Dates are yielded in ascending order and never leave search window.
+    """
+    span_id = goal.span_id
+    target_date = goal.target_date
+
+    if span_id in (ONCE, UNTIL_COMPLETE):
+        # hard linked to date, actuality window does not matter here,
+        # incomplete goals are moved forward by rollover job
+        if target_date is not None and first_day <= target_date <= last_day:
+            yield target_date
+        return
+
+    bounds = get_bounds(goal, first_day, last_day)
+    if bounds is None:
+        return
+    start, stop = bounds
+
+    if span_id == EVERY_DAY:
+        yield from iter_range(start, stop)
+
+    elif target_date is None and span_id not in (FIRST_DAY_OF_MONTH,
+                                                 LAST_DAY_OF_MONTH):
+        # every other span is anchored to the target date
+        return
+
+    elif span_id == EVERY_WEEK:
+        yield from iter_weekly(start, stop, target_date.weekday())
+
+    elif span_id in (EVERY_ODD_WEEK, EVERY_EVEN_WEEK):
+        parity = 1 if span_id == EVERY_ODD_WEEK else 0
+        for cur_date in iter_weekly(start, stop, target_date.weekday()):
+            # years with 53 weeks break simple alternation, so check each
+            if cur_date.isocalendar()[1] % 2 == parity:
+                yield cur_date
+
+    elif span_id == FIRST_DAY_OF_MONTH:
+        yield from iter_monthly(start, stop, 1)
+
+    elif span_id == LAST_DAY_OF_MONTH:
+        yield from iter_monthly(start, stop, None)
+
+    elif span_id == EVERY_MONTH:
+        yield from iter_monthly(start, stop, target_date.day)
+
+    elif span_id == EVERY_YEAR:
+        yield from iter_yearly(start, stop, target_date.month,
+                               target_date.day)
+
+
+def get_first_occurrence(goal) -> Optional[date]:
+    """Get the earliest date when goal should be shown.
+    """
+    candidates = [day for day in (as_date(goal.actual_from), goal.target_date)
+                  if day is not None]
+    if not candidates:
+        return None
+    start = min(candidates)
+    occurrences = get_occurrences(goal, start, start + FIRST_OCCURRENCE_SEARCH)
+    return next(occurrences, None)
+
+
+def get_last_day(goal) -> Optional[date]:
+    """Get the date after which goal is never shown, None if it is endless.
+    """
+    if goal.span_id == UNTIL_COMPLETE:
+        return goal.target_date
+    return as_date(goal.actual_to)
+
+
+def get_rrule(goal) -> Optional[str]:
+    """Express span of the goal as iCalendar recurrence rule (RFC 5545).
+
+    Returns None for goals that happen only once or could not be
+    expressed by single rule. Rule is given without UNTIL part,
+    it depends on the type of DTSTART.
+    """
+    span_id = goal.span_id
+    target_date = goal.target_date
+
+    if span_id == EVERY_DAY:
+        return 'FREQ=DAILY'
+
+    if span_id == FIRST_DAY_OF_MONTH:
+        return 'FREQ=MONTHLY;BYMONTHDAY=1'
+
+    if span_id == LAST_DAY_OF_MONTH:
+        return 'FREQ=MONTHLY;BYMONTHDAY=-1'
+
+    if target_date is None:
+        return None
+
+    weekday = WEEKDAYS[target_date.weekday()]
+
+    if span_id == EVERY_WEEK:
+        return f'FREQ=WEEKLY;BYDAY={weekday}'
+
+    if span_id == EVERY_MONTH:
+        # months without this day are skipped, same as in iter_monthly
+        return f'FREQ=MONTHLY;BYMONTHDAY={target_date.day}'
+
+    if span_id == EVERY_YEAR:
+        return (f'FREQ=YEARLY;BYMONTH={target_date.month};'
+                f'BYMONTHDAY={target_date.day}')
+
+    return None
+
+
+def get_segments(goal, horizon: date) -> List[Segment]:
+    """Split schedule of the goal into parts with single rule for each.
+
+    Most spans need only one. Odd and even weeks follow ISO week
+    parity, which breaks simple alternation after each year with
+    53 weeks, so they are split into biweekly runs up to horizon.
+    """
+    first_date = get_first_occurrence(goal)
+    if first_date is None:
+        return []
+
+    if goal.span_id not in (EVERY_ODD_WEEK, EVERY_EVEN_WEEK):
+        return [Segment(first_date, get_rrule(goal), get_last_day(goal))]
+
+    last_day = min(get_last_day(goal) or horizon, horizon)
+    segments = []
+    run_start = run_stop = None
+
+    for cur_date in get_occurrences(goal, first_date, last_day):
+        if run_stop is not None and cur_date - run_stop != TWO_WEEKS:
+            segments.append(Segment(run_start, None, run_stop))
+            run_start = None
+
+        if run_start is None:
+            run_start = cur_date
+        run_stop = cur_date
+
+    if run_start is not None:
+        segments.append(Segment(run_start, None, run_stop))
+
+    weekday = WEEKDAYS[first_date.weekday()]
+    return [
+        segment._replace(rrule=f'FREQ=WEEKLY;INTERVAL=2;BYDAY={weekday}')
+        if segment.first_date != segment.last_date else segment
+        for segment in segments
+    ]
+
+
+def sort_by_span(goal) -> tuple:
+    """Key function, created to sort goals by span_id.
+    """
+    return goal.span_id or 999, goal.id
+
+
+def expand_goals(goals: Iterable, first_day: date,
+                 last_day: date) -> Dict[date, List]:
+    """Split goals into dictionary with date as a key.
+
+    All dates in range are presented in the output, even without goals.
+
+    Example output:
+    {
+        datetime.date(2020, 5, 8): [Goal(id=1), Goal(id=9)],
+        datetime.date(2020, 5, 9): [],
+        ...
+    }
+    """
+    buckets: Dict[date, List] = {
+        cur_date: [] for cur_date in iter_range(first_day, last_day)
+    }
+
+    for goal in goals:
+        for cur_date in get_occurrences(goal, first_day, last_day):
+            buckets[cur_date].append(goal)
+
+    for day_goals in buckets.values():
+        day_goals.sort(key=sort_by_span)
+
+    return buckets
@@ -2,11 +2,13 @@
 
 """Tools that rely on request contents.
 """
+import hashlib
 from datetime import date, datetime
-from functools import partial
-from typing import Callable, List
+from functools import partial, lru_cache
+from typing import Callable, List, Optional
 
 from starlette.requests import Request
+from starlette.responses import Response
 
 from ordnung import settings
 from ordnung.core.access import get_today
@@ -21,6 +23,22 @@ def get_lang(request: Request) -> str:
     return extract_language(request)
 
 
+def get_country_id(request: Request) -> Optional[int]:
+    """Extract user country from request.
+    """
+    if request.user.is_authenticated:
+        return request.user.parameters.country_id
+    return None
+
+
+def get_timezone(request: Request) -> Optional[str]:
+    """Extract user timezone from request.
+    """
+    if request.user.is_authenticated:
+        return request.user.parameters.timezone
+    return None
+
+
 def extract_language(request: Request) -> str:
     """Extract user language from any part of request we could search for.
     """
@@ -28,18 +46,22 @@ def extract_language(request: Request) -> str:
     return settings.DEFAULT_LANG
 
 
+@lru_cache(maxsize=1000)
 def get_gettext(lang: str) -> Callable:
     """Make closure with gettext function.
 
     We're using primitive localisation system, so no magic here.
+    Closure is made once per language.
     """
     return partial(gettext, lang)
 
 
+@lru_cache(maxsize=1000)
 def get_translate(lang: str) -> Callable:
     """Make closure with translate function.
 
     We're using primitive localisation system, so no magic here.
+    Closure is made once per language.
     """
     return partial(translate, lang)
 
@@ -53,14 +75,22 @@ async def get_date(request: Request) -> date:
     string = request.path_params.get('date')
 
     if string is None:
-        target_date = get_today()
+        target_date = get_today(get_timezone(request))
 
     else:
-        target_date = datetime.strptime(string, "%Y-%m-%d").date()
+        target_date = parse_date(string)
 
     return target_date
 
 
+def parse_date(string: str) -> date:
+    """Convert textual representation into date.
+
+    Raises ValueError on malformed input.
+    """
+    return datetime.strptime(string, "%Y-%m-%d").date()
+
+
 async def get_errors(gettext_callable: Callable,
                      errors_dict: dict) -> List[str]:
     """Extract errors from WTForm.
@@ -75,3 +105,27 @@ async def get_errors(gettext_callable: Callable,
             errors.append(f'<strong>{name}</strong><br>{description}')
 
     return errors
+
+
+def make_etag(*parts) -> str:
+    """Make weak entity tag out of anything that affects the page.
+    """
+    digest = hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+    return f'W/"{digest[:20]}"'
+
+
+def get_not_modified(request: Request, etag: str) -> Optional[Response]:
+    """Return 304 response if client already has this version of the page.
+    """
+    if_none_match = request.headers.get('if-none-match', '')
+    tags = {tag.strip() for tag in if_none_match.split(',')}
+
+    if etag in tags or '*' in tags:
+        return Response(status_code=304, headers=get_etag_headers(etag))
+    return None
+
+
+def get_etag_headers(etag: str) -> dict:
+    """Headers that make browser revalidate page on each visit.
+    """
+    return {'ETag': etag, 'Cache-Control': 'private, no-cache'}
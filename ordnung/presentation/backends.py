@@ -8,9 +8,12 @@ import binascii
 from starlette.authentication import (
     AuthCredentials, AuthenticationError, AuthenticationBackend
 )
+from starlette.concurrency import run_in_threadpool
 from starlette.requests import Request
 
-from ordnung.storage.access import get_user_by_login
+from ordnung.core.caching import credentials_cache
+from ordnung.storage.access import get_user_by_login, get_user_by_id
+from ordnung.storage.database import run_in_db_thread
 
 
 class OrdnungAuthBackend(AuthenticationBackend):
@@ -19,10 +22,19 @@ class OrdnungAuthBackend(AuthenticationBackend):
 
     async def authenticate(self, request: Request):
         """Runs on every request.
+
+        Password is checked only if these credentials
+        were not successfully verified recently.
         """
         auth = request.headers.get("Authorization", '')
 
         if auth:
+            user_id = credentials_cache.get(auth)
+            if user_id is not None:
+                user = await run_in_db_thread(get_user_by_id, user_id)
+                if user:
+                    return AuthCredentials(["authenticated"]), user
+
             try:
                 scheme, credentials = auth.split()
                 if scheme.lower() != 'basic':
@@ -33,7 +45,8 @@ class OrdnungAuthBackend(AuthenticationBackend):
                 raise AuthenticationError('Invalid basic auth credentials')
 
             username, _, password = decoded.partition(":")
-            user = get_user_by_login(username)
+            user = await run_in_db_thread(get_user_by_login, username)
 
-            if user and user.check_password(password):
+            if user and await run_in_threadpool(user.check_password, password):
+                credentials_cache.add(auth, user.id)
                 return AuthCredentials(["authenticated"]), user
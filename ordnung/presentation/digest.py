@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+
+"""Reminder digests.
+
+Sends every user a letter with goals due on given date.
+Users are read from database in chunks and letters go over
+a small pool of persistent SMTP connections, so one run can
+handle any amount of users with bounded memory.
+
+Usage:
+    python -m ordnung.presentation.digest 2020-06-01
+"""
+import argparse
+import smtplib
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from html import escape
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from loguru import logger
+
+from ordnung import settings
+from ordnung.core.access import get_today
+from ordnung.core.recurrence import get_occurrences, sort_by_span
+from ordnung.presentation.email_sending import (
+    Email, SMTPServer, is_permanent, make_message
+)
+from ordnung.storage.access import (
+    get_users_chunk, get_candidate_goals_of_users
+)
+from ordnung.storage.database import session
+from ordnung.storage.models import Goal
+
+
+class DigestReport(NamedTuple):
+    """Results of the single digest run.
+    """
+    users: int
+    sent: int
+    failed: int
+    seconds: float
+
+    @property
+    def per_second(self) -> float:
+        """Sending speed.
+        """
+        return self.sent / self.seconds if self.seconds else 0.0
+
+
+class ConnectionPool:
+    """Each worker thread gets its own persistent SMTP connection.
+    """
+
+    def __init__(self, connect: Callable[[], smtplib.SMTP],
+                 size: int) -> None:
+        """Initialize instance.
+        """
+        self.connect = connect
+        self.executor = ThreadPoolExecutor(max_workers=size,
+                                           thread_name_prefix='digest')
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._servers: List[smtplib.SMTP] = []
+
+    def get_server(self) -> smtplib.SMTP:
+        """Get connection of the current thread.
+        """
+        server = getattr(self._local, 'server', None)
+
+        if server is None:
+            server = self.connect()
+            self._local.server = server
+            with self._lock:
+                self._servers.append(server)
+
+        return server
+
+    def drop_server(self) -> None:
+        """Close connection of the current thread and forget it.
+        """
+        server = getattr(self._local, 'server', None)
+        self._local.server = None
+
+        if server is None:
+            return
+
+        with self._lock:
+            if server in self._servers:
+                self._servers.remove(server)
+
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+    def send(self, email: Email) -> bool:
+        """Send message, reconnect once if connection was lost.
+
+        Works in worker thread, returns True on success. Any failure
+        affects only this message, broken connections are replaced.
+        """
+        try:
+            try:
+                self.get_server().sendmail(email.sender, email.targets,
+                                           email.message)
+            except smtplib.SMTPServerDisconnected:
+                self.drop_server()
+                self.get_server().sendmail(email.sender, email.targets,
+                                           email.message)
+        except (smtplib.SMTPException, OSError) as exc:
+            # smtplib resets the transaction after refused recipients,
+            # so connection is still fine
+            if is_permanent(exc) \
+                    or isinstance(exc, smtplib.SMTPRecipientsRefused):
+                logger.error(f'Digest to {email.targets} is rejected: {exc}')
+                return False
+            logger.exception(f'Failed to send digest to {email.targets}')
+            self.drop_server()
+            return False
+        except Exception:
+            logger.exception(f'Gave up sending broken digest '
+                             f'to {email.targets}')
+            self.drop_server()
+            return False
+        return True
+
+    def send_all(self, emails: List[Email]) -> int:
+        """Send messages in parallel, return amount of successful ones.
+        """
+        return sum(self.executor.map(self.send, emails))
+
+    def close(self) -> None:
+        """Close all connections.
+        """
+        self.executor.shutdown()
+        for server in self._servers:
+            try:
+                server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+        self._servers.clear()
+
+
+def get_due_goals(user_ids: List[int],
+                  target_date: date) -> Dict[int, List[Goal]]:
+    """Get goals of given users that should be done on target date.
+    """
+    due_goals = defaultdict(list)
+    goals = get_candidate_goals_of_users(user_ids, target_date, target_date)
+
+    for goal in goals:
+        if any(True for _ in get_occurrences(goal, target_date, target_date)):
+            due_goals[goal.user_id].append(goal)
+
+    for user_goals in due_goals.values():
+        user_goals.sort(key=sort_by_span)
+
+    return due_goals
+
+
+def make_digest(name: str, target_date: date, goals: List[Goal]) -> str:
+    """Form HTML body of the letter.
+    """
+    items = ''.join(f'<li>{escape(goal.title)}</li>' for goal in goals)
+    return (f'<p>{escape(name)}, your goals on {target_date}:</p>'
+            f'<ol>{items}</ol>')
+
+
+def send_digest(target_date: date,
+                chunk_size: int = settings.DIGEST_CHUNK_SIZE,
+                connections: int = settings.DIGEST_CONNECTIONS,
+                connect: Optional[Callable[[], smtplib.SMTP]] = None,
+                sender: str = settings.EMAIL_SENDER) -> DigestReport:
+    """Send reminder to every user that has something due on target date.
+    """
+    started = time.perf_counter()
+    pool = ConnectionPool(connect or SMTPServer().connect, connections)
+    users = sent = failed = 0
+    last_id = 0
+    subject = f'Ordnung: goals on {target_date}'
+
+    try:
+        while chunk := get_users_chunk(last_id, chunk_size):
+            last_id = chunk[-1].id
+            users += len(chunk)
+            due_goals = get_due_goals([user.id for user in chunk],
+                                      target_date)
+            emails = [
+                Email(sender, [user.email],
+                      make_message(subject, [user.email],
+                                   make_digest(user.name, target_date,
+                                               due_goals[user.id]),
+                                   sender))
+                for user in chunk
+                if due_goals.get(user.id)
+            ]
+
+            # nothing from this chunk stays in memory after it is sent
+            session.expunge_all()
+
+            succeeded = pool.send_all(emails)
+            sent += succeeded
+            failed += len(emails) - succeeded
+            logger.info(f'Digest: {users} users processed, {sent} sent')
+    finally:
+        pool.close()
+
+    report = DigestReport(users, sent, failed, time.perf_counter() - started)
+    logger.info(f'Digest for {target_date} finished: {report.sent} sent, '
+                f'{report.failed} failed, {report.per_second:.1f} per second')
+    return report
+
+
+def main():
+    """Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('date', nargs='?', default=None,
+                        help='target date, YYYY-MM-DD, today by default')
+    parser.add_argument('--chunk-size', type=int,
+                        default=settings.DIGEST_CHUNK_SIZE)
+    parser.add_argument('--connections', type=int,
+                        default=settings.DIGEST_CONNECTIONS)
+    args = parser.parse_args()
+
+    if args.date is None:
+        target_date = get_today()
+    else:
+        target_date = datetime.strptime(args.date, "%Y-%m-%d").date()
+
+    report = send_digest(target_date, args.chunk_size, args.connections)
+    print(f'Users: {report.users}, sent: {report.sent}, '
+          f'failed: {report.failed}, {report.seconds:.1f} s '
+          f'({report.per_second:.1f} per second)')
+
+
+if __name__ == '__main__':
+    main()
@@ -3,12 +3,14 @@
 """Инструменты для работы с электронной почтой.
 """
 # import os
+import asyncio
 import smtplib
 # from email import encoders
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from typing import List
+from typing import Callable, List, NamedTuple, Optional
 
+from starlette.concurrency import run_in_threadpool
 from starlette.requests import Request
 
 from ordnung import settings
@@ -25,22 +27,32 @@ class SMTPServer:
                  username: str = settings.EMAIL_LOGIN,
                  password: str = settings.EMAIL_PASSWORD,
                  host: str = settings.EMAIL_HOST,
-                 port: int = settings.EMAIL_PORT):
+                 port: int = settings.EMAIL_PORT,
+                 use_tls: bool = True):
         """
         """
         self.host = host
         self.port = port
         self.username = username
         self.password = password
+        self.use_tls = use_tls
+
+    def connect(self) -> smtplib.SMTP:
+        """Open new authenticated connection.
+        """
+        server = smtplib.SMTP(self.host, self.port)
+        server.ehlo()
+        if self.use_tls:
+            server.starttls()
+            server.ehlo()
+        if self.password:
+            server.login(self.username, self.password)
+        return server
 
     def __enter__(self):
         """
         """
-        self.server = smtplib.SMTP(self.host, self.port)
-        self.server.ehlo()
-        self.server.starttls()
-        self.server.ehlo()
-        self.server.login(self.username, self.password)
+        self.server = self.connect()
         return self.server
 
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -52,9 +64,187 @@ class SMTPServer:
             # raise
 
 
-def send_email(subject: str, targets: List[str], html: str,
-               sender: str = settings.EMAIL_SENDER):
+class Email(NamedTuple):
+    """Single outgoing message.
     """
+    sender: str
+    targets: List[str]
+    message: str
+    attempt: int = 0
+
+
+class MailQueue:
+    """Outgoing email queue.
+
+    Views only put messages here and return immediately. Single
+    background worker sends them in batches, reusing one connection
+    while it stays alive, and retries failed messages with growing delay.
+    """
+
+    def __init__(self,
+                 connect: Optional[Callable[[], smtplib.SMTP]] = None,
+                 batch_size: int = settings.EMAIL_BATCH_SIZE,
+                 max_attempts: int = settings.EMAIL_MAX_ATTEMPTS,
+                 retry_delay: float = settings.EMAIL_RETRY_DELAY):
+        """Initialize instance.
+        """
+        self.connect = connect or SMTPServer().connect
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.sent = 0
+        self.failed = 0
+        self._server: Optional[smtplib.SMTP] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._pending: List[Email] = []
+        self._in_flight = 0
+        self._retries = 0
+
+    def __repr__(self) -> str:
+        """Textual representation.
+        """
+        return f'{type(self).__name__}(depth={self.depth})'
+
+    @property
+    def depth(self) -> int:
+        """Amount of messages waiting to be sent.
+        """
+        queued = self._queue.qsize() if self._queue else len(self._pending)
+        return queued + self._in_flight + self._retries
+
+    def put(self, email: Email) -> None:
+        """Add message to the queue.
+        """
+        if self._queue is None:
+            # worker is not started yet
+            self._pending.append(email)
+        else:
+            self._queue.put_nowait(email)
+
+    async def run(self) -> None:
+        """Worker loop, sends everything that comes into the queue.
+        """
+        self._queue = asyncio.Queue()
+        for email in self._pending:
+            self._queue.put_nowait(email)
+        self._pending.clear()
+
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                while len(batch) < self.batch_size and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+
+                self._in_flight = len(batch)
+                try:
+                    failed = await run_in_threadpool(self.send_batch, batch)
+                finally:
+                    self._in_flight = 0
+
+                for email in failed:
+                    self.retry(email)
+        finally:
+            await run_in_threadpool(self.close)
+
+    async def join(self) -> None:
+        """Wait until everything in the queue is processed.
+        """
+        while self.depth:
+            await asyncio.sleep(0.01)
+
+    def retry(self, email: Email) -> None:
+        """Schedule another attempt to send message.
+        """
+        if email.attempt + 1 >= self.max_attempts:
+            self.failed += 1
+            logger.error(f'Gave up sending email to {email.targets}')
+            return
+
+        delay = self.retry_delay * 2 ** email.attempt
+        self._retries += 1
+        asyncio.get_event_loop().call_later(
+            delay, self._requeue, email._replace(attempt=email.attempt + 1)
+        )
+
+    def _requeue(self, email: Email) -> None:
+        """Put message back after delay.
+        """
+        self._retries -= 1
+        self._queue.put_nowait(email)
+
+    def send_batch(self, batch: List[Email]) -> List[Email]:
+        """Send messages over persistent connection, return failed ones.
+
+        Only messages that could be sent later are returned. Ones
+        rejected by server or broken are given up at once, worker
+        has to survive any of them. Works in separate thread.
+        """
+        failed = []
+        for email in batch:
+            try:
+                self.send(email)
+                self.sent += 1
+            except (smtplib.SMTPException, OSError) as exc:
+                if is_permanent(exc):
+                    # connection is fine, only this message is rejected
+                    self.failed += 1
+                    logger.error(f'Email to {email.targets} '
+                                 f'is rejected: {exc}')
+                    continue
+                logger.exception(f'Failed to send email to {email.targets}')
+                self.close()
+                failed.append(email)
+            except Exception:
+                self.failed += 1
+                logger.exception(f'Gave up sending broken email '
+                                 f'to {email.targets}')
+                self.close()
+
+        return failed
+
+    def send(self, email: Email) -> None:
+        """Send single message, reconnect once if connection was lost.
+        """
+        if self._server is None:
+            self._server = self.connect()
+
+        try:
+            self._server.sendmail(email.sender, email.targets, email.message)
+        except smtplib.SMTPServerDisconnected:
+            self._server = self.connect()
+            self._server.sendmail(email.sender, email.targets, email.message)
+
+    def close(self) -> None:
+        """Close connection if it is open.
+        """
+        if self._server is not None:
+            server, self._server = self._server, None
+            try:
+                server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+
+
+def is_permanent(exc: Exception) -> bool:
+    """Return True if server refused the message itself (5xx reply).
+
+    Another attempt would be refused the same way.
+    """
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in exc.recipients.values())
+
+    if isinstance(exc, (smtplib.SMTPSenderRefused, smtplib.SMTPDataError)):
+        return exc.smtp_code >= 500
+
+    return False
+
+
+mail_queue = MailQueue()
+
+
+def make_message(subject: str, targets: List[str], html: str,
+                 sender: str = settings.EMAIL_SENDER) -> str:
+    """Form text of the message.
     """
     msg = MIMEMultipart()
     msg['Subject'] = subject
@@ -84,9 +274,24 @@ def send_email(subject: str, targets: List[str], html: str,
     #     }
     #     data.add_header('Content-Disposition', 'attachment', **parameters)
     #     msg.attach(data)
+    return msg.as_string()
+
 
-    with SMTPServer(sender) as server:
-        server.sendmail(sender, targets, msg.as_string())
+def send_email(subject: str, targets: List[str], html: str,
+               sender: str = settings.EMAIL_SENDER):
+    """Send message right now, blocking until it is done.
+    """
+    message = make_message(subject, targets, html, sender)
+    with SMTPServer() as server:
+        server.sendmail(sender, targets, message)
+
+
+def enqueue_email(subject: str, targets: List[str], html: str,
+                  sender: str = settings.EMAIL_SENDER) -> None:
+    """Put message into the outgoing queue.
+    """
+    message = make_message(subject, targets, html, sender)
+    mail_queue.put(Email(sender, targets, message))
 
 
 def send_restore_email(request: Request, user_id: int, email: str) -> str:
@@ -98,7 +303,7 @@ def send_restore_email(request: Request, user_id: int, email: str) -> str:
     )
     restore_confirm_url = request.url_for('restore_confirm', token=token)
     # todo
-    send_email('Password restore', [email], f'Your password restore url: {restore_confirm_url}')
+    enqueue_email('Password restore', [email], f'Your password restore url: {restore_confirm_url}')
     return restore_confirm_url
 
 
@@ -111,5 +316,5 @@ def send_verification_email(request: Request, user_id: int, email: str) -> str:
     )
     register_confirm_url = request.url_for('register_confirm', token=token)
     # todo
-    send_email('Registration confirm', [email], f'Your confirmation url: {register_confirm_url}')
+    enqueue_email('Registration confirm', [email], f'Your confirmation url: {register_confirm_url}')
     return register_confirm_url
\ No newline at end of file
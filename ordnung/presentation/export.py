@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+"""Calendar export formats.
+
+Every export format renders single occurrence at a time, so export
+could be streamed in any size. Subscription feed is different, there
+each goal is rendered once, along with its recurrence rule.
+"""
+import csv
+import io
+from datetime import date, datetime, time
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, NamedTuple, Tuple
+
+from ordnung.core import icalendar
+from ordnung.core.recurrence import get_segments
+from ordnung.presentation.serialization import dumps_line
+from ordnung.storage.models import Goal
+
+CSV_COLUMNS = ('date', 'goal_id', 'span_id', 'title', 'target_time')
+
+
+class ExportFormat(NamedTuple):
+    """Description of single export format.
+    """
+    media_type: str
+    extension: str
+    header: bytes
+    footer: bytes
+    render_row: Callable[[date, Goal], bytes]
+
+
+def render_csv_row(cur_date: date, goal: Goal) -> bytes:
+    """Render occurrence as CSV line.
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow([cur_date, goal.id, goal.span_id,
+                                 goal.title, goal.target_time or ''])
+    return buffer.getvalue().encode('utf-8')
+
+
+def render_ndjson_row(cur_date: date, goal: Goal) -> bytes:
+    """Render occurrence as JSON line.
+    """
+    return dumps_line({
+        'date': cur_date,
+        'goal_id': goal.id,
+        'span_id': goal.span_id,
+        'title': goal.title,
+        'target_time': goal.target_time,
+    })
+
+
+def render_ics_row(cur_date: date, goal: Goal) -> bytes:
+    """Render occurrence as VEVENT.
+    """
+    return icalendar.make_event(
+        uid=f'{goal.id}-{icalendar.format_date(cur_date)}@ordnung',
+        event_date=cur_date,
+        summary=goal.title,
+        description=goal.description,
+        event_time=goal.target_time,
+        stamp=goal.last_edit_at,
+    ).encode('utf-8')
+
+
+EXPORT_FORMATS: Dict[str, ExportFormat] = {
+    'csv': ExportFormat(
+        media_type='text/csv; charset=utf-8',
+        extension='csv',
+        header=(','.join(CSV_COLUMNS) + '\r\n').encode('utf-8'),
+        footer=b'',
+        render_row=render_csv_row,
+    ),
+    'ndjson': ExportFormat(
+        media_type='application/x-ndjson',
+        extension='ndjson',
+        header=b'',
+        footer=b'',
+        render_row=render_ndjson_row,
+    ),
+    'ics': ExportFormat(
+        media_type='text/calendar; charset=utf-8',
+        extension='ics',
+        header=icalendar.CALENDAR_HEADER.encode('utf-8'),
+        footer=icalendar.CALENDAR_FOOTER.encode('utf-8'),
+        render_row=render_ics_row,
+    ),
+}
+
+
+def render_chunk(rows: Iterator[Tuple[date, Goal]],
+                 render_row: Callable[[date, Goal], bytes],
+                 size: int) -> bytes:
+    """Render next portion of occurrences.
+
+    Returns empty bytes when there is nothing left.
+    """
+    return b''.join(render_row(cur_date, goal)
+                    for cur_date, goal in islice(rows, size))
+
+
+def render_goal_events(goal: Goal, horizon: date) -> bytes:
+    """Render goal as VEVENT with recurrence rule.
+
+    Almost every goal needs only one event, see get_segments.
+    """
+    events = []
+
+    for number, segment in enumerate(get_segments(goal, horizon)):
+        uid = f'{goal.id}-{number}@ordnung' if number else f'{goal.id}@ordnung'
+        extra = []
+
+        if segment.rrule is not None:
+            rrule = segment.rrule
+            if segment.last_date is not None:
+                if goal.target_time is None:
+                    until = icalendar.format_date(segment.last_date)
+                else:
+                    until = icalendar.format_datetime(
+                        datetime.combine(segment.last_date, time.max)
+                    )
+                rrule += f';UNTIL={until}'
+            extra.append(f'RRULE:{rrule}')
+
+        events.append(icalendar.make_event(
+            uid=uid,
+            event_date=segment.first_date,
+            summary=goal.title,
+            description=goal.description,
+            event_time=goal.target_time,
+            stamp=goal.last_edit_at,
+            extra=extra,
+        ))
+
+    return ''.join(events).encode('utf-8')
+
+
+def render_feed(goals: Iterable[Goal], horizon: date) -> bytes:
+    """Render calendar with goals and their recurrence rules.
+    """
+    return b''.join([
+        icalendar.CALENDAR_HEADER.encode('utf-8'),
+        *(render_goal_events(goal, horizon) for goal in goals),
+        icalendar.CALENDAR_FOOTER.encode('utf-8'),
+    ])
@@ -41,7 +41,6 @@ class OrdnungFormTranslator:
     def gettext(self, string):
         """Custom gettext wrapper.
         """
-        print(string)
         return self._gettext(string)
 
     def ngettext(self, singular, plural, n):
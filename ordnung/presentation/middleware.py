@@ -3,14 +3,17 @@
 """Middleware classes.
 """
 
+from collections.abc import Mapping
+from typing import Any, Iterator
+
 from starlette.authentication import AuthenticationError, AuthCredentials
 from starlette.middleware.authentication import AuthenticationMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import HTTPConnection
-from starlette.types import Scope, Receive, Send
+from starlette.types import ASGIApp, Scope, Receive, Send
 
 from ordnung import settings
 from ordnung.presentation.access import get_translate, get_gettext
+from ordnung.storage.database import session, session_scope, run_in_db_thread
 
 
 class UnauthenticatedUser:
@@ -49,24 +52,81 @@ class AuthMiddleware(AuthenticationMiddleware):
         await self.app(scope, receive, send)
 
 
-class ContextExtensionMiddleware(BaseHTTPMiddleware):
+class DBSessionMiddleware:
+    """Gives each request its own database session.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """Initialize instance.
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] not in ["http", "websocket"]:
+            await self.app(scope, receive, send)
+            return
+
+        with session_scope():
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                # static files and such never touch the database
+                if session.registry.has():
+                    await run_in_db_thread(session.remove)
+
+
+class ContextExtensions(Mapping):
+    """Additional names for the template.
+
+    Values are resolved only when template render asks for them.
+    """
+    names = ('gettext', '_', 'translate', 'user', 'errors')
+
+    def __init__(self, user) -> None:
+        """Initialize instance.
+        """
+        self.user = user
+
+    def __getitem__(self, name: str) -> Any:
+        """Get value of the name.
+        """
+        if name in ('gettext', '_'):
+            return get_gettext(self.user.lang)
+
+        if name == 'translate':
+            return get_translate(self.user.lang)
+
+        if name == 'user':
+            return self.user
+
+        if name == 'errors':
+            return []
+
+        raise KeyError(name)
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over names.
+        """
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        """Return amount of names.
+        """
+        return len(self.names)
+
+
+class ContextExtensionMiddleware:
     """Inserts additional names into the template.
     """
 
-    async def dispatch(self, request, call_next):
-        """Inserts additional names into the template.
+    def __init__(self, app: ASGIApp) -> None:
+        """Initialize instance.
         """
-        try:
-            context_extensions = getattr(request.state, 'context_extensions')
-        except AttributeError:
-            context_extensions = {}
-
-        context_extensions['gettext'] = get_gettext(request.user.lang)
-        context_extensions['_'] = get_gettext(request.user.lang)
-        context_extensions['translate'] = get_translate(request.user.lang)
-        context_extensions['user'] = request.user
-        context_extensions['errors'] = []
-
-        request.state.context_extensions = context_extensions
-        response = await call_next(request)
-        return response
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http":
+            state = scope.setdefault("state", {})
+            state["context_extensions"] = ContextExtensions(scope["user"])
+
+        await self.app(scope, receive, send)
@@ -8,6 +8,14 @@ from starlette.staticfiles import StaticFiles
 from ordnung.views import index, login, logout, unauthorized
 from ordnung.views import create_goal, update_goal
 from ordnung.views import month, day
+from ordnung.views import (
+    api_month, api_day, api_range, api_achievements, api_stats,
+    export
+)
+from ordnung.views import feed, feed_link
+from ordnung.views import (
+    pool_statistics, mail_statistics, cache_statistics
+)
 from ordnung.views import (
     restore_confirm, register_confirm, restore_note,
     register_note, restore, register
@@ -23,6 +31,18 @@ routes = [
     Route('/month/{date}', month),
     Route('/day/{date}', day),
 
+    # api ---------------------------------------------------------------------
+
+    Route('/api/month', api_month),
+    Route('/api/month/{date}', api_month),
+    Route('/api/day/{date}', api_day),
+    Route('/api/range/{first_day}/{last_day}', api_range),
+    Route('/api/achievements', api_achievements, methods=['POST']),
+    Route('/api/stats', api_stats),
+    Route('/export/{first_day}/{last_day}', export),
+    Route('/api/feed', feed_link),
+    Route('/feed/{token}.ics', feed),
+
     # auth --------------------------------------------------------------------
 
     Route('/', index),
@@ -46,6 +66,12 @@ routes = [
     Route('/create_goal/{date}', create_goal, methods=GP),
     Route('/update_goal/{goal_id}', update_goal, methods=GP),
 
+    # monitoring --------------------------------------------------------------
+
+    Route('/monitoring/pool', pool_statistics),
+    Route('/monitoring/mail', mail_statistics),
+    Route('/monitoring/cache', cache_statistics),
+
     # static ------------------------------------------------------------------
 
     Mount('../static',
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+"""Tools that turn calendar data into plain structures for API clients.
+"""
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import orjson
+from starlette.responses import JSONResponse
+
+from ordnung import settings
+from ordnung.core.date_and_time import Day, Month
+from ordnung.presentation.access import parse_date
+from ordnung.storage.achievements import AchievementItem
+from ordnung.storage.models import Goal
+
+GOAL_FIELDS = (
+    'id', 'group_id', 'span_id', 'title', 'description', 'target_date',
+    'target_time', 'actual_from', 'actual_to', 'created_at', 'last_edit_at',
+)
+DEFAULT_GOAL_FIELDS = ('id', 'span_id', 'title', 'target_time')
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response, serialized by orjson.
+
+    Dates and times are handled natively, no separators in output.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
+def bad_request(message: str) -> FastJSONResponse:
+    """Make response with error description.
+    """
+    return FastJSONResponse({'error': message}, status_code=400)
+
+
+def dumps_line(content: Any) -> bytes:
+    """Serialize one line of NDJSON stream.
+    """
+    return orjson.dumps(content, option=orjson.OPT_APPEND_NEWLINE)
+
+
+def get_fields(raw_fields: Optional[str]) -> Tuple[str, ...]:
+    """Parse comma separated list of goal fields.
+
+    Raises ValueError on unknown field.
+    """
+    if not raw_fields:
+        return DEFAULT_GOAL_FIELDS
+
+    fields = tuple(field.strip() for field in raw_fields.split(',')
+                   if field.strip())
+    unknown = [field for field in fields if field not in GOAL_FIELDS]
+
+    if unknown:
+        raise ValueError(f'Unknown fields: {", ".join(unknown)}')
+
+    return fields
+
+
+def serialize_goals(goals: Iterable[Goal],
+                    fields: Tuple[str, ...]) -> List[Dict[str, Any]]:
+    """Take only required fields of the goals.
+    """
+    return [{field: getattr(goal, field) for field in fields}
+            for goal in goals]
+
+
+def serialize_day(day_date: date, goals: Iterable[Goal],
+                  fields: Tuple[str, ...]) -> Dict[str, Any]:
+    """Make structure for a single day.
+    """
+    return {'date': day_date, 'goals': serialize_goals(goals, fields)}
+
+
+def serialize_month(month: Month, fields: Tuple[str, ...]) -> Dict[str, Any]:
+    """Make structure for the whole month table.
+    """
+
+    def make_day(day: Day) -> Dict[str, Any]:
+        return {
+            'date': day.origin_date,
+            'is_today': day.is_today,
+            'is_weekend': day.is_weekend,
+            'holiday': month.holiday(day),
+            'goals': serialize_goals(month.goals(day), fields),
+        }
+
+    return {
+        'date': month.origin_date,
+        'first_day': month.first_day,
+        'last_day': month.last_day,
+        'weeks': [[make_day(day) for day in week] for week in month.weeks()],
+    }
+
+
+def parse_achievements(data: Any) -> List[AchievementItem]:
+    """Convert request body into list of achievements.
+
+    Expected input:
+        [{"goal_id": 1, "date": "2020-05-10", "status_id": 2, "value": 1}]
+
+    Raises ValueError on malformed input.
+    """
+    if not isinstance(data, list) or not data:
+        raise ValueError('List of achievements is expected')
+
+    if len(data) > settings.ACHIEVEMENTS_MAX_BATCH:
+        raise ValueError(f'No more than {settings.ACHIEVEMENTS_MAX_BATCH} '
+                         f'achievements at once')
+
+    items = []
+    for number, element in enumerate(data):
+        try:
+            items.append(AchievementItem(
+                goal_id=int(element['goal_id']),
+                event_date=parse_date(element['date']),
+                status_id=int(element['status_id']),
+                value=int(element.get('value', 0)),
+            ))
+        except (KeyError, TypeError, ValueError) as exc:
+            raise ValueError(f'Achievement {number} is malformed: {exc!r}')
+
+    return items
@@ -16,17 +16,39 @@ WEEKENDS = {5, 6}  # weekday indexes, saturday and sunday
 WEEK_LENGTH = 7
 WEEKS_IN_MONTH = 5
 MONTH_LENGTH = WEEKS_IN_MONTH * WEEK_LENGTH
+MONTH_GRID_CACHE_SIZE = 512
+API_CHUNK_DAYS = 31  # days loaded at once when streaming range
+API_MAX_DAYS = 3660  # longest range that could be requested
+ACHIEVEMENTS_MAX_BATCH = 500  # states saved by single request
+EXPORT_CHUNK_SIZE = 500  # rows fetched from cursor at once
+FEED_HISTORY = 366  # days of past goals in calendar feed
+FEED_HORIZON = 3660  # days, odd and even weeks are split up to here
+STATS_HISTORY = 365  # days of rolling completion rate in statistics
+STATS_WINDOW = 30  # days, width of rolling completion rate
 DEFAULT_TIMEZONE = 'Europe/Moscow'
 timezone = pytz.timezone(DEFAULT_TIMEZONE)
 
 # additional days to search in both directions during month rendering
 MONTH_OFFSET = 20
 
+# materialized goal occurrences, days before and after today
+OCCURRENCES_HISTORY = 62
+OCCURRENCES_HORIZON = 366
+OCCURRENCES_REFRESH_INTERVAL = 3600  # seconds
+OCCURRENCES_CHUNK_SIZE = 1000  # goals
+HOLIDAYS_REFRESH_INTERVAL = 86400  # seconds
+HOLIDAYS_IMPORT_CHUNK = 10000  # rows
+ROLLOVER_CHECK_INTERVAL = 300  # seconds, how often day change is checked
+
 # localisation
 DEFAULT_LANG = 'RU'
+SOURCE_LANG = 'EN'  # language of sentences and keys in the code
 DEFAULT_PLACEHOLDER = '???'
 
 MAX_PASSWORD_RESTORE_INTERVAL = 86400
+AUTH_CACHE_TTL = 300  # seconds
+AUTH_CACHE_SIZE = 10000  # credentials
+PAGE_CACHE_SIZE = 64 * 1024 * 1024  # bytes of rendered pages
 DEFAULT_GROUP_NAME = 'Home'
 
 #  ----------------- STORAGE SETTINGS ----------------
@@ -34,6 +56,11 @@ DEFAULT_GROUP_NAME = 'Home'
 LOGGER_FILENAME = 'ordnung.log'
 LOGGER_ROTATION = '1 month'
 DB_URI = os.getenv('ORDNUNG_DB_URI')
+DB_POOL_SIZE = int(os.getenv('ORDNUNG_DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(os.getenv('ORDNUNG_DB_MAX_OVERFLOW', 10))
+DB_POOL_TIMEOUT = 30  # seconds
+DB_POOL_RECYCLE = 1800  # seconds
+DB_POOL_PRE_PING = True
 
 #  -------------- PRESENTATION SETTINGS --------------
 
@@ -53,3 +80,8 @@ EMAIL_LOGIN = 'ordnung.auto'
 EMAIL_PASSWORD = os.getenv('ORDNUNG_EMAIL_PASSWORD')
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
+EMAIL_BATCH_SIZE = 50  # messages
+EMAIL_MAX_ATTEMPTS = 5
+EMAIL_RETRY_DELAY = 5  # seconds, doubles with each attempt
+DIGEST_CHUNK_SIZE = 1000  # users
+DIGEST_CONNECTIONS = 4  # parallel SMTP connections
@@ -2,70 +2,68 @@
 
 """Database access tools.
 """
-from datetime import date
+from datetime import date, datetime, time
 from typing import Optional, List, Tuple
 
-from sqlalchemy import or_, func, text
+from sqlalchemy import or_, and_, func
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, Query
 from werkzeug.security import generate_password_hash
 
 from ordnung import settings
 from ordnung.core.access import get_now
 from ordnung.storage.database import session
 from ordnung.storage.models import User, Group, GroupMembership, Parameter, \
-    Span, Status
-
-
-def get_holidays(country: str, target_date: date, offset_left: int,
-                 offset_right: int) -> List[Tuple[date, str]]:
-    """Get list of holidays for specified country.
-    WITH dates_list AS (
-	SELECT (generate_series(date('2020-06-10') - 20,
-							date('2020-06-10') + 20,
-							'1 day'::interval)::date) AS event_date
-)
-SELECT * FROM dates_list dl
-LEFT JOIN (
-	SELECT * FROM holidays WHERE country_id = (
-		SELECT id FROM countries
-		WHERE name = 'Russia' LIMIT 1)) h
-ON h.event_date = dl.event_date
-ORDER BY dl.event_date;
-    """
-    stmt = text("""
-    WITH user_country AS (
-        SELECT id 
-        FROM countries 
-        WHERE name = :user_country 
-        LIMIT 1
-    ),
-        dates_list AS (
-        SELECT (generate_series(date(:target_date) - :offset_left,
-                                date(:target_date) + :offset_right, 
-                                '1 day'::interval)::date) AS event_date
-    )
-    SELECT * FROM dates_list dl
-    LEFT JOIN (SELECT * FROM holidays WHERE country_id = user_country.id) h
-    ON h.event_date = dl.event_date
-    ORDER BY dl.event_date;
-    """)
-    return list(session.execute(stmt, params=dict(user_country=country,
-                                             target_date=target_date,
-                                             offset_left=offset_left,
-                                             offset_right=offset_right)))
+    Span, Status, Goal, Achievement, GoalProgress
+from ordnung.storage.sql import ONCE, UNTIL_COMPLETE
 
 
 def get_user_by_id(user_id: int) -> Optional[User]:
     """Go to DB and search user by the specified user id.
     """
-    return session.query(User).filter_by(id=user_id).first()
+    return session.query(User).options(
+        joinedload(User.parameters)
+    ).filter_by(id=user_id).first()
+
+
+def query_users_by_login(login: str) -> Query:
+    """Make query for users with specified login. Case insensitive.
+
+    Condition matches users_login_lower_idx expression index.
+    """
+    return session.query(User).filter(
+        func.lower(User.login) == login.lower()
+    )
+
+
+def query_users_by_email(email: str) -> Query:
+    """Make query for users with specified email. Case insensitive.
+
+    Condition matches users_email_lower_idx expression index.
+    """
+    return session.query(User).filter(
+        func.lower(User.email) == email.lower()
+    )
+
+
+def query_users_by_email_or_login(user_contact: str) -> Query:
+    """Make query for users with specified login or email.
+
+    Each part of the union is served by its own index,
+    unlike single OR condition over two expressions.
+    """
+    return query_users_by_login(user_contact).union_all(
+        query_users_by_email(user_contact)
+    )
 
 
 def get_user_by_login(login: str) -> Optional[User]:
     """Go to DB and search user by the specified login. Case insensitive.
+
+    Parameters are loaded right away, we need them on every request.
     """
-    response = session.query(User).filter(
-        func.lower(User.login) == login.lower()
+    response = query_users_by_login(login).options(
+        joinedload(User.parameters)
     ).first()
     return response
 
@@ -73,15 +71,132 @@ def get_user_by_login(login: str) -> Optional[User]:
 def get_user_by_email_or_login(user_contact: str) -> Optional[User]:
     """Go to DB and search user by the specified login/email. Case insensitive.
     """
-    response = session.query(User).filter(
-        or_(
-            func.lower(User.login) == user_contact.lower(),
-            func.lower(User.email) == user_contact.lower(),
-        )
-    ).first()
+    response = query_users_by_email_or_login(user_contact).first()
     return response
 
 
+def get_goal_by_id(goal_id: int) -> Optional[Goal]:
+    """Go to DB and search goal by the specified id.
+    """
+    return session.query(Goal).filter_by(id=goal_id).first()
+
+
+def get_candidate_goals_filter(first_day: date, last_day: date):
+    """Make condition for goals that could be shown in specified range.
+    """
+    window_start = datetime.combine(first_day, time.min)
+    window_stop = datetime.combine(last_day, time.max)
+
+    return or_(
+        and_(
+            Goal.span_id.in_((ONCE, UNTIL_COMPLETE)),
+            Goal.target_date.between(first_day, last_day),
+        ),
+        and_(
+            Goal.span_id.notin_((ONCE, UNTIL_COMPLETE)),
+            Goal.actual_from <= window_stop,
+            or_(Goal.actual_to.is_(None),
+                Goal.actual_to >= window_start),
+        ),
+    )
+
+
+def get_candidate_goals(user_id: int, first_day: date,
+                        last_day: date) -> List[Goal]:
+    """Get all user goals that could possibly be shown in specified range.
+
+    Only plain range conditions here, actual recurrence
+    expansion is made in ordnung.core.recurrence.
+    """
+    return session.query(Goal).filter(
+        Goal.user_id == user_id,
+        get_candidate_goals_filter(first_day, last_day),
+    ).all()
+
+
+def get_window_version(user_id: int, first_day: date,
+                       last_day: date) -> tuple:
+    """Get cheap fingerprint of user data visible in specified range.
+
+    Latest modification times go together with amounts of rows,
+    so removals change fingerprint too. Progress of the goals depends
+    on achievements outside of the range, so it is checked separately.
+    """
+    goals = session.query(
+        func.max(Goal.last_edit_at), func.count(Goal.id)
+    ).filter(
+        Goal.user_id == user_id,
+        get_candidate_goals_filter(first_day, last_day),
+    ).one()
+    achievements = session.query(
+        func.max(Achievement.event_time), func.count(Achievement.id)
+    ).filter(
+        Achievement.user_id == user_id,
+        Achievement.event_date.between(first_day, last_day),
+    ).one()
+    progress = session.query(
+        func.max(GoalProgress.updated_at)
+    ).filter(GoalProgress.user_id == user_id).scalar()
+    return (*goals, *achievements, progress)
+
+
+def get_goals_version(user_id: int) -> tuple:
+    """Get cheap fingerprint of all goals of the user.
+    """
+    return tuple(session.query(
+        func.max(Goal.last_edit_at), func.count(Goal.id)
+    ).filter(Goal.user_id == user_id).one())
+
+
+def get_user_timezone(user_id: int) -> Optional[str]:
+    """Get name of the user timezone, None if user has no parameters.
+    """
+    return session.query(Parameter.timezone).filter(
+        Parameter.user_id == user_id
+    ).limit(1).scalar()
+
+
+def get_feed_goals(user_id: int, first_day: date) -> List[Goal]:
+    """Get goals of the user that could be shown after given date.
+    """
+    return session.query(Goal).filter(
+        Goal.user_id == user_id,
+        or_(
+            and_(Goal.span_id.in_((ONCE, UNTIL_COMPLETE)),
+                 Goal.target_date >= first_day),
+            and_(Goal.span_id.notin_((ONCE, UNTIL_COMPLETE)),
+                 or_(Goal.actual_to.is_(None),
+                     Goal.actual_to >= datetime.combine(first_day,
+                                                        time.min))),
+        ),
+    ).order_by(Goal.id).all()
+
+
+def get_users_chunk(after_id: int, limit: int) -> List[Tuple[int, str, str]]:
+    """Get next chunk of confirmed users as (id, name, email).
+
+    Keyset pagination, so every chunk costs the same
+    no matter how far we are from the beginning.
+    """
+    return session.query(User.id, User.name, User.email).filter(
+        User.confirmed.is_(True),
+        User.id > after_id,
+    ).order_by(User.id).limit(limit).all()
+
+
+def get_candidate_goals_of_users(user_ids: List[int], first_day: date,
+                                 last_day: date) -> List[Goal]:
+    """Same as get_candidate_goals, but for many users at once.
+    """
+    if not user_ids:
+        return []
+
+    return session.query(Goal).filter(
+        Goal.user_id.in_(user_ids),
+        get_candidate_goals_filter(first_day, last_day),
+    ).all()
+
+
 def get_span_types() -> List[Span]:
     """Get all available persistence types.
     """
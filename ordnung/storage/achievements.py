@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+
+"""Achievements, actual states of the goals on specific dates.
+
+Whole batch of states is written by single INSERT ... ON CONFLICT
+statement and single commit, no matter how many days are checked off.
+Running totals in goal_progress are changed by deltas in the same
+transaction, rebuild command recalculates them from scratch.
+
+Usage:
+    python -m ordnung.storage.achievements rebuild
+"""
+import argparse
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import func, text, tuple_
+from sqlalchemy.dialects.postgresql import insert, Insert
+
+from ordnung.core.access import get_now
+from ordnung.storage.database import session
+from ordnung.storage.models import Achievement, Goal, GoalProgress, Metric
+
+
+class AchievementItem(NamedTuple):
+    """Requested state of the goal on specific date.
+    """
+    goal_id: int
+    event_date: date
+    status_id: int
+    value: int
+
+
+class Progress(NamedTuple):
+    """Totals of the goal, along with objective of its metric (if any).
+    """
+    total_value: int
+    events: int
+    last_event_date: Optional[date]
+    objective: Optional[float]
+
+
+def make_upsert(rows: List[Dict[str, Any]]) -> Insert:
+    """Make single statement that inserts or updates all rows.
+    """
+    table = Achievement.__table__
+    stmt = insert(table).values(rows)
+    return stmt.on_conflict_do_update(
+        constraint='achievements_goal_date_key',
+        set_=dict(status_id=stmt.excluded.status_id,
+                  value=stmt.excluded.value,
+                  event_time=stmt.excluded.event_time),
+    ).returning(table.c.id, table.c.goal_id, table.c.event_date,
+                table.c.status_id, table.c.value, table.c.event_time)
+
+
+def get_progress_deltas(old_values: Dict[Tuple[int, date], int],
+                        items: Iterable[AchievementItem],
+                        user_id: int, now: datetime) -> List[Dict[str, Any]]:
+    """Calculate changes of running totals after writing items.
+
+    Old values are keyed by (goal_id, event_date), items must be unique.
+    """
+    deltas: Dict[int, Dict[str, Any]] = {}
+
+    for item in items:
+        key = (item.goal_id, item.event_date)
+        delta = deltas.setdefault(item.goal_id, dict(
+            goal_id=item.goal_id, user_id=user_id, total_value=0,
+            events=0, last_event_date=item.event_date, updated_at=now,
+        ))
+
+        if key in old_values:
+            delta['total_value'] += item.value - old_values[key]
+        else:
+            delta['total_value'] += item.value
+            delta['events'] += 1
+
+        delta['last_event_date'] = max(delta['last_event_date'],
+                                       item.event_date)
+
+    return list(deltas.values())
+
+
+def apply_progress_deltas(deltas: List[Dict[str, Any]]) -> None:
+    """Add deltas to running totals by single statement.
+    """
+    table = GoalProgress.__table__
+    stmt = insert(table).values(deltas)
+    session.execute(stmt.on_conflict_do_update(
+        index_elements=[table.c.goal_id],
+        set_=dict(
+            total_value=table.c.total_value + stmt.excluded.total_value,
+            events=table.c.events + stmt.excluded.events,
+            last_event_date=func.greatest(table.c.last_event_date,
+                                          stmt.excluded.last_event_date),
+            updated_at=stmt.excluded.updated_at,
+        ),
+    ))
+
+
+def lock_progress(user_id: int, goal_ids: Iterable[int],
+                  now: datetime) -> None:
+    """Lock running totals of the goals till the end of transaction.
+
+    Rows are created first, otherwise concurrent writers
+    of the same new achievement would both count it.
+    """
+    goal_ids = sorted(goal_ids)  # same order everywhere, no deadlocks
+    session.execute(insert(GoalProgress.__table__).values([
+        dict(goal_id=goal_id, user_id=user_id, total_value=0, events=0,
+             last_event_date=None, updated_at=now)
+        for goal_id in goal_ids
+    ]).on_conflict_do_nothing(index_elements=['goal_id']))
+    session.query(GoalProgress.goal_id).filter(
+        GoalProgress.goal_id.in_(goal_ids)
+    ).order_by(GoalProgress.goal_id).with_for_update().all()
+
+
+def upsert_achievements(user_id: int,
+                        items: List[AchievementItem]) -> List[Dict[str, Any]]:
+    """Save states of the goals, return them as they are now in database.
+
+    Raises ValueError if some goals do not belong to the user.
+    """
+    if not items:
+        return []
+
+    # same row could not be updated twice by one statement, last one wins
+    unique_items = {(item.goal_id, item.event_date): item for item in items}
+    goal_ids = {goal_id for goal_id, _ in unique_items}
+
+    own_ids = {goal_id for goal_id, in session.query(Goal.id).filter(
+        Goal.user_id == user_id,
+        Goal.id.in_(goal_ids),
+    )}
+    foreign_ids = goal_ids - own_ids
+    if foreign_ids:
+        raise ValueError(f'Unknown goals: {sorted(foreign_ids)}')
+
+    now = get_now()
+    lock_progress(user_id, goal_ids, now)
+
+    old_values = {
+        (goal_id, event_date): value
+        for goal_id, event_date, value in session.query(
+            Achievement.goal_id, Achievement.event_date, Achievement.value
+        ).filter(
+            tuple_(Achievement.goal_id,
+                   Achievement.event_date).in_(list(unique_items))
+        )
+    }
+
+    rows = [
+        dict(user_id=user_id, goal_id=item.goal_id,
+             status_id=item.status_id, event_date=item.event_date,
+             event_time=now, value=item.value)
+        for item in unique_items.values()
+    ]
+    result = [dict(row) for row in session.execute(make_upsert(rows))]
+
+    apply_progress_deltas(get_progress_deltas(
+        old_values, unique_items.values(), user_id, now
+    ))
+    session.commit()
+    return result
+
+
+def get_progress(goal_ids: Iterable[int]) -> Dict[int, Progress]:
+    """Get running totals of the goals, single lookup by primary key.
+    """
+    goal_ids = list(goal_ids)
+    if not goal_ids:
+        return {}
+
+    rows = session.query(
+        GoalProgress.goal_id, GoalProgress.total_value, GoalProgress.events,
+        GoalProgress.last_event_date, Metric.objective,
+    ).outerjoin(
+        Metric, Metric.goal_id == GoalProgress.goal_id
+    ).filter(
+        GoalProgress.goal_id.in_(goal_ids),
+    ).order_by(GoalProgress.goal_id, Metric.id.desc())
+
+    # with several metrics the first one is used
+    return {goal_id: Progress(*rest) for goal_id, *rest in rows}
+
+
+COLUMNS_REQUEST = """
+SELECT a.event_date - date '0001-01-01' + 1, a.goal_id,
+       coalesce(g.span_id, 0), a.status_id, a.value
+FROM achievements a
+JOIN goals g ON g.id = a.goal_id
+WHERE a.user_id = :user_id AND a.status_id IS NOT NULL;
+"""
+
+
+def get_achievement_rows(user_id: int) -> List[Tuple[int, ...]]:
+    """Get all achievements of the user as plain integers.
+
+    Dates are turned into ordinals by database, so rows
+    could be put into arrays without any conversion.
+    """
+    result = session.execute(text(COLUMNS_REQUEST),
+                             params=dict(user_id=user_id))
+    return [tuple(row) for row in result]
+
+
+REBUILD_REQUEST = """
+LOCK TABLE goal_progress IN EXCLUSIVE MODE;
+DELETE FROM goal_progress;
+INSERT INTO goal_progress (goal_id, user_id, total_value, events,
+                           last_event_date, updated_at)
+SELECT a.goal_id, g.user_id, sum(a.value), count(*), max(a.event_date), :now
+FROM achievements a
+JOIN goals g ON g.id = a.goal_id
+GROUP BY a.goal_id, g.user_id;
+"""
+
+
+def rebuild_progress() -> int:
+    """Recalculate all running totals from achievements.
+
+    Writers wait while table is locked, so no delta is lost.
+    """
+    session.execute(text(REBUILD_REQUEST), params=dict(now=get_now()))
+    total = session.query(func.count(GoalProgress.goal_id)).scalar()
+    session.commit()
+    return total
+
+
+def main():
+    """Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('command', choices=['rebuild'])
+    parser.parse_args()
+
+    total = rebuild_progress()
+    print(f'Progress of {total} goals rebuilt')
+
+
+if __name__ == '__main__':
+    main()
@@ -2,46 +2,178 @@
 
 """Database tools.
 """
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import date
-from typing import Dict, List
+from itertools import count
+from typing import Any, Callable, Dict, List, TypeVar, Iterator
 
 from sqlalchemy import create_engine, MetaData, text
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.pool import QueuePool
 
 from ordnung import settings
-from ordnung.core.records import organize_records, sort_nested_records
+from ordnung.core.records import organize_records, Records
 from ordnung.storage.sql import MEGA_REQUEST
 
-engine = create_engine(settings.DB_URI, echo=False)
+T = TypeVar('T')
+
+
+class MonitoredQueuePool(QueuePool):
+    """Connection pool that measures how long we wait for connections.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Initialize instance.
+        """
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._lock = threading.Lock()
+
+    def _do_get(self):
+        """Get connection from the pool, measuring time spent.
+        """
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started
+            # connections are taken from many database threads at once
+            with self._lock:
+                self.checkouts += 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+
+    def get_wait_statistics(self) -> Dict[str, Any]:
+        """Get consistent snapshot of the counters.
+        """
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'total_wait': self.total_wait,
+                'max_wait': self.max_wait,
+                'average_wait': (self.total_wait / self.checkouts
+                                 if self.checkouts else 0.0),
+            }
+
+
+engine = create_engine(
+    settings.DB_URI,
+    echo=False,
+    poolclass=MonitoredQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+)
 metadata = MetaData(bind=engine)
 Session = sessionmaker(bind=engine)
-session = Session()
-
-
-# def get_records(target_date: date,
-#                 offset_left: int,
-#                 offset_right: int) -> Dict[str, List[dict]]:
-#     """Get organized records from database.
-#     """
-#     all_records = load_records(target_date, offset_left, offset_right)
-#     records = organize_records(all_records, target_date,
-#                                offset_left, offset_right)
-#     records = sort_nested_records(records)
-#     return records
-#
-#
-# def load_records(target_date: date, offset_left: int, offset_right: int,
-#                  table_name: str = 'test_records'):  # FIXME
-#     """Retrieve all interesting records from database.
-#
-#     This function works with extremely complicated SQL request.
-#     Main goal of doing it like this is to fetch all required resources
-#     in single action, rather than making a lot of consecutive request.
-#     In previous version, each Day could retrieve all of it's records
-#     (in a single request for each persistence type).
-#     Therefore, we had to do at least 8 x 35 = 280 requests.
-#     """
-#     stmt = text(MEGA_REQUEST.format(table_name=table_name))
-#     return session.execute(stmt, params=dict(target_date=target_date,
-#                                              offset_left=offset_left,
-#                                              offset_right=offset_right))
+
+_session_scope: contextvars.ContextVar = contextvars.ContextVar(
+    'session_scope', default=None
+)
+_scope_ids = count(1)
+
+
+def get_session_scope() -> Any:
+    """Get key of the current session.
+
+    Each request has its own session, anything outside
+    of requests gets session of its own thread.
+    """
+    scope = _session_scope.get()
+    if scope is None:
+        return threading.get_ident()
+    return scope
+
+
+session = scoped_session(Session, scopefunc=get_session_scope)
+
+db_executor = ThreadPoolExecutor(
+    max_workers=settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW,
+    thread_name_prefix='db',
+)
+
+
+async def run_in_db_thread(func: Callable[..., T], *args: Any,
+                           **kwargs: Any) -> T:
+    """Run blocking database function without blocking event loop.
+
+    Context variables are copied into the worker thread,
+    so the call uses session of the current request.
+    """
+    loop = asyncio.get_event_loop()
+    context = contextvars.copy_context()
+    child = functools.partial(func, *args, **kwargs)
+    return await loop.run_in_executor(db_executor, context.run, child)
+
+
+@contextmanager
+def session_scope() -> Iterator[None]:
+    """Bind new session to the current context.
+
+    Session itself is created on first use and must be
+    closed with session.remove() before leaving the scope.
+    """
+    token = _session_scope.set(f'scope-{next(_scope_ids)}')
+    try:
+        yield
+    finally:
+        _session_scope.reset(token)
+
+
+def get_pool_statistics() -> Dict[str, Any]:
+    """Get current state of connection pool.
+    """
+    pool = engine.pool
+    statistics = {
+        'size': pool.size(),
+        'checked_in': pool.checkedin(),
+        'checked_out': pool.checkedout(),
+        'overflow': pool.overflow(),
+    }
+
+    if isinstance(pool, MonitoredQueuePool):
+        statistics.update(pool.get_wait_statistics())
+    return statistics
+
+
+def get_records(user_id: int, groups_visible: List[int],
+                target_date: date, offset_left: int,
+                offset_right: int) -> Records:
+    """Get organized records from database.
+
+    Request already gives rows ordered by date and span,
+    so they are only split by dates here.
+    """
+    all_records = load_records(user_id, groups_visible,
+                               target_date, offset_left, offset_right)
+    return organize_records(all_records, target_date,
+                            offset_left, offset_right)
+
+
+def load_records(user_id: int, groups_visible: List[int],
+                 target_date: date, offset_left: int, offset_right: int):
+    """Retrieve all interesting records from database.
+
+    This function works with extremely complicated SQL request.
+    Main goal of doing it like this is to fetch all required resources
+    in single action, rather than making a lot of consecutive request.
+    In previous version, each Day could retrieve all of it's records
+    (in a single request for each persistence type).
+    Therefore, we had to do at least 8 x 35 = 280 requests.
+    """
+    stmt = text(MEGA_REQUEST)
+    return session.execute(stmt, params=dict(user_id=user_id,
+                                             groups_visible=groups_visible,
+                                             target_date=target_date,
+                                             offset_left=offset_left,
+                                             offset_right=offset_right))
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+
+"""Holidays of the countries.
+
+Holidays almost never change, so all of them are kept in memory and
+reloaded by background job. Datasets (CSV with date and name columns
+or iCalendar files) are imported with COPY through a temporary table.
+
+Usage:
+    python -m ordnung.storage.holidays Russia holidays_ru.csv
+    python -m ordnung.storage.holidays Russia holidays_ru.ics
+"""
+import argparse
+import asyncio
+import csv
+import io
+from datetime import date, datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, Optional, TextIO, Tuple
+
+from loguru import logger
+
+from ordnung import settings
+from ordnung.core import icalendar
+from ordnung.core.recurrence import iter_range
+from ordnung.storage.database import (
+    session, session_scope, run_in_db_thread
+)
+from ordnung.storage.models import Country, Holiday
+
+HolidayRow = Tuple[date, str]
+
+
+class HolidayIndex:
+    """All holidays in memory, country id -> date -> name.
+
+    Index is replaced as a whole on reload, so readers never
+    see it half loaded. Version changes only if contents did.
+    """
+
+    def __init__(self) -> None:
+        """Initialize instance.
+        """
+        self._storage: Dict[int, Dict[date, str]] = {}
+        self.version = 0
+
+    def __repr__(self) -> str:
+        """Textual representation.
+        """
+        return (f'{type(self).__name__}(countries={len(self._storage)}, '
+                f'version={self.version})')
+
+    def load(self, rows: Iterable[Tuple[int, date, str]]) -> None:
+        """Replace contents with given rows.
+
+        Several holidays on the same date are joined together.
+        """
+        storage: Dict[int, Dict[date, str]] = {}
+
+        for country_id, event_date, name in rows:
+            days = storage.setdefault(country_id, {})
+            if event_date in days:
+                days[event_date] += f'; {name}'
+            else:
+                days[event_date] = name
+
+        if storage != self._storage:
+            self._storage = storage
+            self.version += 1
+
+    def get(self, country_id: Optional[int], first_day: date,
+            last_day: date) -> Dict[date, str]:
+        """Get holidays of the country in range (inclusive).
+        """
+        days = self._storage.get(country_id)
+
+        if not days:
+            return {}
+
+        return {cur_date: days[cur_date]
+                for cur_date in iter_range(first_day, last_day)
+                if cur_date in days}
+
+
+holiday_index = HolidayIndex()
+
+
+def refresh_holidays() -> None:
+    """Reload holiday index from database.
+    """
+    holiday_index.load(
+        session.query(Holiday.country_id, Holiday.event_date, Holiday.name)
+        .order_by(Holiday.country_id, Holiday.event_date, Holiday.id)
+    )
+
+
+async def maintain_holidays() -> None:
+    """Background job, keeps holiday index up to date.
+    """
+    while True:
+        with session_scope():
+            try:
+                await run_in_db_thread(refresh_holidays)
+                logger.info(f'Holidays loaded: {holiday_index}')
+            except Exception:
+                logger.exception('Failed to load holidays')
+            finally:
+                await run_in_db_thread(session.remove)
+        await asyncio.sleep(settings.HOLIDAYS_REFRESH_INTERVAL)
+
+
+def read_csv(file: TextIO) -> Iterator[HolidayRow]:
+    """Read holidays from CSV with date (YYYY-MM-DD) and name columns.
+
+    First line is skipped if it is a header.
+    """
+    for line_number, row in enumerate(csv.reader(file), start=1):
+        if not row:
+            continue
+
+        try:
+            event_date = datetime.strptime(row[0].strip(), '%Y-%m-%d').date()
+        except ValueError:
+            if line_number == 1:
+                continue
+            raise ValueError(f'Line {line_number}: bad date {row[0]!r}')
+
+        yield event_date, row[1].strip()
+
+
+def read_ics(file: TextIO) -> Iterator[HolidayRow]:
+    """Read holidays from iCalendar file, one per VEVENT.
+    """
+    for event in icalendar.iter_events(file.read()):
+        if 'DTSTART' in event and 'SUMMARY' in event:
+            yield (icalendar.parse_date(event['DTSTART']),
+                   icalendar.unescape_text(event['SUMMARY']))
+
+
+def get_country_id(name: str) -> int:
+    """Get id of the country, create it if it does not exist.
+    """
+    country = session.query(Country).filter_by(name=name).first()
+
+    if country is None:
+        country = Country(name=name)
+        session.add(country)
+        session.flush()
+
+    return country.id
+
+
+def copy_holidays(country_id: int, rows: Iterable[HolidayRow]) -> int:
+    """Save holidays of the country, return amount of new ones.
+
+    Rows go into temporary table with COPY in chunks and then
+    are moved into holidays table, existing ones are skipped.
+    """
+    rows = iter(rows)
+    cursor = session.connection().connection.cursor()
+    cursor.execute('CREATE TEMPORARY TABLE holidays_import '
+                   '(event_date date, name varchar(255)) ON COMMIT DROP')
+
+    while chunk := list(islice(rows, settings.HOLIDAYS_IMPORT_CHUNK)):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(chunk)
+        buffer.seek(0)
+        cursor.copy_expert('COPY holidays_import (event_date, name) '
+                           'FROM STDIN WITH (FORMAT csv)', buffer)
+
+    cursor.execute('INSERT INTO holidays (country_id, event_date, name) '
+                   'SELECT DISTINCT %s, event_date, name '
+                   'FROM holidays_import '
+                   'ON CONFLICT DO NOTHING', (country_id,))
+    return cursor.rowcount
+
+
+def import_holidays(country: str, path: str) -> int:
+    """Import holidays of the country from CSV or iCalendar file.
+    """
+    reader = read_ics if path.lower().endswith('.ics') else read_csv
+
+    with open(path, mode='r', encoding='utf-8', newline='') as file:
+        total = copy_holidays(get_country_id(country), reader(file))
+
+    session.commit()
+    return total
+
+
+def main():
+    """Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('country', help='name of the country')
+    parser.add_argument('path', help='CSV or iCalendar (.ics) file')
+    args = parser.parse_args()
+
+    total = import_holidays(args.country, args.path)
+    print(f'Imported {total} new holidays for {args.country}')
+
+
+if __name__ == '__main__':
+    main()
@@ -6,14 +6,20 @@
 from sqlalchemy import (
     Column, Integer, String, ForeignKey,
     Boolean, DateTime, Index, Date, Time, Float,
-    ARRAY
+    ARRAY, Computed, UniqueConstraint, func, BigInteger
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from werkzeug.security import generate_password_hash, check_password_hash
 
+from ordnung.storage.sql import UNTIL_COMPLETE
+
 Base = declarative_base()
 
+WEEKDAY_EXPRESSION = 'extract(isodow from target_date)::int'
+DAY_EXPRESSION = 'extract(day from target_date)::int'
+MONTH_EXPRESSION = 'extract(month from target_date)::int'
+
 
 class User(Base):
     """User representation.
@@ -35,7 +41,12 @@ class User(Base):
 
     parameters = relationship('Parameter',
                               back_populates='user', uselist=False)
-    Index('users_idx', 'user_id', 'login', 'email')
+
+    # all lookups are case insensitive
+    __table_args__ = (
+        Index('users_login_lower_idx', func.lower(login)),
+        Index('users_email_lower_idx', func.lower(email)),
+    )
 
     def is_authenticated(self) -> bool:
         """Return True if the user is authenticated.
@@ -77,6 +88,23 @@ class Country(Base):
     Index('countries_idx', 'id', 'name')
 
 
+class Holiday(Base):
+    """Official holiday of the country.
+    """
+    __tablename__ = 'holidays'
+    # -------------------------------------------------------------------------
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    country_id = Column(Integer, ForeignKey('countries.id'), nullable=False)
+    # -------------------------------------------------------------------------
+    event_date = Column(Date, nullable=False)
+    name = Column(String(255), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('country_id', 'event_date', 'name',
+                         name='holidays_country_date_name_key'),
+    )
+
+
 class Parameter(Base):
     """User defined parameters.
     """
@@ -149,10 +177,59 @@ class Goal(Base):
     target_time = Column(Time)
     actual_from = Column(DateTime, nullable=False)
     actual_to = Column(DateTime)
-
+    # -------------------------------------------------------------------------
+    # precalculated parts of target date, used in recurrence requests
+    target_weekday = Column(Integer, Computed(WEEKDAY_EXPRESSION))
+    target_day = Column(Integer, Computed(DAY_EXPRESSION))
+    target_month = Column(Integer, Computed(MONTH_EXPRESSION))
+
+    __table_args__ = (
+        Index('goals_user_span_idx', 'user_id', 'span_id', 'group_id'),
+        Index('goals_user_actual_idx', 'user_id', 'actual_from', 'actual_to'),
+        Index('goals_user_target_date_idx', 'user_id', 'target_date'),
+        # until complete goals waiting for rollover
+        Index('goals_until_complete_idx', 'target_date',
+              postgresql_where=span_id == UNTIL_COMPLETE),
+    )
     Index('goals_idx', 'id', 'user_id', 'group_id', 'span_id')
 
 
+class Occurrence(Base):
+    """Materialized appearance of a goal at specific date.
+
+    Recurring spans are expanded beforehand for a rolling horizon,
+    so calendar pages only have to read a date range.
+    """
+    __tablename__ = 'occurrences'
+    # -------------------------------------------------------------------------
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    goal_id = Column(Integer, ForeignKey('goals.id', ondelete='CASCADE'),
+                     nullable=False)
+    # -------------------------------------------------------------------------
+    event_date = Column(Date, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('goal_id', 'event_date',
+                         name='occurrences_goal_date_key'),
+        Index('occurrences_user_date_idx', 'user_id', 'event_date'),
+    )
+
+
+class OccurrenceWindow(Base):
+    """Range of dates that is materialized in occurrences table.
+
+    Table holds single row, so window survives restarts and is
+    the same for all processes.
+    """
+    __tablename__ = 'occurrences_window'
+    # -------------------------------------------------------------------------
+    id = Column(Integer, primary_key=True)
+    # -------------------------------------------------------------------------
+    first_day = Column(Date, nullable=False)
+    last_day = Column(Date, nullable=False)
+
+
 class Metric(Base):
     """Single measurable goal element.
     """
@@ -213,5 +290,31 @@ class Achievement(Base):
     event_time = Column(DateTime, nullable=False)
     value = Column(Integer, nullable=False, default=0)
 
+    __table_args__ = (
+        UniqueConstraint('goal_id', 'event_date',
+                         name='achievements_goal_date_key'),
+    )
     Index('achievements_idx', 'id', 'user_id',
           'goal_id', 'status_id', 'event_date')
+
+
+class GoalProgress(Base):
+    """Running totals of the goal achievements.
+
+    Updated in the same transaction with every achievement write,
+    so progress is never calculated over whole history on render.
+    """
+    __tablename__ = 'goal_progress'
+    # -------------------------------------------------------------------------
+    goal_id = Column(Integer, ForeignKey('goals.id', ondelete='CASCADE'),
+                     primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    # -------------------------------------------------------------------------
+    total_value = Column(BigInteger, nullable=False, default=0)
+    events = Column(Integer, nullable=False, default=0)
+    last_event_date = Column(Date)
+    updated_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index('goal_progress_user_idx', 'user_id', 'updated_at'),
+    )
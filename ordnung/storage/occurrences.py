@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+
+"""Materialized goal occurrences.
+
+Recurring goals are expanded into the occurrences table for a rolling
+window around today. Window is extended by background job and its
+bounds are kept in the database, single goals are rematerialized when
+they are created or changed.
+"""
+import asyncio
+from datetime import date, timedelta
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Query
+
+from ordnung import settings
+from ordnung.core.access import get_today
+from ordnung.core.recurrence import get_occurrences
+from ordnung.storage.access import get_candidate_goals_filter
+from ordnung.storage.database import (
+    session, session_scope, run_in_db_thread
+)
+from ordnung.storage.models import Goal, Occurrence, OccurrenceWindow
+
+Window = Tuple[date, date]
+
+# occurrences_window table holds single row
+WINDOW_ID = 1
+
+
+def get_materialized_window() -> Optional[Window]:
+    """Return range of dates that is present in occurrences table.
+    """
+    window = session.query(
+        OccurrenceWindow.first_day, OccurrenceWindow.last_day
+    ).filter(OccurrenceWindow.id == WINDOW_ID).first()
+    return (window.first_day, window.last_day) if window else None
+
+
+def set_materialized_window(first_day: date, last_day: date) -> None:
+    """Remember range of dates that is present in occurrences table.
+
+    Saved in the same transaction with the rows themselves.
+    """
+    session.merge(OccurrenceWindow(id=WINDOW_ID, first_day=first_day,
+                                   last_day=last_day))
+
+
+def covers(first_day: date, last_day: date) -> bool:
+    """Return True if given range could be read from occurrences table.
+    """
+    window = get_materialized_window()
+    return window is not None and window[0] <= first_day \
+        and last_day <= window[1]
+
+
+def get_target_window(today: date) -> Window:
+    """Calculate range of dates we want to keep materialized.
+    """
+    first_day = today - timedelta(days=settings.OCCURRENCES_HISTORY)
+    last_day = today + timedelta(days=settings.OCCURRENCES_HORIZON)
+    return first_day, last_day
+
+
+def make_rows(goals: Iterable[Goal], first_day: date,
+              last_day: date) -> List[dict]:
+    """Expand goals into occurrences table rows.
+    """
+    return [
+        dict(user_id=goal.user_id, goal_id=goal.id, event_date=event_date)
+        for goal in goals
+        for event_date in get_occurrences(goal, first_day, last_day)
+    ]
+
+
+def insert_rows(rows: List[dict]) -> None:
+    """Save rows, ignoring ones that already exist.
+    """
+    if rows:
+        stmt = insert(Occurrence.__table__).on_conflict_do_nothing(
+            index_elements=['goal_id', 'event_date']
+        )
+        session.execute(stmt, rows)
+
+
+def materialize(first_day: date, last_day: date) -> int:
+    """Expand all goals of all users for the given range.
+
+    Goals are streamed from database in chunks, so memory
+    consumption does not depend on total amount of goals.
+    """
+    total = 0
+    chunk = []
+    query = session.query(Goal).filter(
+        get_candidate_goals_filter(first_day, last_day)
+    ).order_by(Goal.id).yield_per(settings.OCCURRENCES_CHUNK_SIZE)
+
+    for goal in query:
+        chunk.append(goal)
+        if len(chunk) >= settings.OCCURRENCES_CHUNK_SIZE:
+            rows = make_rows(chunk, first_day, last_day)
+            insert_rows(rows)
+            total += len(rows)
+            chunk.clear()
+
+    rows = make_rows(chunk, first_day, last_day)
+    insert_rows(rows)
+    return total + len(rows)
+
+
+def extend_occurrences(today: Optional[date] = None) -> int:
+    """Move materialized window so it covers target range around today.
+
+    Only new days are expanded, days that fell out of the window
+    are removed. Returns amount of new rows.
+    """
+    first_day, last_day = get_target_window(today or get_today())
+    window = get_materialized_window()
+
+    if window is None or window[1] < first_day:
+        total = materialize(first_day, last_day)
+    elif window[1] < last_day:
+        total = materialize(window[1] + timedelta(days=1), last_day)
+    else:
+        total = 0
+
+    session.query(Occurrence).filter(
+        Occurrence.event_date < first_day
+    ).delete(synchronize_session=False)
+    set_materialized_window(first_day, max(last_day, window[1])
+                            if window else last_day)
+    session.commit()
+    return total
+
+
+def refresh_goal_occurrences(goal: Goal) -> None:
+    """Rematerialize single goal after it was created or changed.
+
+    Old rows are removed even if there is no window yet,
+    otherwise they would survive until the goal is expanded again.
+    """
+    session.query(Occurrence).filter(
+        Occurrence.goal_id == goal.id
+    ).delete(synchronize_session=False)
+
+    window = get_materialized_window()
+    if window is not None:
+        insert_rows(make_rows([goal], *window))
+    session.commit()
+
+
+def save_goal(goal: Goal) -> None:
+    """Save goal and update its occurrences.
+    """
+    session.add(goal)
+    session.commit()
+    refresh_goal_occurrences(goal)
+
+
+def query_materialized_goals(user_id: int, first_day: date,
+                             last_day: date) -> Query:
+    """Make query for pairs date-goal of the user from occurrences table.
+    """
+    return session.query(Occurrence.event_date, Goal).join(
+        Goal, Goal.id == Occurrence.goal_id
+    ).filter(
+        Occurrence.user_id == user_id,
+        Occurrence.event_date.between(first_day, last_day),
+    ).order_by(
+        Occurrence.event_date, Goal.span_id, Goal.id
+    )
+
+
+def get_materialized_goals(user_id: int, first_day: date,
+                           last_day: date) -> List[Tuple[date, Goal]]:
+    """Get pairs date-goal for the user from occurrences table.
+    """
+    return query_materialized_goals(user_id, first_day, last_day).all()
+
+
+def iter_materialized_goals(user_id: int, first_day: date,
+                            last_day: date) -> Iterator[Tuple[date, Goal]]:
+    """Same as get_materialized_goals, but rows come from server side cursor.
+    """
+    return iter(query_materialized_goals(user_id, first_day, last_day)
+                .execution_options(stream_results=True)
+                .yield_per(settings.EXPORT_CHUNK_SIZE))
+
+
+async def maintain_occurrences() -> None:
+    """Background job, keeps materialized window up to date.
+    """
+    while True:
+        with session_scope():
+            try:
+                total = await run_in_db_thread(extend_occurrences)
+                window = await run_in_db_thread(get_materialized_window)
+                logger.info(f'Occurrences window is {window}, '
+                            f'{total} new rows')
+            except Exception:
+                logger.exception('Failed to extend occurrences')
+            finally:
+                await run_in_db_thread(session.remove)
+        await asyncio.sleep(settings.OCCURRENCES_REFRESH_INTERVAL)
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+"""Rollover of until complete goals.
+
+Goals with span "Once, until complete" have single target date.
+When day changes in the timezone of the user, all incomplete goals
+are moved to the new date by single UPDATE, so calendar requests
+never have to expand them over the days they were missed.
+"""
+import asyncio
+from datetime import date
+from typing import Dict, List, Set, Tuple
+
+from loguru import logger
+from sqlalchemy import text
+
+from ordnung import settings
+from ordnung.core.access import get_now, get_today
+from ordnung.core.caching import page_cache
+from ordnung.storage.database import (
+    session, session_scope, run_in_db_thread
+)
+from ordnung.storage.models import Occurrence, Parameter
+from ordnung.storage.occurrences import get_materialized_window, insert_rows
+from ordnung.storage.sql import ROLLOVER_REQUEST
+
+# timezone name -> date of the last rollover there
+_rolled: Dict[str, date] = {}
+
+
+def get_timezones() -> Set[str]:
+    """Get names of all timezones users live in.
+    """
+    timezones = {name for name, in
+                 session.query(Parameter.timezone).distinct()}
+    timezones.add(settings.DEFAULT_TIMEZONE)
+    return timezones
+
+
+def get_due_timezones(timezones: Set[str]) -> Dict[str, date]:
+    """Get timezones where day changed since the last rollover.
+    """
+    due = {}
+    for timezone in sorted(timezones):
+        today = get_today(timezone)
+        if _rolled.get(timezone) != today:
+            due[timezone] = today
+    return due
+
+
+def rollover(timezone: str, today: date) -> List[Tuple[int, int]]:
+    """Move incomplete goals of the timezone to today.
+
+    Materialized occurrences of moved goals follow them.
+    Returns pairs (goal_id, user_id) of moved goals.
+    """
+    moved = session.execute(text(ROLLOVER_REQUEST), params=dict(
+        today=today,
+        now=get_now(),
+        timezone=timezone,
+        default_timezone=settings.DEFAULT_TIMEZONE,
+    )).fetchall()
+
+    if moved:
+        goal_ids: List[int] = [goal_id for goal_id, _ in moved]
+        session.query(Occurrence).filter(
+            Occurrence.goal_id.in_(goal_ids)
+        ).delete(synchronize_session=False)
+
+        window = get_materialized_window()
+        if window is not None and window[0] <= today <= window[1]:
+            insert_rows([
+                dict(user_id=user_id, goal_id=goal_id, event_date=today)
+                for goal_id, user_id in moved
+            ])
+
+    session.commit()
+    _rolled[timezone] = today
+    return [(goal_id, user_id) for goal_id, user_id in moved]
+
+
+def rollover_due() -> List[Tuple[int, int]]:
+    """Make rollover in every timezone where day has changed.
+    """
+    return [pair for timezone, today
+            in get_due_timezones(get_timezones()).items()
+            for pair in rollover(timezone, today)]
+
+
+async def maintain_rollover() -> None:
+    """Background job, checks for day change in every timezone.
+    """
+    while True:
+        with session_scope():
+            try:
+                moved = await run_in_db_thread(rollover_due)
+                # page cache is not thread safe, so it is touched
+                # here in the event loop, not in the database thread
+                for user_id in {user_id for _, user_id in moved}:
+                    page_cache.invalidate_user(user_id)
+                if moved:
+                    logger.info(f'Rollover: {len(moved)} goals moved')
+            except Exception:
+                logger.exception('Failed to make rollover')
+            finally:
+                await run_in_db_thread(session.remove)
+        await asyncio.sleep(settings.ROLLOVER_CHECK_INTERVAL)
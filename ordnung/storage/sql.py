@@ -13,134 +13,192 @@ LAST_DAY_OF_MONTH = 8
 EVERY_MONTH = 9
 EVERY_YEAR = 10
 
-INIT_SECTION = r"""
-with date_list as (
-    select (generate_series(date(:target_date) - :offset_left,
-                            date(:target_date) + :offset_right, 
-                            '1 day'::interval)::date) as cur_date
+STATUS_PENDING = 1
+STATUS_UNTIL_COMPLETE = 2
+STATUS_IN_PROGRESS = 3
+STATUS_COMPLETE = 4
+STATUS_FAILED = 5
+STATUS_RESCHEDULED = 6
+STATUS_RESHAPED = 7
+STATUS_CANCELLED = 8
+
+GOAL_COLUMNS = """
+    c.id, c.user_id, c.group_id, c.span_id, c.created_at, c.last_edit_at,
+    c.title, c.description, c.target_date, c.target_time,
+    c.actual_from, c.actual_to
+"""
+
+# Everything that depends on the date itself is calculated once per date
+# here, so sections below only compare plain columns. Goal side has
+# the same values stored in generated columns of the goals table.
+INIT_SECTION = f"""
+with dates as (
+    select cur_date,
+           extract(isodow from cur_date)::int        as weekday,
+           extract(day from cur_date)::int           as day,
+           extract(month from cur_date)::int         as month,
+           extract(week from cur_date)::int % 2      as week_parity,
+           extract(day from cur_date + 1)::int = 1   as is_last_day
+    from (
+             select generate_series(date(:target_date) - :offset_left,
+                                    date(:target_date) + :offset_right,
+                                    '1 day'::interval)::date as cur_date
+         ) as date_list
     ),
-     dates as (
-         select *
-         from date_list
-                  cross join (select min(cur_date) as first_day from date_list) as first_day
-                  cross join (select max(cur_date) as last_day from date_list) as last_day
+     candidates as (
+         select g.*,
+                date(g.actual_from) as start_date,
+                coalesce(date(g.actual_to),
+                         date(:target_date) + :offset_right) as end_date
+         from goals g
+         where g.user_id = :user_id
+           and g.group_id = any(:groups_visible)
+           and (
+                   (g.span_id in ({ONCE}, {UNTIL_COMPLETE})
+                       and g.target_date between date(:target_date) - :offset_left
+                                             and date(:target_date) + :offset_right)
+                   or
+                   (g.span_id not in ({ONCE}, {UNTIL_COMPLETE})
+                       and g.actual_from < date(:target_date) + :offset_right + 1
+                       and (g.actual_to is null
+                           or g.actual_to >= date(:target_date) - :offset_left))
+               )
      )
 """
 
 PERSISTENCE_01_SECTION = f"""
 -- Persistence <happens_once>
-select *
-from dates d
-         inner join {{table_name}} r on d.cur_date = r.target_date
-where r.persistence_id = {ONCE}
+select d.cur_date, {GOAL_COLUMNS}
+from candidates c
+         inner join dates d on d.cur_date = c.target_date
+where c.span_id = {ONCE}
 """
 
+# Target date of incomplete goals is moved to today by rollover job,
+# see ordnung.storage.rollover, so they have single date as well.
 PERSISTENCE_02_SECTION = f"""
 -- Persistence <until_complete>
-select *
-from (
-         select *
-         from dates
-                  cross join {{table_name}} r
-         where r.persistence_id = {UNTIL_COMPLETE}
-     ) as r
-where r.cur_date between r.start_date and coalesce(r.end_date, r.target_date)
+select d.cur_date, {GOAL_COLUMNS}
+from candidates c
+         inner join dates d on d.cur_date = c.target_date
+where c.span_id = {UNTIL_COMPLETE}
 """
 
 PERSISTENCE_03_SECTION = f"""
 -- Persistence <every_day>
-select *
-from dates d
-         cross join {{table_name}} r
-where r.persistence_id = {EVERY_DAY}
-  and d.cur_date between r.start_date and coalesce(r.end_date, d.last_day)
+select d.cur_date, {GOAL_COLUMNS}
+from candidates c
+         inner join dates d on d.cur_date between c.start_date and c.end_date
+where c.span_id = {EVERY_DAY}
 """
 
 PERSISTENCE_04_SECTION = f"""
 -- Persistence <every_week>
-select *
-from dates d
-         cross join {{table_name}} r
-where extract(dow from d.cur_date) = extract(dow from r.target_date)
-  and r.persistence_id = {EVERY_WEEK}
+select d.cur_date, {GOAL_COLUMNS}
+from candidates c
+         inner join dates d on d.weekday = c.target_weekday
+where c.span_id = {EVERY_WEEK}
+  and d.cur_date between c.start_date and c.end_date
 """
 
 PERSISTENCE_05_SECTION = f"""
 -- Persistence <every_odd_week>
-select *
-from dates d
-         cross join {{table_name}} r
-where extract(dow from d.cur_date) = extract(dow from r.target_date)
-  and r.persistence_id = {EVERY_ODD_WEEK}
-    and extract(week from d.cur_date)::int % 2 <> 0
+select d.cur_date, {GOAL_COLUMNS}
+from candidates c
+         inner join dates d on d.weekday = c.target_weekday
+where c.span_id = {EVERY_ODD_WEEK}
+  and d.week_parity = 1
+  and d.cur_date between c.start_date and c.end_date
 """
+
 PERSISTENCE_06_SECTION = f"""
 -- Persistence <every_even_week>
-select *
-from dates d
-         cross join {{table_name}} r
-where extract(dow from d.cur_date) = extract(dow from r.target_date)
-  and r.persistence_id = {EVERY_EVEN_WEEK}
-    and extract(week from d.cur_date)::int % 2 = 0
+select d.cur_date, {GOAL_COLUMNS}
+from candidates c
+         inner join dates d on d.weekday = c.target_weekday
+where c.span_id = {EVERY_EVEN_WEEK}
+  and d.week_parity = 0
+  and d.cur_date between c.start_date and c.end_date
 """
 
 PERSISTENCE_07_SECTION = f"""
 -- Persistence <first_day_of_month>
-select * 
-from dates d 
-        cross join {{table_name}} r
-where extract(day from d.cur_date) = 1 and r.persistence_id = {FIRST_DAY_OF_MONTH}
+select d.cur_date, {GOAL_COLUMNS}
+from candidates c
+         inner join dates d on d.day = 1
+where c.span_id = {FIRST_DAY_OF_MONTH}
+  and d.cur_date between c.start_date and c.end_date
 """
 
 PERSISTENCE_08_SECTION = f"""
 -- Persistence <last_day_of_month>
-select * 
-from dates d 
-        cross join {{table_name}} r
-where extract(day from d.cur_date) 
-        = extract(days FROM date_trunc('month', cur_date) + interval '1 month - 1 day')
-  and r.persistence_id = {LAST_DAY_OF_MONTH}
+select d.cur_date, {GOAL_COLUMNS}
+from candidates c
+         inner join dates d on d.is_last_day
+where c.span_id = {LAST_DAY_OF_MONTH}
+  and d.cur_date between c.start_date and c.end_date
 """
 
 PERSISTENCE_09_SECTION = f"""
 -- Persistence <every_month>
-select * 
-from dates d 
-        cross join {{table_name}} r
-where extract(day from d.cur_date) = extract(day from r.target_date) 
-  and r.persistence_id = {EVERY_MONTH}
+select d.cur_date, {GOAL_COLUMNS}
+from candidates c
+         inner join dates d on d.day = c.target_day
+where c.span_id = {EVERY_MONTH}
+  and d.cur_date between c.start_date and c.end_date
 """
 
 PERSISTENCE_10_SECTION = f"""
 -- Persistence <every_year>
-select *
-from dates d
-         cross join {{table_name}} r
-where extract(day from d.cur_date) = extract(day from r.target_date)
-  and extract(month from d.cur_date) = extract(month from r.target_date)
-  and r.persistence_id = {EVERY_YEAR}
+select d.cur_date, {GOAL_COLUMNS}
+from candidates c
+         inner join dates d
+                    on d.day = c.target_day and d.month = c.target_month
+where c.span_id = {EVERY_YEAR}
+  and d.cur_date between c.start_date and c.end_date
 """
 
+# Span predicates are disjoint, so UNION ALL gives no duplicates
+# and we do not have to pay for sorting the whole result to find them.
 MEGA_REQUEST = f"""
 {INIT_SECTION}
 {PERSISTENCE_01_SECTION}
-UNION
+UNION ALL
 {PERSISTENCE_02_SECTION}
-UNION
+UNION ALL
 {PERSISTENCE_03_SECTION}
-UNION
+UNION ALL
 {PERSISTENCE_04_SECTION}
-UNION
+UNION ALL
 {PERSISTENCE_05_SECTION}
-UNION
+UNION ALL
 {PERSISTENCE_06_SECTION}
-UNION
+UNION ALL
 {PERSISTENCE_07_SECTION}
-UNION
+UNION ALL
 {PERSISTENCE_08_SECTION}
-UNION
+UNION ALL
 {PERSISTENCE_09_SECTION}
-UNION
+UNION ALL
 {PERSISTENCE_10_SECTION}
-order by cur_date;
+order by cur_date, span_id, id;
+"""
+
+# Users without parameters live in default timezone.
+ROLLOVER_REQUEST = f"""
+update goals g
+set target_date  = :today,
+    last_edit_at = :now
+where g.span_id = {UNTIL_COMPLETE}
+  and g.target_date < :today
+  and (g.actual_to is null or g.actual_to >= :today)
+  and coalesce((select p.timezone
+                from parameters p
+                where p.user_id = g.user_id
+                limit 1), :default_timezone) = :timezone
+  and not exists(select 1
+                 from achievements a
+                 where a.goal_id = g.id
+                   and a.status_id = {STATUS_COMPLETE})
+returning g.id, g.user_id;
 """
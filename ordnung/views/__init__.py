@@ -0,0 +1,19 @@
+from ordnung.views.tools import (
+    make_goal_creation_form, make_new_goal_from_form,
+    make_goal_update_form, apply_update_on_goal
+)
+from ordnung.views.auth import index, login, logout, unauthorized
+from ordnung.views.crud import create_goal, update_goal
+from ordnung.views.main import month, day
+from ordnung.views.api import (
+    api_month, api_day, api_range, api_achievements, api_stats
+)
+from ordnung.views.export import export
+from ordnung.views.feed import feed, feed_link
+from ordnung.views.monitoring import (
+    pool_statistics, mail_statistics, cache_statistics
+)
+from ordnung.views.register import (
+    restore_confirm, register_confirm, restore_note,
+    register_note, restore, register
+)
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+"""JSON API for calendar clients.
+"""
+from datetime import date
+from typing import AsyncIterator, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from starlette.authentication import requires
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+
+from ordnung import settings
+from ordnung.core.access import get_today
+from ordnung.core.analytics import make_columns, get_statistics
+from ordnung.core.caching import page_cache
+from ordnung.core.date_and_time import get_month, load_goals, iter_windows
+from ordnung.core.recurrence import iter_range
+from ordnung.presentation.access import (
+    parse_date, get_country_id, get_timezone
+)
+from ordnung.presentation.serialization import (
+    FastJSONResponse, get_fields, serialize_month, serialize_day, dumps_line,
+    bad_request, parse_achievements
+)
+from ordnung.storage.achievements import (
+    upsert_achievements, get_achievement_rows
+)
+from ordnung.storage.database import run_in_db_thread
+from ordnung.storage.holidays import holiday_index
+
+
+@requires('authenticated')
+async def api_month(request: Request) -> Response:
+    """Month table with goals for every day.
+    """
+    try:
+        fields = get_fields(request.query_params.get('fields'))
+        string = request.path_params.get('date')
+        today = get_today(get_timezone(request))
+        current_date = today if string is None else parse_date(string)
+    except ValueError as exc:
+        return bad_request(str(exc))
+
+    month = get_month(current_date, today)
+    await run_in_db_thread(month.load_goals, request.user.id)
+    month.set_holidays(holiday_index.get(get_country_id(request),
+                                         month.first_day, month.last_day))
+    return FastJSONResponse(serialize_month(month, fields))
+
+
+@requires('authenticated')
+async def api_day(request: Request) -> Response:
+    """Goals for a single day.
+    """
+    try:
+        fields = get_fields(request.query_params.get('fields'))
+        current_date = parse_date(request.path_params['date'])
+    except ValueError as exc:
+        return bad_request(str(exc))
+
+    goals = await run_in_db_thread(load_goals, current_date, current_date,
+                                   request.user.id)
+    return FastJSONResponse(
+        serialize_day(current_date, goals.get(current_date, []), fields)
+    )
+
+
+@requires('authenticated')
+async def api_range(request: Request) -> Response:
+    """Goals for every day in range, one JSON object per line.
+
+    Range is loaded by small windows, so long ranges
+    are never kept in memory as a whole.
+    """
+    try:
+        fields = get_fields(request.query_params.get('fields'))
+        first_day = parse_date(request.path_params['first_day'])
+        last_day = parse_date(request.path_params['last_day'])
+    except ValueError as exc:
+        return bad_request(str(exc))
+
+    total_days = (last_day - first_day).days + 1
+    if not 0 < total_days <= settings.API_MAX_DAYS:
+        return bad_request(f'Range must contain from 1 '
+                           f'to {settings.API_MAX_DAYS} days')
+
+    user_id = request.user.id
+
+    async def iterate() -> AsyncIterator[bytes]:
+        for window in iter_windows(first_day, last_day,
+                                   settings.API_CHUNK_DAYS):
+            yield await run_in_db_thread(make_lines, user_id, window, fields)
+
+    return StreamingResponse(iterate(), media_type='application/x-ndjson')
+
+
+def make_lines(user_id: int, window: Tuple[date, date],
+               fields: Tuple[str, ...]) -> bytes:
+    """Load and serialize single window of the range.
+    """
+    goals = load_goals(*window, user_id)
+    return b''.join(
+        dumps_line(serialize_day(cur_date, goals.get(cur_date, []), fields))
+        for cur_date in iter_range(*window)
+    )
+
+
+@requires('authenticated')
+async def api_achievements(request: Request) -> Response:
+    """Save states of many goals at once.
+
+    Whole batch is one statement and one commit,
+    response contains saved states.
+    """
+    try:
+        items = parse_achievements(await request.json())
+    except ValueError as exc:
+        return bad_request(str(exc))
+
+    try:
+        achievements = await run_in_db_thread(upsert_achievements,
+                                              request.user.id, items)
+    except ValueError as exc:
+        return bad_request(str(exc))
+    except IntegrityError:
+        return bad_request('Unknown status')
+
+    page_cache.invalidate_user(request.user.id)
+    return FastJSONResponse({'achievements': achievements})
+
+
+@requires('authenticated')
+async def api_stats(request: Request) -> Response:
+    """Streaks, completion rates and trends of the user.
+    """
+    rows = await run_in_db_thread(get_achievement_rows, request.user.id)
+    return FastJSONResponse(get_statistics(
+        make_columns(rows), get_today(get_timezone(request)),
+        settings.STATS_HISTORY, settings.STATS_WINDOW,
+    ))
@@ -6,6 +6,7 @@
 from starlette.requests import Request
 from starlette.responses import RedirectResponse
 
+from ordnung.core.caching import page_cache
 from ordnung.presentation.access import (
     get_date, get_gettext, get_errors, get_lang
 )
@@ -14,8 +15,9 @@ from ordnung.views import (
     make_goal_creation_form, make_new_goal_from_form,
     make_goal_update_form, apply_update_on_goal
 )
-from ordnung.storage.database import session
-from ordnung.storage.models import Goal
+from ordnung.storage.access import get_goal_by_id
+from ordnung.storage.database import run_in_db_thread
+from ordnung.storage.occurrences import save_goal
 
 
 async def create_goal(request: Request):
@@ -29,8 +31,8 @@ async def create_goal(request: Request):
 
     if request.method == 'POST' and form.validate():
         new_goal = await make_new_goal_from_form(form)
-        session.add(new_goal)
-        session.commit()
+        await run_in_db_thread(save_goal, new_goal)
+        page_cache.invalidate_user(new_goal.user_id)
         return RedirectResponse(
             request.url_for('day', date=current_date), status_code=303
         )
@@ -57,7 +59,7 @@ async def update_goal(request: Request):
     _ = get_gettext(lang)
 
     goal_id = int(request.path_params.get('goal_id'))
-    goal = session.query(Goal).filter_by(id=goal_id).first()
+    goal = await run_in_db_thread(get_goal_by_id, goal_id)
 
     if goal:
         form = await make_goal_update_form(request, goal)
@@ -66,8 +68,8 @@ async def update_goal(request: Request):
 
     if request.method == 'POST' and form.validate():
         await apply_update_on_goal(form, goal)
-        session.add(goal)
-        session.commit()
+        await run_in_db_thread(save_goal, goal)
+        page_cache.invalidate_user(goal.user_id)
         return RedirectResponse(
             request.url_for('day', date=current_date), status_code=303
         )
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+"""Calendar export views.
+"""
+from typing import AsyncIterator
+
+from starlette.authentication import requires
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+
+from ordnung import settings
+from ordnung.core.date_and_time import iter_goals
+from ordnung.presentation.access import parse_date
+from ordnung.presentation.export import EXPORT_FORMATS, render_chunk
+from ordnung.presentation.serialization import bad_request
+from ordnung.storage.database import run_in_db_thread
+
+
+@requires('authenticated')
+async def export(request: Request) -> Response:
+    """Stream all occurrences of the user in range.
+
+    Format is chosen by ?format= argument: csv, ndjson or ics.
+    """
+    export_format = EXPORT_FORMATS.get(
+        request.query_params.get('format', 'csv')
+    )
+    if export_format is None:
+        return bad_request(f'Format must be one of: '
+                           f'{", ".join(EXPORT_FORMATS)}')
+
+    try:
+        first_day = parse_date(request.path_params['first_day'])
+        last_day = parse_date(request.path_params['last_day'])
+    except ValueError as exc:
+        return bad_request(str(exc))
+
+    total_days = (last_day - first_day).days + 1
+    if not 0 < total_days <= settings.API_MAX_DAYS:
+        return bad_request(f'Range must contain from 1 '
+                           f'to {settings.API_MAX_DAYS} days')
+
+    rows = iter_goals(first_day, last_day, request.user.id)
+
+    async def iterate() -> AsyncIterator[bytes]:
+        yield export_format.header
+        while True:
+            chunk = await run_in_db_thread(render_chunk, rows,
+                                           export_format.render_row,
+                                           settings.EXPORT_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+        yield export_format.footer
+
+    filename = f'ordnung_{first_day}_{last_day}.{export_format.extension}'
+    return StreamingResponse(iterate(), media_type=export_format.media_type,
+                             headers={'Content-Disposition':
+                                      f'attachment; filename="{filename}"'})
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+"""Calendar subscription views.
+"""
+from datetime import timedelta
+from typing import Optional, Tuple
+
+from starlette.authentication import requires
+from starlette.requests import Request
+from starlette.responses import Response
+
+from ordnung import settings
+from ordnung.core.access import check_token, generate_token, get_today
+from ordnung.core.caching import page_cache
+from ordnung.presentation.access import (
+    make_etag, get_not_modified, get_etag_headers
+)
+from ordnung.presentation.export import render_feed
+from ordnung.presentation.serialization import FastJSONResponse
+from ordnung.storage.access import (
+    get_goals_version, get_feed_goals, get_user_timezone
+)
+from ordnung.storage.database import run_in_db_thread
+
+FEED_SALT = 'calendar_feed'
+FEED_MEDIA_TYPE = 'text/calendar; charset=utf-8'
+
+
+@requires('authenticated')
+async def feed_link(request: Request) -> FastJSONResponse:
+    """Give user personal URL of the calendar feed.
+    """
+    token = generate_token(payload={'user_id': request.user.id},
+                           salt=FEED_SALT)
+    return FastJSONResponse({'url': request.url_for('feed', token=token)})
+
+
+async def feed(request: Request) -> Response:
+    """Calendar feed of the user, each goal goes with its recurrence rule.
+
+    Calendar applications can not log in, so user is taken from the token.
+    Unchanged feed costs two small queries.
+    """
+    sig_okay, payload = check_token(request.path_params['token'], FEED_SALT)
+    if not sig_okay:
+        return Response(status_code=404)
+
+    user_id = payload['user_id']
+    timezone, version = await run_in_db_thread(get_feed_state, user_id)
+    today = get_today(timezone)
+    first_day = today - timedelta(days=settings.FEED_HISTORY)
+    horizon = today + timedelta(days=settings.FEED_HORIZON)
+
+    etag = make_etag(user_id, 'feed', first_day, version)
+    not_modified = get_not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+    headers = get_etag_headers(etag)
+
+    key = page_cache.make_key(user_id, 'feed', first_day, version)
+    body = page_cache.get(key)
+
+    if body is None:
+        goals = await run_in_db_thread(get_feed_goals, user_id, first_day)
+        body = render_feed(goals, horizon)
+        page_cache.add(key, body)
+
+    return Response(body, media_type=FEED_MEDIA_TYPE, headers=headers)
+
+
+def get_feed_state(user_id: int) -> Tuple[Optional[str], tuple]:
+    """Get timezone of the feed owner and version of the goals.
+    """
+    return get_user_timezone(user_id), get_goals_version(user_id)
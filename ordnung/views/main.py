@@ -7,10 +7,21 @@ from starlette.authentication import requires
 from starlette.requests import Request
 from starlette.responses import HTMLResponse
 
-from ordnung.core.date_and_time import get_offset_dates, get_month, get_day
+from ordnung.core.access import get_today
+from ordnung.core.caching import page_cache
+from ordnung.core.date_and_time import (
+    get_offset_dates, get_month, load_goals
+)
 from ordnung.core.localisation import get_day_names
-from ordnung.presentation.access import get_date, get_translate, get_lang
+from ordnung.presentation.access import (
+    get_date, get_translate, get_lang, make_etag, get_not_modified,
+    get_etag_headers, get_country_id, get_timezone
+)
 from ordnung.presentation.rendering import render_template
+from ordnung.storage.access import get_window_version
+from ordnung.storage.achievements import get_progress
+from ordnung.storage.database import run_in_db_thread
+from ordnung.storage.holidays import holiday_index
 
 
 # @requires('authenticated', redirect='unauthorized')
@@ -18,17 +29,37 @@ async def month(request: Request) -> HTMLResponse:
     """Main page, navigation starts from here. Shows single month.
     """
     current_date = await get_date(request)
-    tr = get_translate(get_lang(request))
+    lang = get_lang(request)
+    today = get_today(get_timezone(request))
+    country_id = get_country_id(request)
+    all_days_in_month = get_month(current_date, today)
+
+    version = await run_in_db_thread(get_window_version, request.user.id,
+                                     all_days_in_month.first_day,
+                                     all_days_in_month.last_day)
+    etag = make_etag(request.user.id, 'month', current_date, today, lang,
+                     version, country_id, holiday_index.version)
+    not_modified = get_not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+    headers = get_etag_headers(etag)
+
+    key = page_cache.make_key(request.user.id, 'month', current_date, today,
+                              lang, country_id, holiday_index.version)
+    body = page_cache.get(key)
+    if body is not None:
+        return HTMLResponse(body, headers=headers)
+
+    tr = get_translate(lang)
     url_for = request.url_for
 
     (leap_back, step_back,
      step_forward, leap_forward) = get_offset_dates(current_date)
 
-    all_days_in_month = get_month(current_date)
-
-    goal_sections = {
-        str(current_date): all_days_in_month[str(current_date)].goals()
-    }
+    await run_in_db_thread(all_days_in_month.load_goals, request.user.id)
+    all_days_in_month.set_holidays(holiday_index.get(
+        country_id, all_days_in_month.first_day, all_days_in_month.last_day
+    ))
 
     context = {
         'request': request,
@@ -37,13 +68,15 @@ async def month(request: Request) -> HTMLResponse:
         'goal_sections': [],
         'menu_is_visible': 0,  # FIXME
         'current_date': current_date,
-        'day_names': get_day_names(get_lang(request)),
+        'day_names': get_day_names(lang),
         'leap_back_url': url_for('month', date=leap_back),
         'step_back_url': url_for('month', date=step_back),
         'step_forward_url': url_for('month', date=step_forward),
         'leap_forward_url': url_for('month', date=leap_forward),
     }
-    return render_template('month.html', context)
+    response = render_template('month.html', context, headers=headers)
+    page_cache.add(key, response.body)
+    return response
 
 
 # @requires('authenticated', redirect='unauthorized')
@@ -51,14 +84,35 @@ async def day(request: Request):
     """Single day navigation.
     """
     current_date = await get_date(request)
-    _ = get_translate(get_lang(request))
+    lang = get_lang(request)
+
+    version = await run_in_db_thread(get_window_version, request.user.id,
+                                     current_date, current_date)
+    etag = make_etag(request.user.id, 'day', current_date, lang, version)
+    not_modified = get_not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+    headers = get_etag_headers(etag)
+
+    key = page_cache.make_key(request.user.id, 'day', current_date, lang)
+    body = page_cache.get(key)
+    if body is not None:
+        return HTMLResponse(body, headers=headers)
 
-    curr_day = get_day(current_date, is_today=True)
+    _ = get_translate(lang)
+    goals = await run_in_db_thread(load_goals, current_date, current_date,
+                                   request.user.id)
+    goals = goals.get(current_date, [])
+    progress = await run_in_db_thread(get_progress,
+                                      [goal.id for goal in goals])
 
     context = {
         'request': request,
         'header': _(f'month_{current_date.month}') + f' ({current_date})',
         'current_date': current_date,
-        'goals': curr_day.goals()
+        'goals': goals,
+        'progress': progress,
     }
-    return render_template("day.html", context)
+    response = render_template('day.html', context, headers=headers)
+    page_cache.add(key, response.body)
+    return response
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+"""Views for service monitoring.
+"""
+from starlette.authentication import requires
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from ordnung.core.caching import page_cache
+from ordnung.presentation.email_sending import mail_queue
+from ordnung.storage.database import get_pool_statistics
+
+
+@requires('authenticated')
+async def pool_statistics(request: Request) -> JSONResponse:
+    """Current state of database connection pool.
+    """
+    return JSONResponse(get_pool_statistics())
+
+
+@requires('authenticated')
+async def mail_statistics(request: Request) -> JSONResponse:
+    """Current state of outgoing email queue.
+    """
+    return JSONResponse({
+        'depth': mail_queue.depth,
+        'sent': mail_queue.sent,
+        'failed': mail_queue.failed,
+    })
+
+
+@requires('authenticated')
+async def cache_statistics(request: Request) -> JSONResponse:
+    """Current state of rendered pages cache.
+    """
+    return JSONResponse(page_cache.statistics())
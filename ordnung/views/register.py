@@ -7,6 +7,7 @@ from starlette.requests import Request
 from starlette.responses import RedirectResponse
 
 from ordnung.core.access import check_token, token_is_too_old
+from ordnung.core.caching import credentials_cache
 from ordnung.presentation.access import get_gettext, get_lang, get_errors
 from ordnung.presentation.email_sending import (
     send_verification_email, send_restore_email
@@ -19,6 +20,7 @@ from ordnung.storage.access import (
     register_user, confirm_registration,
     get_user_by_email_or_login, change_user_password
 )
+from ordnung.storage.database import run_in_db_thread
 
 
 async def register(request: Request):
@@ -31,8 +33,10 @@ async def register(request: Request):
     form = await get_form(request, RegisterForm)
 
     if request.method == 'POST' and form.validate():
-        new_user_id = register_user(form.username, form.login, form.email,
-                                    form.password, form.language)
+        new_user_id = await run_in_db_thread(
+            register_user, form.username, form.login, form.email,
+            form.password, form.language
+        )
 
         if new_user_id:
             if send_verification_email(request, new_user_id, form.email.data):
@@ -94,7 +98,7 @@ async def register_confirm(request: Request):
         header = _('Confirmation link is correct, but too old')
         sig_okay = False
 
-    elif confirm_registration(payload['user_id']):
+    elif await run_in_db_thread(confirm_registration, payload['user_id']):
         header = _('Registration confirmed')
 
     else:
@@ -120,7 +124,8 @@ async def register_resend(request: Request):
     form = await get_form(request, UserContactForm)
 
     if request.method == 'POST' and form.validate():
-        user = get_user_by_email_or_login(form.contact.data)
+        user = await run_in_db_thread(get_user_by_email_or_login,
+                                      form.contact.data)
 
         if user is None:
             errors = [_('There is no user with supplied contact information')]
@@ -156,7 +161,8 @@ async def restore(request: Request):
     form = await get_form(request, UserContactForm)
 
     if request.method == 'POST' and form.validate():
-        user = get_user_by_email_or_login(form.contact.data)
+        user = await run_in_db_thread(get_user_by_email_or_login,
+                                      form.contact.data)
 
         if user is None:
             errors = [_('There is no user with supplied contact information')]
@@ -222,7 +228,10 @@ async def restore_confirm(request: Request):
         header = _('Password restore')
 
     if sig_okay and request.method == 'POST' and form.validate():
-        if change_user_password(payload['user_id'], form.password.data):
+        if await run_in_db_thread(change_user_password, payload['user_id'],
+                                  form.password.data):
+            # cache is not thread safe, so it is changed in the event loop
+            credentials_cache.invalidate_user(payload['user_id'])
             return RedirectResponse(
                 request.url_for('login'), status_code=303
             )
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+"""Core access tools tests.
+"""
+from datetime import date, datetime
+
+import pytest
+import pytz
+
+from ordnung.core import access
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    moment = {'now': 0.0}
+    monkeypatch.setattr(access, '_today', {})
+    monkeypatch.setattr(access.time, 'time', lambda: moment['now'])
+    return moment
+
+
+def set_moment(clock, *args):
+    clock['now'] = pytz.utc.localize(datetime(*args)).timestamp()
+
+
+def test_today_in_timezones(clock):
+    # 23:59:59 in Moscow
+    set_moment(clock, 2020, 5, 4, 20, 59, 59)
+    assert access.get_today('Europe/Moscow') == date(2020, 5, 4)
+    assert access.get_today('UTC') == date(2020, 5, 4)
+    assert access.get_today('Asia/Tokyo') == date(2020, 5, 5)
+
+    set_moment(clock, 2020, 5, 4, 21, 0, 0)
+    assert access.get_today('Europe/Moscow') == date(2020, 5, 5)
+    assert access.get_today('UTC') == date(2020, 5, 4)
+
+
+def test_today_is_cached_till_midnight(clock):
+    set_moment(clock, 2020, 5, 4, 12, 0, 0)
+    assert access.get_today('UTC') == date(2020, 5, 4)
+
+    expires, _ = access._today['UTC']
+    assert expires == pytz.utc.localize(datetime(2020, 5, 5)).timestamp()
+
+
+def test_today_default_timezone(clock):
+    set_moment(clock, 2020, 5, 4, 22, 0, 0)
+    assert access.get_today() == date(2020, 5, 5)  # Europe/Moscow
+    assert access.get_today('Nowhere/Unknown') == date(2020, 5, 5)
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+"""Statistics tests.
+"""
+from datetime import date
+
+import pytest
+
+from ordnung.core.analytics import (
+    make_columns, get_streaks, get_completion, get_rolling_rate,
+    get_histogram, get_statistics
+)
+
+COMPLETE = 4
+FAILED = 5
+
+
+def day(number: int) -> int:
+    return date(2020, 5, number).toordinal()
+
+
+@pytest.fixture()
+def columns():
+    # goal 1: done, done, failed, done, done, done
+    # goal 2: done, done, failed
+    rows = [
+        (day(number), 1, 3, status, 1)
+        for number, status in zip(range(4, 10),
+                                  [COMPLETE, COMPLETE, FAILED,
+                                   COMPLETE, COMPLETE, COMPLETE])
+    ]
+    rows += [
+        (day(11), 2, 4, COMPLETE, 1),
+        (day(18), 2, 4, COMPLETE, 1),
+        (day(25), 2, 4, FAILED, 0),
+    ]
+    return make_columns(reversed(rows))  # order does not matter
+
+
+def test_make_columns_empty():
+    columns = make_columns([])
+    assert len(columns.day) == 0
+    assert get_streaks(columns) == []
+    assert get_completion(columns) == []
+    assert get_histogram(columns, 'month') == []
+
+
+def test_streaks(columns):
+    assert get_streaks(columns) == [
+        dict(goal_id=1, current=3, longest=3),
+        dict(goal_id=2, current=0, longest=2),
+    ]
+
+
+def test_completion(columns):
+    assert get_completion(columns) == [
+        dict(span_id=3, total=6, complete=5, rate=5 / 6),
+        dict(span_id=4, total=3, complete=2, rate=2 / 3),
+    ]
+
+
+def test_rolling_rate(columns):
+    rates = get_rolling_rate(columns, date(2020, 5, 3), date(2020, 5, 12), 3)
+    assert rates == [None, 1.0, 1.0, 2 / 3, 2 / 3, 2 / 3, 1.0, 1.0, 1.0, 1.0]
+
+
+def test_histogram(columns):
+    assert get_histogram(columns, 'week') == [
+        dict(period='2020-05-04', total=6, complete=5),
+        dict(period='2020-05-11', total=1, complete=1),
+        dict(period='2020-05-18', total=1, complete=1),
+        dict(period='2020-05-25', total=1, complete=0),
+    ]
+    assert get_histogram(columns, 'month') == [
+        dict(period='2020-05', total=9, complete=7),
+    ]
+
+    with pytest.raises(ValueError):
+        get_histogram(columns, 'year')
+
+
+def test_statistics(columns):
+    stats = get_statistics(columns, date(2020, 5, 31), 30, 7)
+    assert stats['total'] == 9
+    assert stats['rolling']['first_day'] == '2020-05-02'
+    assert len(stats['rolling']['rates']) == 30
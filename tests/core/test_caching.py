@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+"""In-process caches tests.
+"""
+import pytest
+
+from ordnung.core import caching
+from ordnung.core.caching import CredentialsCache, PageCache
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    moment = [1000.0]
+    monkeypatch.setattr(caching, 'get_monotonic', lambda: moment[0])
+    return moment
+
+
+@pytest.fixture()
+def inst(clock):
+    return CredentialsCache(secret='secret', ttl=10, max_size=2)
+
+
+def test_credentials_ttl(inst, clock):
+    assert inst.get('Basic abc') is None
+    inst.add('Basic abc', 1)
+    assert inst.get('Basic abc') == 1
+
+    clock[0] += 11
+    assert inst.get('Basic abc') is None
+    assert len(inst) == 0
+
+
+def test_credentials_are_not_stored(inst):
+    inst.add('Basic abc', 1)
+    assert 'Basic abc' not in repr(inst._storage)
+
+
+def test_credentials_invalidation(inst):
+    inst.add('Basic abc', 1)
+    inst.add('Basic def', 2)
+    inst.invalidate_user(1)
+    assert inst.get('Basic abc') is None
+    assert inst.get('Basic def') == 2
+
+
+def test_credentials_size_limit(inst):
+    inst.add('Basic 1', 1)
+    inst.add('Basic 2', 2)
+    assert inst.get('Basic 1') == 1  # now Basic 2 is the oldest one
+    inst.add('Basic 3', 3)
+    assert len(inst) == 2
+    assert inst.get('Basic 2') is None
+    assert inst.get('Basic 1') == 1
+    assert inst.get('Basic 3') == 3
+
+
+def test_pages_invalidation():
+    inst = PageCache(max_bytes=100)
+    key = inst.make_key(1, 'month', '2020-05-10', 'EN')
+    assert inst.get(key) is None
+    inst.add(key, b'page')
+    assert inst.get(key) == b'page'
+
+    inst.invalidate_user(1)
+    assert inst.get(inst.make_key(1, 'month', '2020-05-10', 'EN')) is None
+    inst.add(key, b'stale')  # rendered before goals were changed
+    assert len(inst) == 0
+    assert inst.statistics()['hits'] == 1
+    assert inst.statistics()['misses'] == 2
+
+
+def test_pages_size_limit():
+    inst = PageCache(max_bytes=10)
+    inst.add(inst.make_key(1, 'a'), b'12345')
+    inst.add(inst.make_key(2, 'b'), b'12345')
+    inst.get(inst.make_key(1, 'a'))  # now page of user 2 is the oldest one
+    inst.add(inst.make_key(3, 'c'), b'123')
+    assert inst.size == 8
+    assert inst.get(inst.make_key(2, 'b')) is None
+    assert inst.get(inst.make_key(1, 'a')) == b'12345'
+    inst.add(inst.make_key(4, 'd'), b'12345678901')
+    assert inst.get(inst.make_key(4, 'd')) is None
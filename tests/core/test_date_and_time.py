@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+"""Month and day building tests.
+"""
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import pytest
+
+from ordnung import settings
+from ordnung.core import date_and_time
+from ordnung.core.date_and_time import get_month
+from ordnung.storage.sql import ONCE, EVERY_WEEK
+
+
+@pytest.fixture()
+def requests_log(monkeypatch):
+    log = []
+
+    def fake_loader(user_id, first_day, last_day):
+        log.append((user_id, first_day, last_day))
+        return [
+            SimpleNamespace(id=1, span_id=ONCE, target_date=date(2020, 5, 10),
+                            actual_from=datetime(2020, 5, 1), actual_to=None),
+            SimpleNamespace(id=2, span_id=EVERY_WEEK,
+                            target_date=date(2020, 5, 3),
+                            actual_from=datetime(2020, 5, 1), actual_to=None),
+            SimpleNamespace(id=3, span_id=ONCE, target_date=date(2020, 5, 12),
+                            actual_from=datetime(2020, 5, 1), actual_to=None),
+        ]
+
+    monkeypatch.setattr(date_and_time, 'covers', lambda *args: False)
+    monkeypatch.setattr(date_and_time, 'get_candidate_goals', fake_loader)
+    monkeypatch.setattr(date_and_time, 'get_progress', lambda goal_ids: {})
+    return log
+
+
+def test_month_loads_goals_once(requests_log):
+    month = get_month(date(2020, 5, 10), today=date(2020, 5, 10))
+    month.load_goals(user_id=7)
+
+    assert requests_log == [(7, date(2020, 4, 20), date(2020, 5, 24))]
+    assert [x.id for x in month.goals(month['2020-05-10'])] == [1, 2]
+    assert [x.id for x in month.goals(month['2020-05-12'])] == [3]
+    assert [x.id for x in month.goals(month['2020-05-17'])] == [2]
+    assert month.goals(month['2020-04-26']) == []
+    assert month.goals(month['2020-05-11']) == []
+    assert len(requests_log) == 1
+
+
+def test_month_grid_is_shared(requests_log):
+    first = get_month(date(2020, 5, 10), today=date(2020, 5, 12))
+    first.load_goals(user_id=7)
+    second = get_month(date(2020, 5, 10), today=date(2020, 5, 12))
+
+    assert first.grid is second.grid
+    assert second.goals(second['2020-05-10']) == []
+    assert len(first.weeks()) == settings.WEEKS_IN_MONTH
+    assert all(len(week) == settings.WEEK_LENGTH for week in first.weeks())
+    assert first.days_list[first.today_index].date == '2020-05-12'
+    assert first['2020-05-12'].css_class == 'day today'
+    assert first['2020-05-16'].css_class == 'day weekend'
+
+
+def test_month_without_today():
+    month = get_month(date(2020, 5, 10), today=date(2021, 1, 1))
+    assert month.today_index == -1
+    assert not any(day.is_today for day in month.days_list)
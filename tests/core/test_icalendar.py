@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+"""iCalendar writer tests.
+"""
+from datetime import date, datetime, time, timedelta, timezone
+
+from ordnung.core.icalendar import escape_text, fold_line, make_event
+
+
+def test_escape_text():
+    assert escape_text('a,b;c\\d\ne') == r'a\,b\;c\\d\ne'
+
+
+def test_fold_line():
+    line = 'SUMMARY:' + 'ж' * 100
+    folded = fold_line(line)
+    parts = folded.split('\r\n')
+
+    assert parts[-1] == ''
+    assert all(len(part.encode('utf-8')) <= 75 for part in parts)
+    assert ''.join(part[1:] if i else part
+                   for i, part in enumerate(parts)) == line
+
+
+def test_make_event():
+    event = make_event('1@ordnung', date(2020, 5, 10), 'Walk')
+    assert 'DTSTART;VALUE=DATE:20200510\r\n' in event
+    assert event.startswith('BEGIN:VEVENT\r\n')
+    assert event.endswith('END:VEVENT\r\n')
+
+    event = make_event('1@ordnung', date(2020, 5, 10), 'Walk',
+                       event_time=time(9, 30))
+    assert 'DTSTART:20200510T093000\r\n' in event
+
+
+def test_stamp_in_utc():
+    event = make_event('1@ordnung', date(2020, 5, 10), 'Walk')
+    assert 'DTSTAMP:19700101T000000Z\r\n' in event
+
+    moscow = timezone(timedelta(hours=3))
+    event = make_event('1@ordnung', date(2020, 5, 10), 'Walk',
+                       stamp=datetime(2020, 5, 10, 1, 30, tzinfo=moscow))
+    assert 'DTSTAMP:20200509T223000Z\r\n' in event
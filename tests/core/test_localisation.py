@@ -5,7 +5,10 @@
 import pytest
 
 import ordnung.settings
-from ordnung.core.localisation import get_day_names, translate, gettext
+from ordnung.core.localisation import (
+    get_day_names, translate, gettext, get_misses, MISSES,
+    compile_fallbacks, DYNAMIC_CATALOGS
+)
 
 
 @pytest.fixture()
@@ -50,3 +53,27 @@ def test_gettext():
     assert gettext('JP', 'Month') == 'Month'
     assert gettext('RU', 'wtf') == 'wtf'
     assert gettext('EN', 'wtf') == 'wtf'
+
+
+def test_translation_misses():
+    MISSES.clear()
+    gettext('RU', 'wtf')
+    gettext('RU', 'wtf')
+    gettext('EN', 'wtf')
+    translate('RU', 'something')
+    assert get_misses() == [(('RU', 'wtf'), 2), (('RU', 'something'), 1)]
+
+
+def test_fallbacks():
+    fallbacks = compile_fallbacks({'a': '1', 'a__': '3', 'b_': '2'})
+    assert fallbacks == {'a': ('1', '1', '3'), 'b': (None, '2')}
+
+
+def test_catalogs_are_read_only():
+    size = len(DYNAMIC_CATALOGS['RU'])
+    translate('RU', 'month_1___')
+    translate('RU', 'something_')
+
+    assert len(DYNAMIC_CATALOGS['RU']) == size
+    with pytest.raises(TypeError):
+        DYNAMIC_CATALOGS['RU']['key'] = 'value'
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+
+"""Records handling tests.
+"""
+from collections import namedtuple
+from datetime import date
+
+import pytest
+
+from ordnung.core.records import organize_records, sort_nested_records
+
+Row = namedtuple('Row', 'id cur_date span_id')
+
+
+def test_organize_records():
+    rows = [Row(1, date(2020, 5, 9), 4), Row(2, date(2020, 5, 9), 1),
+            Row(3, date(2020, 5, 11), None)]
+    records = organize_records(rows, date(2020, 5, 10), 1, 1)
+
+    assert list(records) == ['2020-05-09', '2020-05-10', '2020-05-11']
+    assert records['2020-05-09'][0] is rows[0]
+    assert records['2020-05-10'] == []
+
+    sorted_records = sort_nested_records(records)
+    assert sorted_records is records
+    assert [x.id for x in records['2020-05-09']] == [2, 1]
+
+
+def test_organize_records_duplicates():
+    rows = [Row(1, date(2020, 5, 10), 4), Row(1, date(2020, 5, 10), 4)]
+    assert len(organize_records(rows, date(2020, 5, 10), 0, 0)
+               ['2020-05-10']) == 2
+    assert len(organize_records(rows, date(2020, 5, 10), 0, 0, dedupe=True)
+               ['2020-05-10']) == 1
+
+
+def test_organize_records_out_of_range():
+    with pytest.raises(ValueError):
+        organize_records([Row(1, date(2020, 5, 8), 4)],
+                         date(2020, 5, 10), 1, 1)
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+"""Recurrence expansion tests.
+"""
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import pytest
+from dateutil.rrule import rrulestr
+
+from ordnung.core.recurrence import (
+    get_occurrences, expand_goals, get_segments
+)
+from ordnung.storage.sql import (
+    ONCE, UNTIL_COMPLETE, EVERY_DAY, EVERY_WEEK, EVERY_ODD_WEEK,
+    EVERY_EVEN_WEEK, FIRST_DAY_OF_MONTH, LAST_DAY_OF_MONTH, EVERY_MONTH,
+    EVERY_YEAR
+)
+
+
+def make_goal(span_id, target_date=None, actual_from=date(2000, 1, 1),
+              actual_to=None, id_=1):
+    return SimpleNamespace(
+        id=id_,
+        span_id=span_id,
+        target_date=target_date,
+        actual_from=datetime.combine(actual_from, datetime.min.time()),
+        actual_to=actual_to,
+    )
+
+
+def dates(goal, first_day, last_day):
+    return list(get_occurrences(goal, first_day, last_day))
+
+
+def test_once():
+    goal = make_goal(ONCE, date(2020, 5, 10), actual_from=date(2020, 6, 1))
+    assert dates(goal, date(2020, 5, 1), date(2020, 5, 31)) \
+        == [date(2020, 5, 10)]
+    assert dates(goal, date(2020, 6, 1), date(2020, 6, 30)) == []
+
+
+def test_until_complete():
+    # missed days are not shown, rollover moves target date instead
+    goal = make_goal(UNTIL_COMPLETE, date(2020, 5, 4),
+                     actual_from=date(2020, 5, 2))
+    assert dates(goal, date(2020, 5, 1), date(2020, 5, 31)) \
+        == [date(2020, 5, 4)]
+    assert dates(goal, date(2020, 5, 5), date(2020, 5, 31)) == []
+
+
+def test_every_day_bounds():
+    goal = make_goal(EVERY_DAY, actual_from=date(2020, 5, 30),
+                     actual_to=datetime(2020, 6, 2, 12, 0))
+    assert dates(goal, date(2020, 5, 1), date(2020, 6, 30)) \
+        == [date(2020, 5, 30), date(2020, 5, 31),
+            date(2020, 6, 1), date(2020, 6, 2)]
+
+
+def test_every_week():
+    goal = make_goal(EVERY_WEEK, date(2020, 5, 6))  # wednesday
+    assert dates(goal, date(2020, 6, 1), date(2020, 6, 20)) \
+        == [date(2020, 6, 3), date(2020, 6, 10), date(2020, 6, 17)]
+
+
+@pytest.mark.parametrize('span_id,parity', [
+    (EVERY_ODD_WEEK, 1),
+    (EVERY_EVEN_WEEK, 0),
+])
+def test_week_parity(span_id, parity):
+    goal = make_goal(span_id, date(2020, 5, 4))  # monday
+    result = dates(goal, date(2020, 11, 1), date(2021, 2, 1))
+    assert result
+    assert all(x.weekday() == 0 for x in result)
+    assert all(x.isocalendar()[1] % 2 == parity for x in result)
+    # 2020 has 53 weeks, so odd week 53 is followed by odd week 1
+    if parity:
+        assert date(2020, 12, 28) in result
+        assert date(2021, 1, 4) in result
+
+
+def test_month_edges():
+    first = make_goal(FIRST_DAY_OF_MONTH)
+    last = make_goal(LAST_DAY_OF_MONTH)
+    assert dates(first, date(2020, 1, 15), date(2020, 3, 15)) \
+        == [date(2020, 2, 1), date(2020, 3, 1)]
+    assert dates(last, date(2020, 1, 15), date(2020, 3, 15)) \
+        == [date(2020, 1, 31), date(2020, 2, 29)]
+
+
+def test_every_month_skips_short_months():
+    goal = make_goal(EVERY_MONTH, date(2020, 1, 31))
+    assert dates(goal, date(2020, 1, 1), date(2020, 5, 31)) \
+        == [date(2020, 1, 31), date(2020, 3, 31), date(2020, 5, 31)]
+
+
+def test_every_year_leap_day():
+    goal = make_goal(EVERY_YEAR, date(2016, 2, 29))
+    assert dates(goal, date(2017, 1, 1), date(2024, 12, 31)) \
+        == [date(2020, 2, 29), date(2024, 2, 29)]
+
+
+def test_expand_goals():
+    goals = [
+        make_goal(EVERY_WEEK, date(2020, 5, 4), id_=2),
+        make_goal(ONCE, date(2020, 5, 11), id_=1),
+    ]
+    result = expand_goals(goals, date(2020, 5, 10), date(2020, 5, 12))
+    assert list(result) == [date(2020, 5, 10), date(2020, 5, 11),
+                            date(2020, 5, 12)]
+    assert [x.id for x in result[date(2020, 5, 11)]] == [1, 2]
+    assert result[date(2020, 5, 10)] == []
+
+
+@pytest.mark.parametrize('span_id, target_date', [
+    (EVERY_DAY, date(2019, 3, 1)),
+    (EVERY_WEEK, date(2019, 3, 6)),
+    (EVERY_ODD_WEEK, date(2019, 3, 6)),
+    (EVERY_EVEN_WEEK, date(2019, 3, 9)),
+    (FIRST_DAY_OF_MONTH, None),
+    (LAST_DAY_OF_MONTH, None),
+    (EVERY_MONTH, date(2019, 1, 31)),
+    (EVERY_YEAR, date(2016, 2, 29)),
+])
+def test_segments_match_occurrences(span_id, target_date):
+    goal = make_goal(span_id, target_date, actual_from=date(2019, 2, 1),
+                     actual_to=datetime(2024, 12, 31))
+    expanded = []
+
+    for segment in get_segments(goal, horizon=date(2030, 1, 1)):
+        rule = f'{segment.rrule};UNTIL={segment.last_date:%Y%m%d}'
+        start = datetime.combine(segment.first_date, datetime.min.time())
+        expanded.extend(x.date() for x in rrulestr(rule, dtstart=start))
+
+    assert expanded == dates(goal, date(2019, 1, 1), date(2025, 12, 31))
+
+
+def test_segments_of_odd_weeks():
+    # 2020 has 53 weeks, so weeks 53 and 1 are both odd
+    goal = make_goal(EVERY_ODD_WEEK, date(2020, 12, 30),
+                     actual_from=date(2020, 6, 1))
+    segments = get_segments(goal, horizon=date(2021, 6, 1))
+
+    assert [(x.first_date, x.last_date) for x in segments] == [
+        (date(2020, 6, 3), date(2020, 12, 30)),
+        (date(2021, 1, 6), date(2021, 5, 26)),
+    ]
+
+
+def test_segments_of_single_goal():
+    goal = make_goal(ONCE, date(2020, 5, 10), actual_from=date(2020, 6, 1))
+    assert get_segments(goal, horizon=date(2030, 1, 1)) \
+        == [(date(2020, 5, 10), None, None)]
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+
+"""Request tools tests.
+"""
+from datetime import date
+from types import SimpleNamespace
+
+from ordnung.presentation.access import make_etag, get_not_modified
+
+
+def test_make_etag():
+    etag = make_etag(1, 'month', date(2020, 5, 10), 'EN', (None, 0))
+    assert etag.startswith('W/"')
+    assert etag == make_etag(1, 'month', date(2020, 5, 10), 'EN', (None, 0))
+    assert etag != make_etag(1, 'month', date(2020, 5, 10), 'EN', (None, 1))
+
+
+def test_not_modified():
+    etag = make_etag(1, 'day')
+    request = SimpleNamespace(headers={'if-none-match': f'W/"x", {etag}'})
+    response = get_not_modified(request, etag)
+
+    assert response.status_code == 304
+    assert response.headers['etag'] == etag
+    assert get_not_modified(SimpleNamespace(headers={}), etag) is None
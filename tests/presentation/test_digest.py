@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+"""Reminder digests tests.
+"""
+import smtplib
+import threading
+from datetime import date, datetime
+from types import SimpleNamespace
+
+from ordnung.presentation import digest
+from ordnung.presentation.email_sending import Email
+from ordnung.storage.sql import EVERY_DAY, ONCE
+
+
+class FakeConnection:
+    def __init__(self, log):
+        self.log = log
+
+    def sendmail(self, sender, targets, message):
+        self.log.append((threading.current_thread().name, targets[0]))
+
+    def quit(self):
+        pass
+
+
+def test_send_digest(monkeypatch):
+    users = [SimpleNamespace(id=x, name=f'User {x}',
+                             email=f'user{x}@example.com')
+             for x in range(1, 11)]
+    requested_chunks = []
+
+    def get_users_chunk(after_id, limit):
+        chunk = [x for x in users if x.id > after_id][:limit]
+        requested_chunks.append([x.id for x in chunk])
+        return chunk
+
+    def get_goals(user_ids, first_day, last_day):
+        # odd users have something every day, even ones only on other date
+        return [
+            SimpleNamespace(id=x, user_id=x, title=f'Goal {x}',
+                            span_id=EVERY_DAY if x % 2 else ONCE,
+                            target_date=date(2020, 1, 1),
+                            actual_from=datetime(2020, 1, 1), actual_to=None)
+            for x in user_ids
+        ]
+
+    monkeypatch.setattr(digest, 'get_users_chunk', get_users_chunk)
+    monkeypatch.setattr(digest, 'get_candidate_goals_of_users', get_goals)
+    monkeypatch.setattr(digest.session, 'expunge_all', lambda: None)
+
+    log = []
+    connections = []
+
+    def connect():
+        connections.append(1)
+        return FakeConnection(log)
+
+    report = digest.send_digest(date(2020, 6, 1), chunk_size=4,
+                                connections=2, connect=connect)
+
+    assert requested_chunks == [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10], []]
+    assert report.users == 10
+    assert report.sent == 5
+    assert report.failed == 0
+    assert sorted(x[1] for x in log) == [f'user{x}@example.com'
+                                         for x in (1, 3, 5, 7, 9)]
+    assert len(connections) <= 2
+
+
+class RefusingConnection(FakeConnection):
+    def __init__(self, log):
+        super().__init__(log)
+        self.closed = False
+
+    def sendmail(self, sender, targets, message):
+        if targets[0].startswith('refused'):
+            raise smtplib.SMTPRecipientsRefused(
+                {targets[0]: (550, b'no such user')})
+        if targets[0].startswith('busy'):
+            raise smtplib.SMTPRecipientsRefused(
+                {targets[0]: (450, b'mailbox busy')})
+        message.encode('ascii')
+        super().sendmail(sender, targets, message)
+
+    def quit(self):
+        self.closed = True
+
+
+def test_pool_survives_bad_emails():
+    log = []
+    connections = []
+
+    def connect():
+        connections.append(RefusingConnection(log))
+        return connections[-1]
+
+    pool = digest.ConnectionPool(connect, size=1)
+    emails = [Email('me@example.com', [target], message)
+              for target, message in [('refused@example.com', 'Hi'),
+                                      ('busy@example.com', 'Hi'),
+                                      ('user1@example.com', 'Hi'),
+                                      ('user2@example.com', 'Привет'),
+                                      ('user3@example.com', 'Hi')]]
+
+    assert pool.send_all(emails) == 2
+    pool.close()
+
+    # refused recipients keep connection, broken message drops it
+    assert len(connections) == 2
+    assert [x.closed for x in connections] == [True, True]
+    assert [x[1] for x in log] == ['user1@example.com', 'user3@example.com']
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+
+"""Outgoing email queue tests.
+
+Messages are delivered to a small local stand-in SMTP server.
+"""
+import asyncio
+
+import pytest
+
+from ordnung.presentation.email_sending import (
+    MailQueue, SMTPServer, Email, make_message
+)
+
+
+class StandInSMTP:
+    """Bare minimum of SMTP, remembers everything it receives.
+    """
+
+    def __init__(self):
+        self.connections = 0
+        self.messages = []
+        self.server = None
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self.handle, '127.0.0.1', 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        writer.write(b'220 stand-in ready\r\n')
+
+        while line := await reader.readline():
+            command = line.decode().strip().upper()
+
+            if command.startswith('DATA'):
+                writer.write(b'354 go ahead\r\n')
+                data = await reader.readuntil(b'\r\n.\r\n')
+                self.messages.append(data.decode())
+                writer.write(b'250 ok\r\n')
+
+            elif command.startswith('RCPT') and 'REFUSED' in command:
+                writer.write(b'550 no such user\r\n')
+
+            elif command.startswith('QUIT'):
+                writer.write(b'221 bye\r\n')
+                await writer.drain()
+                break
+
+            else:
+                writer.write(b'250 ok\r\n')
+            await writer.drain()
+
+        writer.close()
+
+
+def make_email(target: str) -> Email:
+    message = make_message('Subject', [target], f'Hello, {target}',
+                           sender='ordnung@example.com')
+    return Email('ordnung@example.com', [target], message)
+
+
+async def deliver(queue: MailQueue):
+    worker = asyncio.ensure_future(queue.run())
+    await asyncio.wait_for(queue.join(), timeout=5)
+    worker.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await worker
+
+
+def test_batch_over_single_connection():
+    async def main():
+        smtp = StandInSMTP()
+        port = await smtp.start()
+        queue = MailQueue(
+            connect=SMTPServer(None, None, '127.0.0.1', port,
+                               use_tls=False).connect,
+            batch_size=2,
+        )
+        for target in ('a@example.com', 'b@example.com', 'c@example.com'):
+            queue.put(make_email(target))
+        assert queue.depth == 3
+
+        await deliver(queue)
+        await smtp.stop()
+        return smtp, queue
+
+    smtp, queue = asyncio.run(main())
+
+    assert smtp.connections == 1
+    assert len(smtp.messages) == 3
+    assert 'To: c@example.com' in smtp.messages[-1]
+    assert queue.sent == 3
+    assert queue.depth == 0
+
+
+def test_retry_after_failure():
+    async def main():
+        smtp = StandInSMTP()
+        port = await smtp.start()
+        attempts = []
+
+        def flaky_connect():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise ConnectionRefusedError
+            return SMTPServer(None, None, '127.0.0.1', port,
+                              use_tls=False).connect()
+
+        queue = MailQueue(connect=flaky_connect, retry_delay=0.01)
+        queue.put(make_email('a@example.com'))
+
+        await deliver(queue)
+        await smtp.stop()
+        return smtp, queue, attempts
+
+    smtp, queue, attempts = asyncio.run(main())
+
+    assert len(attempts) == 2
+    assert len(smtp.messages) == 1
+    assert queue.sent == 1
+    assert queue.failed == 0
+
+
+def test_broken_email_does_not_stop_worker():
+    async def main():
+        smtp = StandInSMTP()
+        port = await smtp.start()
+        queue = MailQueue(
+            connect=SMTPServer(None, None, '127.0.0.1', port,
+                               use_tls=False).connect,
+            retry_delay=0.01,
+        )
+        # smtplib can not encode non-ASCII string message
+        queue.put(Email('ordnung@example.com', ['a@example.com'], 'Привет'))
+        queue.put(make_email('b@example.com'))
+
+        await deliver(queue)
+        await smtp.stop()
+        return smtp, queue
+
+    smtp, queue = asyncio.run(main())
+
+    assert len(smtp.messages) == 1
+    assert 'To: b@example.com' in smtp.messages[0]
+    assert queue.sent == 1
+    assert queue.failed == 1
+    assert queue.depth == 0
+
+
+def test_refused_recipient_is_not_retried():
+    async def main():
+        smtp = StandInSMTP()
+        port = await smtp.start()
+        queue = MailQueue(
+            connect=SMTPServer(None, None, '127.0.0.1', port,
+                               use_tls=False).connect,
+            retry_delay=0.01,
+        )
+        queue.put(make_email('refused@example.com'))
+        queue.put(make_email('b@example.com'))
+
+        await deliver(queue)
+        await smtp.stop()
+        return smtp, queue
+
+    smtp, queue = asyncio.run(main())
+
+    assert smtp.connections == 1
+    assert len(smtp.messages) == 1
+    assert queue.sent == 1
+    assert queue.failed == 1
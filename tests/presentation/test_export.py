@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+"""Calendar export tests.
+"""
+from datetime import date, datetime
+from types import SimpleNamespace
+
+from ordnung.core import date_and_time
+from ordnung.core.date_and_time import iter_goals
+from ordnung.presentation.export import (
+    EXPORT_FORMATS, render_chunk, render_feed
+)
+from ordnung.storage.sql import EVERY_WEEK
+
+
+def test_export_is_chunked(monkeypatch):
+    windows = []
+    goal = SimpleNamespace(id=2, span_id=EVERY_WEEK, title='Walk, run',
+                           description='', target_date=date(2020, 1, 5),
+                           target_time=None, last_edit_at=None,
+                           actual_from=datetime(2020, 1, 1), actual_to=None)
+
+    def fake_loader(user_id, first_day, last_day):
+        windows.append((first_day, last_day))
+        return [goal]
+
+    monkeypatch.setattr(date_and_time, 'covers', lambda *args: False)
+    monkeypatch.setattr(date_and_time, 'get_candidate_goals', fake_loader)
+    rows = iter_goals(date(2020, 1, 1), date(2020, 12, 31), user_id=1)
+    render_row = EXPORT_FORMATS['csv'].render_row
+
+    first = render_chunk(rows, render_row, 3)
+    assert first.decode('utf-8').splitlines() == [
+        '2020-01-05,2,4,"Walk, run",',
+        '2020-01-12,2,4,"Walk, run",',
+        '2020-01-19,2,4,"Walk, run",',
+    ]
+    assert len(windows) == 1
+
+    rest = render_chunk(rows, render_row, 1000)
+    assert len(rest.splitlines()) == 52 - 3
+    assert render_chunk(rows, render_row, 1000) == b''
+    assert len(windows) == 12
+
+
+def test_feed_has_rules():
+    goal = SimpleNamespace(id=3, span_id=EVERY_WEEK, title='Walk',
+                           description='', target_date=date(2020, 1, 5),
+                           target_time=None, last_edit_at=None,
+                           actual_from=datetime(2020, 1, 1),
+                           actual_to=datetime(2020, 12, 31))
+    body = render_feed([goal], horizon=date(2030, 1, 1)).decode('utf-8')
+
+    assert body.startswith('BEGIN:VCALENDAR\r\n')
+    assert body.count('BEGIN:VEVENT') == 1
+    assert 'UID:3@ordnung\r\n' in body
+    assert 'DTSTART;VALUE=DATE:20200105\r\n' in body
+    assert 'RRULE:FREQ=WEEKLY;BYDAY=SU;UNTIL=20201231\r\n' in body
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+"""Middleware tests.
+"""
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from ordnung.presentation.middleware import (
+    DBSessionMiddleware, ContextExtensionMiddleware, UnauthenticatedUser
+)
+from ordnung.storage.database import session, run_in_db_thread
+
+
+def test_session_per_request():
+    seen = []
+
+    async def endpoint(request):
+        current = session()
+        # same session in worker threads of this request
+        assert await run_in_db_thread(session) is current
+        seen.append(current)
+        return PlainTextResponse('ok')
+
+    app = Starlette(routes=[Route('/', endpoint)],
+                    middleware=[Middleware(DBSessionMiddleware)])
+    client = TestClient(app)
+
+    assert client.get('/').text == 'ok'
+    assert client.get('/').text == 'ok'
+
+    assert len(seen) == 2
+    assert seen[0] is not seen[1]
+    assert not session.registry.has()
+
+
+def test_context_extensions():
+    seen = []
+
+    async def endpoint(request):
+        seen.append(dict(request.state.context_extensions))
+        return PlainTextResponse('ok')
+
+    async def fake_auth(scope, receive, send):
+        scope['user'] = UnauthenticatedUser()
+        await app(scope, receive, send)
+
+    app = ContextExtensionMiddleware(Starlette(routes=[Route('/', endpoint)]))
+    client = TestClient(fake_auth)
+
+    client.get('/')
+    client.get('/')
+
+    first, second = seen
+    assert set(first) == {'gettext', '_', 'translate', 'user', 'errors'}
+    assert first['gettext'] is second['gettext'] is second['_']
+    assert first['translate'] is second['translate']
+    assert first['translate']('month_1') == 'Январь'
+    assert first['errors'] is not second['errors']
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+"""API serialization tests.
+"""
+from datetime import date
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+from ordnung.core.date_and_time import get_month
+from ordnung.presentation.serialization import (
+    get_fields, serialize_month, dumps_line, DEFAULT_GOAL_FIELDS,
+    parse_achievements
+)
+
+
+def test_get_fields():
+    assert get_fields(None) == DEFAULT_GOAL_FIELDS
+    assert get_fields('id, title') == ('id', 'title')
+
+    with pytest.raises(ValueError, match='password'):
+        get_fields('id,password')
+
+
+def test_serialize_month():
+    goal = SimpleNamespace(id=1, title='Walk', target_date=date(2020, 5, 10))
+    month = get_month(date(2020, 5, 10), today=date(2020, 5, 10))
+    month._goals = {date(2020, 5, 10): [goal]}
+
+    data = orjson.loads(dumps_line(serialize_month(month, ('id', 'title'))))
+
+    assert data['first_day'] == '2020-04-20'
+    assert len(data['weeks']) == 5
+    day = data['weeks'][2][6]
+    assert day == {'date': '2020-05-10', 'is_today': True,
+                   'is_weekend': True, 'holiday': None, 'goals': [{'id': 1, 'title': 'Walk'}]}
+    assert data['weeks'][0][0]['goals'] == []
+
+
+def test_parse_achievements():
+    items = parse_achievements([
+        {'goal_id': 1, 'date': '2020-05-10', 'status_id': 2, 'value': 3},
+        {'goal_id': '2', 'date': '2020-05-11', 'status_id': 1},
+    ])
+    assert items == [(1, date(2020, 5, 10), 2, 3), (2, date(2020, 5, 11), 1, 0)]
+
+    with pytest.raises(ValueError, match='Achievement 0'):
+        parse_achievements([{'goal_id': 1, 'date': '10.05.2020',
+                             'status_id': 2}])
+
+    with pytest.raises(ValueError):
+        parse_achievements({'goal_id': 1})
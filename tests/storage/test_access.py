@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""Database access tools tests.
+
+Query plan checks need real PostgreSQL, set ORDNUNG_TEST_DB_URI to run
+them. Everything is made in a temporary schema that is dropped after.
+"""
+import os
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects import postgresql
+
+from ordnung.storage.access import (
+    query_users_by_login, query_users_by_email_or_login
+)
+from ordnung.storage.models import User
+
+TEST_DB_URI = os.getenv('ORDNUNG_TEST_DB_URI')
+TOTAL_USERS = 100_000
+
+
+@pytest.fixture(scope='module')
+def connection():
+    engine = create_engine(TEST_DB_URI)
+    with engine.connect() as conn:
+        conn.execute('CREATE SCHEMA ordnung_test')
+        conn.execute('SET search_path TO ordnung_test')
+        User.__table__.create(bind=conn)
+        conn.execute(text("""
+        INSERT INTO users (name, email, login, password,
+                           registered, last_seen, confirmed)
+        SELECT 'User ' || x, 'User' || x || '@Example.com', 'Login' || x,
+               'hash', now(), now(), true
+        FROM generate_series(1, :total) AS x;
+        """), total=TOTAL_USERS)
+        conn.execute('ANALYZE users')
+        try:
+            yield conn
+        finally:
+            conn.execute('DROP SCHEMA ordnung_test CASCADE')
+
+
+def get_plan(conn, query) -> str:
+    statement = query.limit(1).statement.compile(
+        dialect=postgresql.dialect(), compile_kwargs={'literal_binds': True}
+    )
+    rows = conn.execute(f'EXPLAIN {statement}')
+    return '\n'.join(row[0] for row in rows)
+
+
+@pytest.mark.skipif(TEST_DB_URI is None, reason='needs PostgreSQL')
+def test_login_lookup_uses_index(connection):
+    plan = get_plan(connection, query_users_by_login('LOGIN500'))
+    assert 'users_login_lower_idx' in plan
+    assert 'Seq Scan' not in plan
+
+
+@pytest.mark.skipif(TEST_DB_URI is None, reason='needs PostgreSQL')
+def test_contact_lookup_uses_both_indexes(connection):
+    plan = get_plan(connection,
+                    query_users_by_email_or_login('user500@example.com'))
+    assert 'users_login_lower_idx' in plan
+    assert 'users_email_lower_idx' in plan
+    assert 'Seq Scan' not in plan
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+"""Achievements tests.
+"""
+from datetime import date, datetime
+
+from sqlalchemy.dialects import postgresql
+
+from ordnung.storage.achievements import (
+    AchievementItem, make_upsert, get_progress_deltas
+)
+
+
+def test_upsert_is_single_statement():
+    rows = [
+        dict(user_id=1, goal_id=goal_id, status_id=2,
+             event_date=date(2020, 5, day), event_time=datetime(2020, 5, 10),
+             value=1)
+        for goal_id in (1, 2) for day in range(4, 11)
+    ]
+    sql = str(make_upsert(rows).compile(dialect=postgresql.dialect()))
+
+    assert sql.count('INSERT INTO achievements') == 1
+    assert 'ON CONFLICT ON CONSTRAINT achievements_goal_date_key ' \
+           'DO UPDATE' in sql
+    assert 'RETURNING' in sql
+
+
+def test_progress_deltas():
+    items = [AchievementItem(1, date(2020, 5, 9), 2, 5),
+             AchievementItem(1, date(2020, 5, 10), 2, 3),
+             AchievementItem(2, date(2020, 5, 8), 2, 1)]
+    old_values = {(1, date(2020, 5, 9)): 2}
+    now = datetime(2020, 5, 10, 12)
+
+    deltas = get_progress_deltas(old_values, items, user_id=7, now=now)
+
+    assert deltas == [
+        dict(goal_id=1, user_id=7, total_value=3 + 3, events=1,
+             last_event_date=date(2020, 5, 10), updated_at=now),
+        dict(goal_id=2, user_id=7, total_value=1, events=1,
+             last_event_date=date(2020, 5, 8), updated_at=now),
+    ]
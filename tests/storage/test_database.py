@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+"""Database tools tests.
+"""
+import asyncio
+import contextvars
+import sqlite3
+import threading
+
+from ordnung.storage.database import MonitoredQueuePool, run_in_db_thread
+
+marker = contextvars.ContextVar('marker', default=None)
+
+
+def test_run_in_db_thread():
+    def worker(value, *, suffix):
+        return threading.current_thread().name, marker.get(), value + suffix
+
+    async def main():
+        marker.set('request-1')
+        return await run_in_db_thread(worker, 'a', suffix='b')
+
+    thread_name, context_value, result = asyncio.run(main())
+
+    assert thread_name != threading.current_thread().name
+    assert context_value == 'request-1'
+    assert result == 'ab'
+
+
+def test_pool_counts_checkouts_from_threads():
+    pool = MonitoredQueuePool(
+        lambda: sqlite3.connect(':memory:', check_same_thread=False),
+        pool_size=4, max_overflow=0,
+    )
+
+    def worker():
+        for _ in range(500):
+            connection = pool.connect()
+            connection.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    statistics = pool.get_wait_statistics()
+    assert statistics['checkouts'] == 8 * 500
+    assert statistics['max_wait'] >= statistics['average_wait'] >= 0.0
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+"""Holidays tests.
+"""
+import io
+from datetime import date
+
+import pytest
+
+from ordnung.core.date_and_time import get_month
+from ordnung.storage.holidays import HolidayIndex, read_csv, read_ics
+
+
+def test_holiday_index():
+    index = HolidayIndex()
+    rows = [(1, date(2020, 5, 1), 'Labour day'),
+            (1, date(2020, 5, 9), 'Victory day'),
+            (1, date(2020, 5, 9), 'Other'),
+            (2, date(2020, 5, 1), 'May day')]
+    index.load(rows)
+    assert index.version == 1
+
+    assert index.get(1, date(2020, 5, 2), date(2020, 5, 31)) \
+        == {date(2020, 5, 9): 'Victory day; Other'}
+    assert index.get(3, date(2020, 5, 1), date(2020, 5, 31)) == {}
+    assert index.get(None, date(2020, 5, 1), date(2020, 5, 31)) == {}
+
+    index.load(rows)
+    assert index.version == 1
+    index.load(rows[:1])
+    assert index.version == 2
+
+
+def test_month_overlay():
+    month = get_month(date(2020, 5, 10), today=date(2020, 5, 10))
+    month.set_holidays({date(2020, 5, 9): 'Victory day'})
+    assert month.holiday(month['2020-05-09']) == 'Victory day'
+    assert month.holiday(month['2020-05-10']) is None
+
+
+def test_read_csv():
+    file = io.StringIO('date,name\n2020-01-01,New year\n\n'
+                       '2020-01-07,"Christmas, orthodox"\n')
+    assert list(read_csv(file)) == [(date(2020, 1, 1), 'New year'),
+                                    (date(2020, 1, 7), 'Christmas, orthodox')]
+
+    with pytest.raises(ValueError, match='Line 2'):
+        list(read_csv(io.StringIO('2020-01-01,A\n01.01.2020,B\n')))
+
+
+def test_read_ics():
+    file = io.StringIO('BEGIN:VCALENDAR\r\n'
+                       'BEGIN:VEVENT\r\n'
+                       'DTSTART;VALUE=DATE:20200107\r\n'
+                       'SUMMARY:Christmas\\, orth\r\n odox\r\n'
+                       'END:VEVENT\r\n'
+                       'END:VCALENDAR\r\n')
+    assert list(read_ics(file)) == [(date(2020, 1, 7), 'Christmas, orthodox')]
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+"""Materialized occurrences tests.
+"""
+from datetime import date, datetime
+from types import SimpleNamespace
+
+from ordnung.storage import occurrences
+from ordnung.storage.sql import EVERY_WEEK
+
+
+def test_make_rows():
+    goal = SimpleNamespace(id=5, user_id=2, span_id=EVERY_WEEK,
+                           target_date=date(2020, 5, 4),
+                           actual_from=datetime(2020, 5, 1), actual_to=None)
+
+    rows = occurrences.make_rows([goal], date(2020, 5, 1), date(2020, 5, 14))
+
+    assert rows == [
+        dict(user_id=2, goal_id=5, event_date=date(2020, 5, 4)),
+        dict(user_id=2, goal_id=5, event_date=date(2020, 5, 11)),
+    ]
+
+
+def test_covers(monkeypatch):
+    monkeypatch.setattr(occurrences, 'get_materialized_window', lambda: None)
+    assert not occurrences.covers(date(2020, 5, 1), date(2020, 5, 2))
+
+    monkeypatch.setattr(occurrences, 'get_materialized_window',
+                        lambda: (date(2020, 5, 1), date(2020, 6, 1)))
+    assert occurrences.covers(date(2020, 5, 1), date(2020, 6, 1))
+    assert not occurrences.covers(date(2020, 4, 30), date(2020, 5, 2))
+    assert not occurrences.covers(date(2020, 5, 30), date(2020, 6, 2))
+
+
+def make_session(calls):
+    query = SimpleNamespace(
+        filter=lambda *args: query,
+        delete=lambda **kwargs: calls.append('delete'),
+    )
+    return SimpleNamespace(query=lambda *args: query,
+                           commit=lambda: calls.append('commit'))
+
+
+def test_refresh_without_window_removes_rows(monkeypatch):
+    calls = []
+    monkeypatch.setattr(occurrences, 'session', make_session(calls))
+    monkeypatch.setattr(occurrences, 'get_materialized_window', lambda: None)
+    monkeypatch.setattr(occurrences, 'insert_rows',
+                        lambda rows: calls.append('insert'))
+
+    occurrences.refresh_goal_occurrences(SimpleNamespace(id=5))
+
+    assert calls == ['delete', 'commit']
+
+
+def test_refresh_inside_window(monkeypatch):
+    calls = []
+    goal = SimpleNamespace(id=5, user_id=2, span_id=EVERY_WEEK,
+                           target_date=date(2020, 5, 4),
+                           actual_from=datetime(2020, 5, 1), actual_to=None)
+    monkeypatch.setattr(occurrences, 'session', make_session(calls))
+    monkeypatch.setattr(occurrences, 'get_materialized_window',
+                        lambda: (date(2020, 5, 1), date(2020, 5, 7)))
+    monkeypatch.setattr(occurrences, 'insert_rows', calls.append)
+
+    occurrences.refresh_goal_occurrences(goal)
+
+    assert calls == ['delete',
+                     [dict(user_id=2, goal_id=5, event_date=date(2020, 5, 4))],
+                     'commit']
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+"""Until complete rollover tests.
+"""
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+from ordnung.storage import rollover
+from ordnung.storage.sql import ROLLOVER_REQUEST
+
+
+def test_due_timezones(monkeypatch):
+    today = {'Europe/Moscow': date(2020, 5, 5),
+             'America/New_York': date(2020, 5, 4)}
+    monkeypatch.setattr(rollover, 'get_today', today.get)
+    monkeypatch.setattr(rollover, '_rolled',
+                        {'Europe/Moscow': date(2020, 5, 4),
+                         'America/New_York': date(2020, 5, 4)})
+
+    assert rollover.get_due_timezones(set(today)) \
+        == {'Europe/Moscow': date(2020, 5, 5)}
+
+
+def test_rollover_is_single_update():
+    sql = str(text(ROLLOVER_REQUEST).compile(dialect=postgresql.dialect()))
+
+    assert sql.count('update goals') == 1
+    assert 'returning g.id, g.user_id' in sql
+
+
+def test_rollover_due_returns_moved_goals(monkeypatch):
+    monkeypatch.setattr(rollover, 'get_timezones',
+                        lambda: {'UTC', 'Asia/Tokyo'})
+    monkeypatch.setattr(rollover, 'get_due_timezones',
+                        lambda timezones: {name: date(2020, 5, 5)
+                                           for name in sorted(timezones)})
+    moved = {'Asia/Tokyo': [(1, 10)], 'UTC': [(2, 20), (3, 20)]}
+    monkeypatch.setattr(rollover, 'rollover',
+                        lambda timezone, today: moved[timezone])
+
+    assert rollover.rollover_due() == [(1, 10), (2, 20), (3, 20)]
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+"""Prepared SQL requests tests.
+"""
+import re
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+from ordnung.storage import sql
+from ordnung.storage.sql import MEGA_REQUEST
+
+SPANS = [sql.ONCE, sql.UNTIL_COMPLETE, sql.EVERY_DAY, sql.EVERY_WEEK,
+         sql.EVERY_ODD_WEEK, sql.EVERY_EVEN_WEEK, sql.FIRST_DAY_OF_MONTH,
+         sql.LAST_DAY_OF_MONTH, sql.EVERY_MONTH, sql.EVERY_YEAR]
+
+
+def test_mega_request_parameters():
+    compiled = text(MEGA_REQUEST).compile(dialect=postgresql.dialect())
+
+    assert set(compiled.params) == {'user_id', 'groups_visible',
+                                    'target_date', 'offset_left',
+                                    'offset_right'}
+
+
+def test_mega_request_candidates_are_scoped():
+    candidates = MEGA_REQUEST.split('candidates as (', 1)[1]
+    candidates = candidates.split('-- Persistence', 1)[0]
+
+    assert 'where g.user_id = :user_id' in candidates
+    assert 'g.group_id = any(:groups_visible)' in candidates
+    # single date goals are taken by target date, the rest by actuality
+    assert f'g.span_id in ({sql.ONCE}, {sql.UNTIL_COMPLETE})' in candidates
+    assert f'g.span_id not in ({sql.ONCE}, {sql.UNTIL_COMPLETE})' \
+        in candidates
+
+
+def test_mega_request_sections_are_disjoint():
+    sections = MEGA_REQUEST.split('-- Persistence')[1:]
+    spans = [int(re.search(r'where c\.span_id = (\d+)', section).group(1))
+             for section in sections]
+
+    assert spans == SPANS
+    assert MEGA_REQUEST.count('UNION ALL') == len(SPANS) - 1
+    assert all('from candidates c' in section for section in sections)
+    assert MEGA_REQUEST.rstrip().endswith('order by cur_date, span_id, id;')